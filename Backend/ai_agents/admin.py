@@ -1,9 +1,9 @@
 from django.contrib import admin
-from .models import LLMProvider, AIModel, AIAgent, AgentTask, AIConfiguration
+from .models import LLMProvider, AIModel, AIAgent, AgentBatch, AgentTask, AgentTaskArchive, AIConfiguration
 
 @admin.register(LLMProvider)
 class LLMProviderAdmin(admin.ModelAdmin):
-    list_display = ['name', 'provider_class', 'is_active', 'created_at']
+    list_display = ['name', 'provider_class', 'requests_per_minute', 'tokens_per_minute', 'is_active', 'created_at']
     list_filter = ['provider_class', 'is_active']
     search_fields = ['name']
     readonly_fields = ['created_at', 'updated_at']
@@ -11,7 +11,7 @@ class LLMProviderAdmin(admin.ModelAdmin):
 
 @admin.register(AIModel)
 class AIModelAdmin(admin.ModelAdmin):
-    list_display = ['name', 'model_id', 'model_type', 'provider', 'is_active']
+    list_display = ['name', 'model_id', 'model_type', 'provider', 'requests_per_minute', 'tokens_per_minute', 'is_active']
     list_filter = ['model_type', 'provider', 'is_active']
     search_fields = ['name', 'model_id']
     readonly_fields = ['created_at', 'updated_at']
@@ -38,26 +38,47 @@ class AIAgentAdmin(admin.ModelAdmin):
     )
 
 
+@admin.register(AgentBatch)
+class AgentBatchAdmin(admin.ModelAdmin):
+    list_display = ['id', 'agent', 'user', 'total', 'created_at']
+    list_filter = ['agent']
+    raw_id_fields = ['user']
+    readonly_fields = ['created_at']
+
+
 @admin.register(AgentTask)
 class AgentTaskAdmin(admin.ModelAdmin):
-    list_display = ['id', 'agent', 'status', 'created_at', 'completed_at']
-    list_filter = ['status', 'agent', 'created_at']
-    search_fields = ['agent__name']
-    readonly_fields = ['created_at', 'updated_at', 'completed_at']
+    list_display = ['id', 'agent', 'user', 'batch', 'status', 'priority', 'created_at', 'completed_at']
+    list_filter = ['status', 'priority', 'agent', 'created_at']
+    search_fields = ['agent__name', 'user__email']
+    raw_id_fields = ['user', 'batch']
+    readonly_fields = ['created_at', 'updated_at', 'queued_at', 'started_at', 'completed_at']
     fieldsets = (
         (None, {
-            'fields': ('agent', 'status')
+            'fields': ('agent', 'user', 'batch', 'status', 'priority')
         }),
         ('Data', {
             'fields': ('input_data', 'output_data'),
         }),
         ('Timestamps', {
-            'fields': ('created_at', 'updated_at', 'completed_at'),
+            'fields': ('created_at', 'queued_at', 'started_at', 'updated_at', 'completed_at'),
             'classes': ('collapse',)
         }),
     )
 
 
+@admin.register(AgentTaskArchive)
+class AgentTaskArchiveAdmin(admin.ModelAdmin):
+    list_display = ['task_id', 'agent', 'user', 'status', 'created_at', 'archived_at']
+    list_filter = ['status', 'agent']
+    search_fields = ['task_id', 'user__email']
+    exclude = ['payload']
+    readonly_fields = [
+        'task_id', 'agent', 'user', 'batch_id', 'status', 'archive_file',
+        'created_at', 'completed_at', 'archived_at',
+    ]
+
+
 @admin.register(AIConfiguration)
 class AIConfigurationAdmin(admin.ModelAdmin):
     list_display = ['name', 'user', 'model_name', 'temperature', 'is_active']
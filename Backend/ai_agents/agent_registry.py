@@ -0,0 +1,122 @@
+"""
+Registry of active agents, preloaded with their model and provider.
+
+Agent configuration changes rarely but is read on every execute call and by
+every worker task, so it is cached at two levels:
+
+* a shared cache entry holding the field values of every active agent and
+  its model, stored under a version token, and
+* a process-local copy that is trusted for ``AI_AGENTS_REGISTRY_LOCAL_TTL``
+  seconds before the shared version token is re-checked.
+
+Providers hold API keys, so they never go to the shared cache: a process
+loads them from the database (one query) when it rebuilds its local copy.
+
+``post_save``/``post_delete`` on ``AIAgent``, ``AIModel`` and ``LLMProvider``
+(see ``signals``) rotate the version token, so every process reloads on its
+next check.
+"""
+import threading
+import time
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .models import AIAgent, AIModel, LLMProvider
+
+VERSION_KEY = 'ai_agents:registry:version'
+SHARED_TTL = 60 * 60
+
+AGENT_FIELDS = [field.attname for field in AIAgent._meta.concrete_fields]
+MODEL_FIELDS = [field.attname for field in AIModel._meta.concrete_fields]
+
+_local = None
+_lock = threading.Lock()
+
+
+class _Snapshot:
+    def __init__(self, version, by_type, by_id):
+        self.version = version
+        self.by_type = by_type
+        self.by_id = by_id
+        self.checked_at = time.monotonic()
+
+
+def _load():
+    """Field values of the active agents and their models, safe to share."""
+    agents = list(
+        AIAgent.objects.filter(is_active=True).order_by('id').values_list(*AGENT_FIELDS)
+    )
+    model_ids = {row[AGENT_FIELDS.index('model_id')] for row in agents}
+    models = list(AIModel.objects.filter(pk__in=model_ids).values_list(*MODEL_FIELDS))
+    return agents, models
+
+
+def _build(data):
+    """Rebuild agents from ``_load`` data, attaching providers read locally."""
+    agent_rows, model_rows = data
+    models = {}
+    for row in model_rows:
+        model = AIModel.from_db('default', MODEL_FIELDS, row)
+        models[model.pk] = model
+    providers = LLMProvider.objects.in_bulk({model.provider_id for model in models.values()})
+
+    by_type, by_id = {}, {}
+    for row in agent_rows:
+        agent = AIAgent.from_db('default', AGENT_FIELDS, row)
+        model = models.get(agent.model_id)
+        provider = providers.get(model.provider_id) if model is not None else None
+        if provider is None:
+            # Deleted since the shared entry was written; the signal that
+            # rotates the version is on its way.
+            continue
+        model.provider = provider
+        agent.model = model
+        by_id[agent.pk] = agent
+        by_type.setdefault(agent.task_type, agent)
+    return by_type, by_id
+
+
+def _snapshot():
+    global _local
+    local_ttl = getattr(settings, 'AI_AGENTS_REGISTRY_LOCAL_TTL', 5)
+    snapshot = _local
+    if snapshot is not None and time.monotonic() - snapshot.checked_at < local_ttl:
+        return snapshot
+
+    with _lock:
+        version = cache.get(VERSION_KEY)
+        if version is None:
+            version = uuid.uuid4().hex
+            if not cache.add(VERSION_KEY, version, None):
+                version = cache.get(VERSION_KEY, version)
+        if _local is not None and _local.version == version:
+            _local.checked_at = time.monotonic()
+            return _local
+
+        data_key = f'ai_agents:registry:{version}'
+        data = cache.get(data_key)
+        if data is None:
+            data = _load()
+            cache.set(data_key, data, SHARED_TTL)
+        _local = _Snapshot(version, *_build(data))
+        return _local
+
+
+def get_active_agent(task_type):
+    """Return the active agent for ``task_type`` (model and provider preloaded), or ``None``."""
+    return _snapshot().by_type.get(task_type)
+
+
+def get_agent(agent_id):
+    """Return the active agent with ``agent_id`` from the registry, or ``None``."""
+    return _snapshot().by_id.get(agent_id)
+
+
+def invalidate():
+    """Force every process to reload agents on its next lookup."""
+    global _local
+    with _lock:
+        _local = None
+        cache.set(VERSION_KEY, uuid.uuid4().hex, None)
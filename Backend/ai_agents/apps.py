@@ -0,0 +1,9 @@
+from django.apps import AppConfig
+
+
+class AiAgentsConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'ai_agents'
+
+    def ready(self):
+        import ai_agents.signals
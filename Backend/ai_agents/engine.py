@@ -0,0 +1,241 @@
+"""
+Agent execution engine.
+
+Tasks move through ``pending → processing → completed | failed``. Every
+transition is a conditional ``UPDATE ... WHERE status = <expected>`` so that
+two workers (or a retried Celery message) can never run the same task twice
+or overwrite a terminal state.
+"""
+import json
+import logging
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from . import agent_registry, providers, ratelimit, response_cache
+from .models import AIAgent, AgentTask
+from .streams import TaskStream
+
+logger = logging.getLogger(__name__)
+
+QUEUE_PREFIX = 'agents'
+
+# ``AIAgent.config`` keys forwarded to the provider as sampling parameters.
+GENERATION_PARAMS = ('temperature', 'max_tokens', 'top_p')
+
+
+def queue_for(agent, priority='interactive'):
+    """
+    Celery queue that serves ``priority`` tasks for ``agent`` (one queue per
+    priority class and task type), e.g. ``agents.interactive.caption``.
+    """
+    return f'{QUEUE_PREFIX}.{priority}.{agent.task_type}'
+
+
+def dispatch(task):
+    """
+    Enqueue ``task`` for execution once the surrounding transaction commits.
+
+    The request thread only pays for a broker publish; the LLM call always
+    happens on a worker (or inline when ``CELERY_TASK_ALWAYS_EAGER`` is set).
+    """
+    from .tasks import run_agent
+
+    queue = queue_for(task.agent, task.priority)
+    transaction.on_commit(
+        lambda: run_agent.apply_async(args=[task.pk], queue=queue)
+    )
+
+
+def dispatch_many(tasks):
+    """
+    Enqueue ``tasks`` as one Celery group once the surrounding transaction
+    commits, each routed to its agent's queue for the task's priority.
+    """
+    from celery import group
+
+    from .tasks import run_agent
+
+    if not tasks:
+        return
+    signatures = group(
+        run_agent.si(task.pk).set(queue=queue_for(task.agent, task.priority))
+        for task in tasks
+    )
+    transaction.on_commit(signatures.apply_async)
+
+
+# ─── State machine ───────────────────────────────────────────────────────────
+
+def claim(task_id):
+    """Move a task from ``pending`` to ``processing``. Returns ``True`` if this caller won."""
+    now = timezone.now()
+    return AgentTask.objects.filter(pk=task_id, status='pending').update(
+        status='processing',
+        started_at=now,
+        updated_at=now,
+    ) == 1
+
+
+def complete(task_id, output_data):
+    """Move a task from ``processing`` to ``completed`` and store its output."""
+    now = timezone.now()
+    return AgentTask.objects.filter(pk=task_id, status='processing').update(
+        status='completed',
+        output_data=output_data,
+        completed_at=now,
+        updated_at=now,
+    ) == 1
+
+
+def create_completed(agent, input_data, output_data, **fields):
+    """Record an execution that was answered without running (e.g. a cache hit)."""
+    now = timezone.now()
+    return AgentTask.objects.create(
+        agent=agent,
+        input_data=input_data,
+        output_data=output_data,
+        status='completed',
+        completed_at=now,
+        **fields,
+    )
+
+
+def fail(task_id, error):
+    """Move a task from ``processing`` to ``failed`` and record the error."""
+    now = timezone.now()
+    return AgentTask.objects.filter(pk=task_id, status='processing').update(
+        status='failed',
+        output_data={'error': str(error)},
+        completed_at=now,
+        updated_at=now,
+    ) == 1
+
+
+# ─── Execution ───────────────────────────────────────────────────────────────
+
+def build_messages(agent, input_data):
+    """Chat messages for ``input_data`` using the agent's ``system_prompt``."""
+    messages = []
+    system_prompt = agent.config.get('system_prompt')
+    if system_prompt:
+        messages.append({'role': 'system', 'content': system_prompt})
+    if isinstance(input_data, dict) and isinstance(input_data.get('prompt'), str):
+        content = input_data['prompt']
+    else:
+        content = json.dumps(input_data, ensure_ascii=False)
+    messages.append({'role': 'user', 'content': content})
+    return messages
+
+
+def build_params(agent):
+    """Sampling parameters taken from ``AIAgent.config``."""
+    return {key: agent.config[key] for key in GENERATION_PARAMS if key in agent.config}
+
+
+async def _stream_completion(client, model_id, messages, params, stream):
+    usage = {}
+    async for text, chunk_usage in client.stream(model_id, messages, **params):
+        if text:
+            await stream.awrite(text)
+        if chunk_usage:
+            usage.update(chunk_usage)
+    await stream.aflush()
+    return {'text': stream.text, 'usage': usage}
+
+
+def invoke(task, stream=None):
+    """
+    Run the agent's model against ``task.input_data`` and return ``output_data``.
+
+    When ``stream`` is given, tokens are relayed to it as the provider
+    produces them.
+    """
+    agent = task.agent
+    client = providers.get_client(agent.model.provider)
+    args = (agent.model.model_id, build_messages(agent, task.input_data))
+    if stream is not None:
+        result = providers.run(_stream_completion(client, *args, build_params(agent), stream))
+    else:
+        result = providers.run(client.complete(*args, **build_params(agent)))
+    return {'result': result['text'], 'usage': result['usage']}
+
+
+def resolve_agent(agent_id):
+    agent = agent_registry.get_agent(agent_id)
+    if agent is None:
+        # Agent deactivated after the task was queued; load it directly.
+        agent = AIAgent.objects.select_related('model__provider').get(pk=agent_id)
+    return agent
+
+
+def release(task_id):
+    """Return a ``processing`` task to ``pending`` so it can be retried later."""
+    return AgentTask.objects.filter(pk=task_id, status='processing').update(
+        status='pending',
+        updated_at=timezone.now(),
+    ) == 1
+
+
+def give_up(task_id, error):
+    """Fail a task that could not be admitted within its retry budget."""
+    if claim(task_id):
+        fail(task_id, error)
+        TaskStream(task_id).finish('failed', {'error': str(error)})
+
+
+def execute(task_id, attempt=0):
+    """
+    Admit, claim and run a single task. Safe to call more than once for the
+    same id: only the caller that wins the ``pending → processing``
+    transition runs it.
+
+    Raises ``ratelimit.Throttled`` when the provider budget is exhausted or
+    the provider answered 429; the task is left ``pending`` for a retry.
+    """
+    task = AgentTask.objects.filter(pk=task_id, status='pending').first()
+    if task is None:
+        logger.info('Agent task %s already claimed or finished; skipping', task_id)
+        return None
+    task.agent = resolve_agent(task.agent_id)
+
+    # An identical execution may have finished while this one was queued.
+    output_data = response_cache.lookup(task.agent, task.input_data, record_miss=False)
+    if output_data is not None:
+        if claim(task_id):
+            complete(task_id, output_data)
+        return output_data
+
+    # Claim before reserving budget: a worker that loses the claim to a
+    # duplicate delivery must not spend the provider's budget.
+    if not claim(task_id):
+        logger.info('Agent task %s already claimed or finished; skipping', task_id)
+        return None
+
+    wait = ratelimit.acquire(task.agent, task.input_data)
+    if wait > 0:
+        release(task_id)
+        raise ratelimit.Throttled(wait)
+
+    stream = TaskStream(task_id) if getattr(settings, 'AI_AGENTS_STREAMING', True) else None
+    try:
+        output_data = invoke(task, stream=stream)
+    except providers.RateLimitError as exc:
+        delay = ratelimit.penalize(task.agent, exc.retry_after, attempt)
+        release(task_id)
+        if stream is not None:
+            stream.reset()
+        raise ratelimit.Throttled(delay, str(exc))
+    except Exception as exc:
+        logger.exception('Agent task %s failed', task_id)
+        fail(task_id, exc)
+        if stream is not None:
+            stream.finish('failed', {'error': str(exc)})
+        return None
+
+    complete(task_id, output_data)
+    response_cache.store(task.agent, task.input_data, output_data)
+    if stream is not None:
+        stream.finish('completed', output_data)
+    return output_data
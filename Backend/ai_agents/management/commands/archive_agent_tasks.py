@@ -0,0 +1,47 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from ai_agents import retention
+
+
+class Command(BaseCommand):
+    help = 'Archive finished agent tasks older than the retention window and delete them in batches.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=getattr(settings, 'AI_AGENTS_RETENTION_DAYS', 30),
+            help='Archive completed/failed tasks created more than this many days ago.',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=getattr(settings, 'AI_AGENTS_RETENTION_BATCH_SIZE', 1000),
+            help='Rows archived and deleted per transaction.',
+        )
+        parser.add_argument(
+            '--to-file',
+            metavar='DIRECTORY',
+            help='Write payloads to a JSONL.gz file in DIRECTORY instead of the archive table.',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Only report how many tasks would be archived.',
+        )
+
+    def handle(self, *args, **options):
+        result = retention.archive_tasks(
+            days=options['days'],
+            batch_size=options['batch_size'],
+            directory=options['to_file'],
+            dry_run=options['dry_run'],
+        )
+        if options['dry_run']:
+            self.stdout.write(f"{result['archived']} agent tasks would be archived.")
+            return
+        message = f"Archived {result['archived']} agent tasks"
+        if result['file']:
+            message += f" to {result['file']}"
+        self.stdout.write(self.style.SUCCESS(message + '.'))
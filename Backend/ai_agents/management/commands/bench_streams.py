@@ -0,0 +1,118 @@
+import asyncio
+import statistics
+import time
+from collections import Counter
+
+import httpx
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = (
+        'Hold many concurrent agent task streams (SSE) or polling clients open '
+        'against a running server and measure how a cheap endpoint (the health '
+        'check) responds meanwhile. Use it to compare DJANGO_SERVER_MODE=wsgi and asgi.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', default='http://127.0.0.1:8000', help='Base URL of the server under test.')
+        parser.add_argument('--task', required=True, help='AgentTask id to stream or poll.')
+        parser.add_argument('--token', required=True, help='Access token of the task owner.')
+        parser.add_argument('--connections', type=int, default=1000, help='Concurrent clients.')
+        parser.add_argument(
+            '--mode',
+            choices=['stream', 'poll'],
+            default='stream',
+            help='stream: GET /stream/ and hold it open; poll: GET the task repeatedly.',
+        )
+        parser.add_argument('--duration', type=float, default=30.0, help='Seconds each client stays active.')
+        parser.add_argument('--poll-interval', type=float, default=1.0, help='Seconds between polls per client.')
+        parser.add_argument(
+            '--probe-interval',
+            type=float,
+            default=0.1,
+            help='Seconds between health-check probes during the run.',
+        )
+
+    def handle(self, *args, **options):
+        asyncio.run(self._run(options))
+
+    async def _run(self, options):
+        base = options['url'].rstrip('/')
+        task_url = f"{base}/api/ai/tasks/{options['task']}/"
+        probe_url = f'{base}/health/'
+        headers = {'Authorization': f"Bearer {options['token']}"}
+        statuses = Counter()
+        first_byte, probe_latencies = [], []
+        open_now = peak = 0
+        deadline = time.monotonic() + options['duration']
+
+        async def stream(client):
+            nonlocal open_now, peak
+            started = time.perf_counter()
+            async with client.stream('GET', f'{task_url}stream/', headers=headers) as response:
+                statuses[response.status_code] += 1
+                open_now += 1
+                peak = max(peak, open_now)
+                try:
+                    async for _ in response.aiter_raw():
+                        if started is not None:
+                            first_byte.append(time.perf_counter() - started)
+                            started = None
+                        if time.monotonic() >= deadline:
+                            break
+                finally:
+                    open_now -= 1
+
+        async def poll(client):
+            while time.monotonic() < deadline:
+                started = time.perf_counter()
+                response = await client.get(task_url, headers=headers)
+                statuses[response.status_code] += 1
+                first_byte.append(time.perf_counter() - started)
+                await asyncio.sleep(options['poll_interval'])
+
+        async def client_task(client):
+            try:
+                await (stream if options['mode'] == 'stream' else poll)(client)
+            except httpx.HTTPError as exc:
+                statuses[type(exc).__name__] += 1
+
+        async def probe(client):
+            while time.monotonic() < deadline:
+                started = time.perf_counter()
+                try:
+                    await client.get(probe_url)
+                    probe_latencies.append(time.perf_counter() - started)
+                except httpx.HTTPError:
+                    statuses['probe_error'] += 1
+                await asyncio.sleep(options['probe_interval'])
+
+        limits = httpx.Limits(max_connections=options['connections'] + 1, max_keepalive_connections=None)
+        timeout = httpx.Timeout(options['duration'] + 30, connect=30)
+        async with httpx.AsyncClient(timeout=timeout, limits=limits) as client:
+            started = time.perf_counter()
+            await asyncio.gather(
+                probe(client),
+                *(client_task(client) for _ in range(options['connections'])),
+            )
+            elapsed = time.perf_counter() - started
+
+        self.stdout.write(f"{options['connections']} {options['mode']} clients for {elapsed:.1f}s"
+                          + (f' (peak {peak} streams open)' if options['mode'] == 'stream' else ''))
+        self.stdout.write('Status codes: ' + ', '.join(f'{code}: {n}' for code, n in sorted(statuses.items(), key=str)))
+        label = 'First byte:    ' if options['mode'] == 'stream' else 'Poll latency:  '
+        self.stdout.write(label + self._summary(first_byte))
+        self.stdout.write('Health latency: ' + self._summary(probe_latencies))
+
+    @staticmethod
+    def _summary(samples):
+        if not samples:
+            return 'no samples'
+        samples = sorted(samples)
+
+        def pct(p):
+            return samples[min(len(samples) - 1, int(p * len(samples)))] * 1000
+
+        return (f'p50 {pct(0.50):.1f}ms  p95 {pct(0.95):.1f}ms  p99 {pct(0.99):.1f}ms  '
+                f'max {samples[-1] * 1000:.1f}ms  mean {statistics.mean(samples) * 1000:.1f}ms  (n={len(samples)})')
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.18 on 2026-10-17 15:49
+
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ai_agents', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AgentBatch',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('total', models.PositiveIntegerField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('agent', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='batches', to='ai_agents.aiagent')),
+            ],
+            options={
+                'verbose_name': 'Agent Batch',
+                'verbose_name_plural': 'Agent Batches',
+                'db_table': 'AIs_agentbatch',
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.AddField(
+            model_name='agenttask',
+            name='batch',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='tasks', to='ai_agents.agentbatch'),
+        ),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 5.2.18 on 2026-10-17 15:50
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ai_agents', '0002_agentbatch'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='agenttask',
+            options={'ordering': ['-created_at', '-id'], 'verbose_name': 'Agent Task', 'verbose_name_plural': 'Agent Tasks'},
+        ),
+        migrations.AddField(
+            model_name='agentbatch',
+            name='user',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='agent_batches', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='agenttask',
+            name='user',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='agent_tasks', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddIndex(
+            model_name='agenttask',
+            index=models.Index(fields=['agent', 'status', 'created_at'], name='agenttask_agent_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='agenttask',
+            index=models.Index(fields=['user', 'status', 'created_at'], name='agenttask_user_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='agenttask',
+            index=models.Index(fields=['user', 'created_at', 'id'], name='agenttask_user_created_idx'),
+        ),
+    ]
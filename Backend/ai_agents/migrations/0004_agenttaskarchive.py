@@ -0,0 +1,39 @@
+# Generated by Django 5.2.18 on 2026-10-17 15:51
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ai_agents', '0003_agenttask_user_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AgentTaskArchive',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('task_id', models.BigIntegerField(unique=True)),
+                ('batch_id', models.UUIDField(blank=True, null=True)),
+                ('status', models.CharField(max_length=50)),
+                ('payload', models.BinaryField(blank=True, null=True)),
+                ('archive_file', models.CharField(blank=True, max_length=500)),
+                ('created_at', models.DateTimeField()),
+                ('completed_at', models.DateTimeField(blank=True, null=True)),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+                ('agent', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='archived_tasks', to='ai_agents.aiagent')),
+                ('user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='archived_agent_tasks', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Archived Agent Task',
+                'verbose_name_plural': 'Archived Agent Tasks',
+                'db_table': 'AIs_agenttaskarchive',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['user', 'created_at'], name='agenttaskarch_user_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-17 15:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ai_agents', '0004_agenttaskarchive'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='aimodel',
+            name='requests_per_minute',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='aimodel',
+            name='tokens_per_minute',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='llmprovider',
+            name='requests_per_minute',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='llmprovider',
+            name='tokens_per_minute',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+    ]
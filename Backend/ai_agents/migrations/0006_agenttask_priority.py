@@ -0,0 +1,34 @@
+# Generated by Django 5.2.18 on 2026-10-17 15:54
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ai_agents', '0005_rate_limits'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='agenttask',
+            name='priority',
+            field=models.CharField(choices=[('interactive', 'Interactive'), ('standard', 'Standard'), ('bulk', 'Bulk')], default='interactive', max_length=20),
+        ),
+        migrations.AddField(
+            model_name='agenttask',
+            name='queued_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='agenttask',
+            name='started_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='agenttask',
+            index=models.Index(fields=['status', 'priority', 'queued_at'], name='agenttask_dispatch_idx'),
+        ),
+    ]
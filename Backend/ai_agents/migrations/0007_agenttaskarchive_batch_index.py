@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-17 18:17
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ai_agents', '0006_agenttask_priority'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='agenttaskarchive',
+            index=models.Index(fields=['batch_id', 'status'], name='agenttaskarch_batch_idx'),
+        ),
+    ]
@@ -1,5 +1,8 @@
 from django.db import models
 from django.contrib.auth import get_user_model
+import json
+import uuid
+import zlib
 
 User = get_user_model()
 
@@ -18,6 +21,9 @@ class LLMProvider(models.Model):
     provider_class = models.CharField(max_length=255, choices=PROVIDER_CLASSES)
     api_key = models.TextField(blank=True, null=True)  # Encrypt in production
     base_url = models.URLField(blank=True, null=True)
+    # Account-wide limits enforced by ai_agents.ratelimit (blank = unlimited)
+    requests_per_minute = models.PositiveIntegerField(blank=True, null=True)
+    tokens_per_minute = models.PositiveIntegerField(blank=True, null=True)
     is_active = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -46,6 +52,9 @@ class AIModel(models.Model):
         on_delete=models.CASCADE, 
         related_name='models'
     )
+    # Per-model limits, enforced in addition to the provider's (blank = unlimited)
+    requests_per_minute = models.PositiveIntegerField(blank=True, null=True)
+    tokens_per_minute = models.PositiveIntegerField(blank=True, null=True)
     is_active = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -84,6 +93,31 @@ class AIAgent(models.Model):
         verbose_name_plural = 'AI Agents'
 
 
+class AgentBatch(models.Model):
+    """Group of agent tasks submitted in one execute-batch call"""
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    agent = models.ForeignKey(
+        AIAgent,
+        on_delete=models.CASCADE,
+        related_name='batches'
+    )
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='agent_batches',
+        blank=True,
+        null=True
+    )
+    total = models.PositiveIntegerField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'AIs_agentbatch'
+        verbose_name = 'Agent Batch'
+        verbose_name_plural = 'Agent Batches'
+        ordering = ['-created_at']
+
+
 class AgentTask(models.Model):
     """Log of agent task executions"""
     STATUS_CHOICES = [
@@ -92,15 +126,37 @@ class AgentTask(models.Model):
         ('completed', 'Completed'),
         ('failed', 'Failed'),
     ]
+    PRIORITY_CHOICES = [
+        ('interactive', 'Interactive'),  # single execute calls, queued immediately
+        ('standard', 'Standard'),        # batches, fair-share dispatched
+        ('bulk', 'Bulk'),                # large batches, fair-share dispatched
+    ]
 
     agent = models.ForeignKey(
         AIAgent, 
         on_delete=models.CASCADE, 
         related_name='tasks'
     )
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='agent_tasks',
+        blank=True,
+        null=True
+    )
+    batch = models.ForeignKey(
+        AgentBatch,
+        on_delete=models.SET_NULL,
+        related_name='tasks',
+        blank=True,
+        null=True
+    )
     input_data = models.JSONField()
     output_data = models.JSONField(blank=True, null=True)
     status = models.CharField(max_length=50, choices=STATUS_CHOICES, default='pending')
+    priority = models.CharField(max_length=20, choices=PRIORITY_CHOICES, default='interactive')
+    queued_at = models.DateTimeField(blank=True, null=True)  # sent to the broker
+    started_at = models.DateTimeField(blank=True, null=True)  # claimed by a worker
     completed_at = models.DateTimeField(blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -109,7 +165,62 @@ class AgentTask(models.Model):
         db_table = 'AIs_agenttask'
         verbose_name = 'Agent Task'
         verbose_name_plural = 'Agent Tasks'
+        ordering = ['-created_at', '-id']
+        indexes = [
+            models.Index(fields=['agent', 'status', 'created_at'], name='agenttask_agent_status_idx'),
+            models.Index(fields=['user', 'status', 'created_at'], name='agenttask_user_status_idx'),
+            models.Index(fields=['user', 'created_at', 'id'], name='agenttask_user_created_idx'),
+            models.Index(fields=['status', 'priority', 'queued_at'], name='agenttask_dispatch_idx'),
+        ]
+
+
+class AgentTaskArchive(models.Model):
+    """Slim summary of an agent task moved out of AIs_agenttask by retention"""
+    task_id = models.BigIntegerField(unique=True)
+    agent = models.ForeignKey(
+        AIAgent,
+        on_delete=models.SET_NULL,
+        related_name='archived_tasks',
+        blank=True,
+        null=True
+    )
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='archived_agent_tasks',
+        blank=True,
+        null=True
+    )
+    batch_id = models.UUIDField(blank=True, null=True)
+    status = models.CharField(max_length=50)
+    # zlib-compressed JSON of input_data/output_data; empty when the payload
+    # was exported to ``archive_file`` instead.
+    payload = models.BinaryField(blank=True, null=True)
+    archive_file = models.CharField(max_length=500, blank=True)
+    created_at = models.DateTimeField()
+    completed_at = models.DateTimeField(blank=True, null=True)
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'AIs_agenttaskarchive'
+        verbose_name = 'Archived Agent Task'
+        verbose_name_plural = 'Archived Agent Tasks'
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['user', 'created_at'], name='agenttaskarch_user_idx'),
+            models.Index(fields=['batch_id', 'status'], name='agenttaskarch_batch_idx'),
+        ]
+
+    @staticmethod
+    def compress(input_data, output_data):
+        data = json.dumps({'input_data': input_data, 'output_data': output_data}, separators=(',', ':'))
+        return zlib.compress(data.encode(), 6)
+
+    def get_payload(self):
+        """Return ``{'input_data', 'output_data'}`` or ``None`` if exported to a file."""
+        if not self.payload:
+            return None
+        return json.loads(zlib.decompress(bytes(self.payload)))
 
 
 class AIConfiguration(models.Model):
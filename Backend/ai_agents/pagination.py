@@ -0,0 +1,72 @@
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import CursorPagination, _reverse_ordering
+
+
+class AgentTaskCursorPagination(CursorPagination):
+    """
+    Keyset pagination over ``(created_at, id)``.
+
+    DRF's ``CursorPagination`` filters on the first ordering field only and
+    skips rows sharing it with an offset. Here the cursor holds both fields
+    and a page starts strictly after the ``(created_at, id)`` pair, so it is
+    one range scan of the ``(user, created_at, id)`` index from the cursor,
+    deep pages cost the same as the first one and no ``COUNT(*)`` is issued.
+    """
+    ordering = ('-created_at', '-id')
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.base_url = request.build_absolute_uri()
+        self.cursor = self.decode_cursor(request)
+        if self.cursor is None:
+            reverse, current_position = False, None
+        else:
+            _, reverse, current_position = self.cursor
+
+        queryset = queryset.order_by(*(_reverse_ordering(self.ordering) if reverse else self.ordering))
+        if current_position is not None:
+            queryset = queryset.filter(self._after(current_position, before=not reverse))
+
+        results = list(queryset[:self.page_size + 1])
+        self.page = results[:self.page_size]
+        following_position = (
+            self._get_position_from_instance(results[-1], self.ordering)
+            if len(results) > len(self.page) else None
+        )
+
+        if reverse:
+            self.page.reverse()
+            self.has_next = current_position is not None
+            self.has_previous = following_position is not None
+            self.next_position = current_position
+            self.previous_position = following_position
+        else:
+            self.has_next = following_position is not None
+            self.has_previous = current_position is not None
+            self.next_position = following_position
+            self.previous_position = current_position
+
+        if (self.has_previous or self.has_next) and self.template is not None:
+            self.display_page_controls = True
+        return self.page
+
+    def _after(self, position, before):
+        """Rows past ``position`` in page order: ``(created_at, id) < position`` (or ``>``)."""
+        created_at, _, pk = position.partition('|')
+        created_at = parse_datetime(created_at)
+        if created_at is None or not pk.isdigit():
+            raise NotFound(self.invalid_cursor_message)
+        lookup = 'lt' if before else 'gt'
+        return Q(**{f'created_at__{lookup}e': created_at}) & (
+            Q(**{f'created_at__{lookup}': created_at}) | Q(**{f'id__{lookup}': int(pk)})
+        )
+
+    def _get_position_from_instance(self, instance, ordering):
+        # Unique positions: the links built from them never need an offset.
+        return f'{instance.created_at.isoformat()}|{instance.pk}'
@@ -0,0 +1,12 @@
+from .base import BaseProviderClient, ProviderError, RateLimitError
+from .registry import close_all, get_client, register, run
+
+__all__ = [
+    'BaseProviderClient',
+    'ProviderError',
+    'RateLimitError',
+    'close_all',
+    'get_client',
+    'register',
+    'run',
+]
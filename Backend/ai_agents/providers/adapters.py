@@ -0,0 +1,155 @@
+"""
+Provider adapters. Each one maps a list of chat ``messages`` (``role`` /
+``content`` dicts, optionally starting with a ``system`` message) onto the
+provider's wire format.
+"""
+from .base import BaseProviderClient
+
+
+def _split_system(messages):
+    system = [m['content'] for m in messages if m['role'] == 'system']
+    rest = [m for m in messages if m['role'] != 'system']
+    return '\n\n'.join(system) or None, rest
+
+
+class OpenAIClient(BaseProviderClient):
+    provider_class = 'openai'
+    default_base_url = 'https://api.openai.com/v1'
+
+    def get_headers(self):
+        return {'Authorization': f'Bearer {self.api_key}'} if self.api_key else {}
+
+    def build_request(self, model_id, messages, params):
+        return '/chat/completions', {'model': model_id, 'messages': messages, **params}
+
+    def parse_response(self, data):
+        return {
+            'text': data['choices'][0]['message']['content'],
+            'usage': data.get('usage', {}),
+        }
+
+    def build_stream_request(self, model_id, messages, params):
+        path, body = super().build_stream_request(model_id, messages, params)
+        body['stream_options'] = {'include_usage': True}
+        return path, body
+
+    def parse_stream_event(self, data):
+        choices = data.get('choices') or []
+        delta = choices[0].get('delta') or {} if choices else {}
+        return delta.get('content') or '', data.get('usage')
+
+
+class MistralClient(OpenAIClient):
+    """Mistral exposes an OpenAI-compatible chat completions API."""
+    provider_class = 'mistral'
+    default_base_url = 'https://api.mistral.ai/v1'
+
+    def build_stream_request(self, model_id, messages, params):
+        # Mistral reports usage on the final chunk without ``stream_options``.
+        return BaseProviderClient.build_stream_request(self, model_id, messages, params)
+
+
+class AnthropicClient(BaseProviderClient):
+    provider_class = 'anthropic'
+    default_base_url = 'https://api.anthropic.com/v1'
+
+    def get_headers(self):
+        headers = {'anthropic-version': '2023-06-01'}
+        if self.api_key:
+            headers['x-api-key'] = self.api_key
+        return headers
+
+    def build_request(self, model_id, messages, params):
+        system, messages = _split_system(messages)
+        body = {'model': model_id, 'messages': messages, 'max_tokens': 1024, **params}
+        if system:
+            body['system'] = system
+        return '/messages', body
+
+    def parse_response(self, data):
+        return {
+            'text': ''.join(block.get('text', '') for block in data['content']),
+            'usage': data.get('usage', {}),
+        }
+
+    def parse_stream_event(self, data):
+        event_type = data.get('type')
+        if event_type == 'content_block_delta':
+            return data['delta'].get('text', ''), None
+        if event_type == 'message_start':
+            return '', data['message'].get('usage')
+        if event_type == 'message_delta':
+            return '', data.get('usage')
+        return '', None
+
+
+class GoogleClient(BaseProviderClient):
+    provider_class = 'google'
+    default_base_url = 'https://generativelanguage.googleapis.com/v1beta'
+
+    def get_headers(self):
+        return {'x-goog-api-key': self.api_key} if self.api_key else {}
+
+    def build_request(self, model_id, messages, params):
+        system, messages = _split_system(messages)
+        body = {
+            'contents': [
+                {
+                    'role': 'model' if m['role'] == 'assistant' else 'user',
+                    'parts': [{'text': m['content']}],
+                }
+                for m in messages
+            ],
+        }
+        if system:
+            body['systemInstruction'] = {'parts': [{'text': system}]}
+        generation_config = {}
+        if 'temperature' in params:
+            generation_config['temperature'] = params['temperature']
+        if 'max_tokens' in params:
+            generation_config['maxOutputTokens'] = params['max_tokens']
+        if generation_config:
+            body['generationConfig'] = generation_config
+        return f'/models/{model_id}:generateContent', body
+
+    def parse_response(self, data):
+        parts = data['candidates'][0]['content']['parts']
+        return {
+            'text': ''.join(part.get('text', '') for part in parts),
+            'usage': data.get('usageMetadata', {}),
+        }
+
+    def build_stream_request(self, model_id, messages, params):
+        path, body = self.build_request(model_id, messages, params)
+        return path.replace(':generateContent', ':streamGenerateContent') + '?alt=sse', body
+
+    def parse_stream_event(self, data):
+        candidates = data.get('candidates') or []
+        parts = candidates[0].get('content', {}).get('parts', []) if candidates else []
+        return ''.join(part.get('text', '') for part in parts), data.get('usageMetadata')
+
+
+class CohereClient(BaseProviderClient):
+    provider_class = 'cohere'
+    default_base_url = 'https://api.cohere.com/v2'
+
+    def get_headers(self):
+        return {'Authorization': f'Bearer {self.api_key}'} if self.api_key else {}
+
+    def build_request(self, model_id, messages, params):
+        return '/chat', {'model': model_id, 'messages': messages, **params}
+
+    def parse_response(self, data):
+        content = data['message']['content']
+        return {
+            'text': ''.join(block.get('text', '') for block in content),
+            'usage': data.get('usage', {}),
+        }
+
+    def parse_stream_event(self, data):
+        event_type = data.get('type')
+        if event_type == 'content-delta':
+            return data['delta']['message']['content'].get('text', ''), None
+        if event_type == 'message-end':
+            return '', data['delta'].get('usage')
+        return '', None
@@ -0,0 +1,161 @@
+"""
+Base class for LLM provider clients.
+
+Each client owns one pooled ``httpx.AsyncClient`` (HTTP/2 where the server
+supports it) and an ``asyncio.Semaphore`` that caps in-flight requests to the
+provider. Clients are long-lived and bound to the provider event loop in
+``registry`` — never create one per task.
+"""
+import asyncio
+import json
+
+import httpx
+from django.conf import settings
+
+
+class ProviderError(Exception):
+    """The provider returned an error or an unparseable response."""
+
+    def __init__(self, message, status_code=None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class RateLimitError(ProviderError):
+    """The provider rejected the request with HTTP 429."""
+
+    def __init__(self, message, retry_after=None):
+        super().__init__(message, status_code=429)
+        self.retry_after = retry_after
+
+
+def provider_limits(provider_class):
+    """Connection/concurrency limits for ``provider_class`` from ``AI_PROVIDER_LIMITS``."""
+    limits = getattr(settings, 'AI_PROVIDER_LIMITS', {})
+    return {**limits.get('default', {}), **limits.get(provider_class, {})}
+
+
+class BaseProviderClient:
+    """Adapter between ``AgentTask`` input and one provider's HTTP API."""
+    provider_class = None
+    default_base_url = None
+
+    def __init__(self, provider):
+        self.provider_id = provider.pk
+        self.base_url = (provider.base_url or self.default_base_url).rstrip('/')
+        self.api_key = provider.api_key or ''
+        limits = provider_limits(self.provider_class)
+        self.max_concurrency = limits.get('max_concurrency', 16)
+        self.max_connections = limits.get('max_connections', 32)
+        self.timeout = limits.get('timeout', 60)
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self._http = None
+
+    @property
+    def http(self):
+        if self._http is None:
+            self._http = httpx.AsyncClient(
+                base_url=self.base_url,
+                headers=self.get_headers(),
+                http2=True,
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections,
+                ),
+                timeout=httpx.Timeout(self.timeout, connect=10),
+            )
+        return self._http
+
+    async def aclose(self):
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
+
+    # ── Provider-specific hooks ──────────────────────────────────────────────
+
+    def get_headers(self):
+        return {}
+
+    def build_request(self, model_id, messages, params):
+        """Return ``(path, json_body)`` for a completion request."""
+        raise NotImplementedError
+
+    def parse_response(self, data):
+        """Return ``{'text': str, 'usage': dict}`` from a provider response body."""
+        raise NotImplementedError
+
+    def build_stream_request(self, model_id, messages, params):
+        """Return ``(path, json_body)`` for a streaming completion request."""
+        path, body = self.build_request(model_id, messages, params)
+        return path, {**body, 'stream': True}
+
+    def parse_stream_event(self, data):
+        """Return ``(text_delta, usage_or_None)`` from one decoded SSE ``data`` payload."""
+        raise NotImplementedError
+
+    # ── Public API ───────────────────────────────────────────────────────────
+
+    async def complete(self, model_id, messages, **params):
+        """Send a chat completion and return ``{'text': ..., 'usage': ...}``."""
+        path, body = self.build_request(model_id, messages, params)
+        async with self._semaphore:
+            try:
+                response = await self.http.post(path, json=body)
+            except httpx.TransportError as exc:
+                raise self.transport_error(exc) from exc
+        self.raise_for_status(response)
+        try:
+            return self.parse_response(response.json())
+        except (KeyError, IndexError, TypeError, ValueError) as exc:
+            raise ProviderError(f'Unexpected {self.provider_class} response: {exc}') from exc
+
+    async def stream(self, model_id, messages, **params):
+        """Stream a chat completion, yielding ``(text_delta, usage_or_None)`` tuples."""
+        path, body = self.build_stream_request(model_id, messages, params)
+        try:
+            async with self._semaphore:
+                async with self.http.stream('POST', path, json=body) as response:
+                    if response.status_code >= 400:
+                        await response.aread()
+                        self.raise_for_status(response)
+                    async for line in response.aiter_lines():
+                        if not line.startswith('data:'):
+                            continue
+                        payload = line[5:].strip()
+                        if not payload or payload == '[DONE]':
+                            continue
+                        try:
+                            data = json.loads(payload)
+                        except ValueError:
+                            continue
+                        try:
+                            text, usage = self.parse_stream_event(data)
+                        except (KeyError, IndexError, TypeError) as exc:
+                            raise ProviderError(
+                                f'Unexpected {self.provider_class} stream event: {exc}'
+                            ) from exc
+                        if text or usage:
+                            yield text, usage
+        except httpx.TransportError as exc:
+            raise self.transport_error(exc) from exc
+
+    def transport_error(self, exc):
+        """``ProviderError`` for a connection failure or timeout talking to the provider."""
+        kind = 'timed out' if isinstance(exc, httpx.TimeoutException) else 'failed'
+        return ProviderError(f'{self.provider_class} request {kind}: {exc!r}')
+
+    def raise_for_status(self, response):
+        if response.status_code == 429:
+            try:
+                retry_after = float(response.headers.get('retry-after', ''))
+            except ValueError:
+                retry_after = None
+            raise RateLimitError(
+                f'{self.provider_class} rate limit exceeded',
+                retry_after=retry_after,
+            )
+        if response.status_code >= 400:
+            raise ProviderError(
+                f'{self.provider_class} returned HTTP {response.status_code}: {response.text[:500]}',
+                status_code=response.status_code,
+            )
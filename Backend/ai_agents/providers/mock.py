@@ -0,0 +1,191 @@
+"""
+Local mock LLM server for tests and load tests.
+
+Speaks just enough of the OpenAI/Mistral, Anthropic, Google and Cohere chat
+APIs (plain and streaming) for the adapters in ``adapters`` to round-trip. Point an
+``LLMProvider.base_url`` at ``MockProviderServer().url`` (or run
+``python -m ai_agents.providers.mock --port 8090``).
+
+Request headers understood by the server:
+
+* ``X-Mock-Status`` — respond with this HTTP status instead of 200.
+* ``X-Mock-Delay`` — sleep this many seconds before responding.
+
+Requests for the model ``mock-429`` are always rejected with HTTP 429.
+``MockProviderServer.connections`` and ``requests`` count what the server
+has accepted, so tests can check that clients reuse pooled connections.
+"""
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def _reply_text(body):
+    messages = body.get('messages') or body.get('contents') or []
+    if not messages:
+        return 'mock response'
+    last = messages[-1]
+    content = last.get('content')
+    if content is None:
+        content = ''.join(part.get('text', '') for part in last.get('parts', []))
+    return f'mock response to: {content}'
+
+
+def _usage(text):
+    return len(text.split())
+
+
+class MockProviderHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    def setup(self):
+        super().setup()
+        self.server.count('connections')
+
+    def do_POST(self):
+        self.server.count('requests')
+        length = int(self.headers.get('Content-Length', 0))
+        body = json.loads(self.rfile.read(length) or b'{}')
+
+        delay = float(self.headers.get('X-Mock-Delay', 0))
+        if delay:
+            time.sleep(delay)
+
+        status = int(self.headers.get('X-Mock-Status', 200))
+        if body.get('model') == 'mock-429' or '/mock-429:' in self.path:
+            status = 429
+        if status != 200:
+            extra = {'Retry-After': '1'} if status == 429 else {}
+            return self._send(status, {'error': {'message': 'mock error'}}, extra)
+
+        text = _reply_text(body)
+        tokens = _usage(text)
+        if body.get('stream') or ':streamGenerateContent' in self.path:
+            return self._stream(text, tokens)
+        if self.path.endswith('/chat/completions'):
+            payload = {
+                'choices': [{'message': {'role': 'assistant', 'content': text}}],
+                'usage': {'prompt_tokens': tokens, 'completion_tokens': tokens},
+            }
+        elif self.path.endswith('/messages'):
+            payload = {
+                'content': [{'type': 'text', 'text': text}],
+                'usage': {'input_tokens': tokens, 'output_tokens': tokens},
+            }
+        elif self.path.endswith(':generateContent'):
+            payload = {
+                'candidates': [{'content': {'parts': [{'text': text}]}}],
+                'usageMetadata': {'promptTokenCount': tokens, 'candidatesTokenCount': tokens},
+            }
+        elif self.path.endswith('/chat'):
+            payload = {
+                'message': {'content': [{'type': 'text', 'text': text}]},
+                'usage': {'tokens': {'input_tokens': tokens, 'output_tokens': tokens}},
+            }
+        else:
+            return self._send(404, {'error': {'message': f'unknown path {self.path}'}})
+        self._send(200, payload)
+
+    def _stream(self, text, tokens):
+        """Send ``text`` word by word in the provider's SSE event format."""
+        words = [word + ' ' for word in text.split(' ')]
+        words[-1] = words[-1].rstrip()
+        if '/chat/completions' in self.path:
+            events = [{'choices': [{'delta': {'content': word}}]} for word in words]
+            events.append({'choices': [], 'usage': {'prompt_tokens': tokens, 'completion_tokens': tokens}})
+        elif '/messages' in self.path:
+            events = [{'type': 'message_start', 'message': {'usage': {'input_tokens': tokens}}}]
+            events += [{'type': 'content_block_delta', 'delta': {'text': word}} for word in words]
+            events.append({'type': 'message_delta', 'usage': {'output_tokens': tokens}})
+        elif ':streamGenerateContent' in self.path:
+            events = [{'candidates': [{'content': {'parts': [{'text': word}]}}]} for word in words]
+            events.append({'usageMetadata': {'promptTokenCount': tokens, 'candidatesTokenCount': tokens}})
+        else:
+            events = [
+                {'type': 'content-delta', 'delta': {'message': {'content': {'text': word}}}}
+                for word in words
+            ]
+            events.append({'type': 'message-end', 'delta': {'usage': {'tokens': {'output_tokens': tokens}}}})
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Connection', 'close')
+        self.end_headers()
+        self.close_connection = True
+        for event in events:
+            self.wfile.write(f'data: {json.dumps(event)}\n\n'.encode())
+            self.wfile.flush()
+        if '/chat/completions' in self.path:
+            self.wfile.write(b'data: [DONE]\n\n')
+
+    def _send(self, status, payload, headers=None):
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+
+class _CountingServer(ThreadingHTTPServer):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.counts = {'connections': 0, 'requests': 0}
+        self._counts_lock = threading.Lock()
+
+    def count(self, name):
+        with self._counts_lock:
+            self.counts[name] += 1
+
+
+class MockProviderServer:
+    """Threaded mock server; usable as a context manager."""
+
+    def __init__(self, host='127.0.0.1', port=0):
+        self.httpd = _CountingServer((host, port), MockProviderHandler)
+        self.thread = None
+
+    @property
+    def connections(self):
+        return self.httpd.counts['connections']
+
+    @property
+    def requests(self):
+        return self.httpd.counts['requests']
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def start(self):
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Run the mock LLM provider server.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8090)
+    args = parser.parse_args()
+    server = MockProviderServer(args.host, args.port)
+    print(f'Mock LLM provider listening on {server.url}')
+    server.httpd.serve_forever()
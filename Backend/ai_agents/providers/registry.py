@@ -0,0 +1,95 @@
+"""
+Resolve an ``LLMProvider`` row to a long-lived async client.
+
+All provider I/O runs on a single background event loop per process, so the
+pooled connections in each client survive across tasks. Synchronous callers
+(Celery workers, management commands) submit coroutines with ``run()``.
+"""
+import asyncio
+import threading
+
+from .adapters import (
+    AnthropicClient,
+    CohereClient,
+    GoogleClient,
+    MistralClient,
+    OpenAIClient,
+)
+
+PROVIDER_CLIENTS = {
+    client.provider_class: client
+    for client in (OpenAIClient, AnthropicClient, GoogleClient, CohereClient, MistralClient)
+}
+
+_clients = {}
+_clients_lock = threading.Lock()
+_loop = None
+_loop_lock = threading.Lock()
+
+
+def register(client_class):
+    """Register (or replace) the adapter used for ``client_class.provider_class``."""
+    PROVIDER_CLIENTS[client_class.provider_class] = client_class
+    return client_class
+
+
+def get_loop():
+    """Return the process-wide provider event loop, starting it on first use."""
+    global _loop
+    with _loop_lock:
+        if _loop is None or _loop.is_closed():
+            _loop = asyncio.new_event_loop()
+            threading.Thread(
+                target=_loop.run_forever,
+                name='llm-provider-loop',
+                daemon=True,
+            ).start()
+    return _loop
+
+
+def run(coro, timeout=None):
+    """Run ``coro`` on the provider loop and block until it finishes."""
+    return asyncio.run_coroutine_threadsafe(coro, get_loop()).result(timeout)
+
+
+def get_client(provider):
+    """
+    Return the cached client for ``provider``.
+
+    Clients are keyed by provider id and ``updated_at`` so editing a provider
+    (new key, new base URL) transparently replaces its client.
+    """
+    key = (provider.pk, provider.updated_at)
+    client = _clients.get(key)
+    if client is not None:
+        return client
+
+    try:
+        client_class = PROVIDER_CLIENTS[provider.provider_class]
+    except KeyError:
+        raise LookupError(f'No client registered for provider class "{provider.provider_class}"')
+
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is None:
+            for stale_key in [k for k in _clients if k[0] == provider.pk]:
+                stale = _clients.pop(stale_key)
+                asyncio.run_coroutine_threadsafe(stale.aclose(), get_loop())
+            client = _clients[key] = _create_client(client_class, provider)
+    return client
+
+
+def _create_client(client_class, provider):
+    # asyncio primitives must be created on the loop they will be used from.
+    async def create():
+        return client_class(provider)
+    return run(create())
+
+
+def close_all():
+    """Close every pooled client (used on worker shutdown)."""
+    with _clients_lock:
+        clients = list(_clients.values())
+        _clients.clear()
+    for client in clients:
+        run(client.aclose())
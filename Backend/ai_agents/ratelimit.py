@@ -0,0 +1,200 @@
+"""
+Per-provider request and token budgets for agent workers.
+
+Limits come from ``requests_per_minute`` / ``tokens_per_minute`` on
+``LLMProvider`` (account-wide) and ``AIModel`` (per model); every configured
+limit is a token bucket that refills continuously at ``limit / 60`` per
+second. A task is admitted only when all of its buckets can pay its cost at
+once, so concurrent workers never overshoot a provider's limits.
+
+Buckets live in Redis when ``AI_AGENTS_RATELIMIT_REDIS_URL`` is set (shared
+by every worker, checked atomically in a Lua script) and in process memory
+otherwise. A provider 429 puts its buckets into a cooldown that all workers
+honour, instead of each one retrying into the same wall.
+"""
+import json
+import random
+import threading
+import time
+
+from django.conf import settings
+
+_LUA_ACQUIRE = """
+local now = tonumber(ARGV[1])
+local cooldown = tonumber(redis.call('GET', KEYS[1]) or '0')
+if cooldown > now then
+    return tostring(cooldown - now)
+end
+local wait = 0
+local states = {}
+for i = 2, #KEYS do
+    local base = 2 + (i - 2) * 3
+    local capacity = tonumber(ARGV[base])
+    local rate = tonumber(ARGV[base + 1])
+    local cost = tonumber(ARGV[base + 2])
+    local state = redis.call('HMGET', KEYS[i], 'level', 'ts')
+    local level = tonumber(state[1]) or capacity
+    local ts = tonumber(state[2]) or now
+    level = math.min(capacity, level + (now - ts) * rate)
+    states[i] = level
+    if level < cost then
+        wait = math.max(wait, (cost - level) / rate)
+    end
+end
+if wait > 0 then
+    return tostring(wait)
+end
+for i = 2, #KEYS do
+    local base = 2 + (i - 2) * 3
+    local cost = tonumber(ARGV[base + 2])
+    redis.call('HSET', KEYS[i], 'level', states[i] - cost, 'ts', now)
+    redis.call('EXPIRE', KEYS[i], 120)
+end
+return '0'
+"""
+
+
+class Throttled(Exception):
+    """The task cannot run yet; retry after ``delay`` seconds."""
+
+    def __init__(self, delay, reason=''):
+        super().__init__(reason or f'Rate limited; retry in {delay:.1f}s')
+        self.delay = delay
+
+
+# ─── Budgets ─────────────────────────────────────────────────────────────────
+
+def estimate_tokens(agent, input_data):
+    """
+    Rough token cost of one execution: prompt (≈4 characters per token) plus
+    the completion budget (``max_tokens`` from the agent config, otherwise a
+    quarter of the model's context window), capped at the context window.
+    """
+    prompt = len(json.dumps(input_data, ensure_ascii=False)) // 4
+    prompt += len(agent.config.get('system_prompt', '')) // 4
+    context_window = agent.model.context_window
+    completion = agent.config.get('max_tokens')
+    if completion is None:
+        default = getattr(settings, 'AI_AGENTS_DEFAULT_COMPLETION_TOKENS', 1024)
+        completion = min(default, context_window // 4) if context_window else default
+    total = prompt + completion
+    return min(total, context_window) if context_window else total
+
+
+def buckets_for(agent, tokens):
+    """``[(key, capacity, refill_per_second, cost)]`` for every configured limit."""
+    buckets = []
+    for scope, owner in (('provider', agent.model.provider), ('model', agent.model)):
+        for kind, limit, cost in (
+            ('rpm', owner.requests_per_minute, 1),
+            ('tpm', owner.tokens_per_minute, tokens),
+        ):
+            if limit:
+                buckets.append((
+                    f'ai_agents:ratelimit:{scope}:{owner.pk}:{kind}',
+                    limit,
+                    limit / 60.0,
+                    min(cost, limit),
+                ))
+    return buckets
+
+
+def cooldown_key(agent):
+    return f'ai_agents:ratelimit:provider:{agent.model.provider_id}:cooldown'
+
+
+# ─── Backends ────────────────────────────────────────────────────────────────
+
+class LocalBackend:
+    """In-process stand-in for Redis; only coordinates threads of one worker."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._levels = {}
+        self._cooldowns = {}
+
+    def acquire(self, cooldown, buckets):
+        now = time.time()
+        with self._lock:
+            until = self._cooldowns.get(cooldown, 0)
+            if until > now:
+                return until - now
+            wait, levels = 0.0, {}
+            for key, capacity, rate, cost in buckets:
+                level, ts = self._levels.get(key, (capacity, now))
+                level = min(capacity, level + (now - ts) * rate)
+                levels[key] = level
+                if level < cost:
+                    wait = max(wait, (cost - level) / rate)
+            if wait > 0:
+                return wait
+            for key, capacity, rate, cost in buckets:
+                self._levels[key] = (levels[key] - cost, now)
+            return 0.0
+
+    def set_cooldown(self, cooldown, seconds):
+        with self._lock:
+            self._cooldowns[cooldown] = max(self._cooldowns.get(cooldown, 0), time.time() + seconds)
+
+
+class RedisBackend:
+    """Buckets shared by every worker; admission is a single atomic Lua call."""
+
+    def __init__(self, url):
+        import redis
+
+        self._redis = redis.Redis.from_url(url)
+        self._acquire = self._redis.register_script(_LUA_ACQUIRE)
+
+    def acquire(self, cooldown, buckets):
+        keys = [cooldown] + [bucket[0] for bucket in buckets]
+        args = [time.time()]
+        for _, capacity, rate, cost in buckets:
+            args += [capacity, rate, cost]
+        return float(self._acquire(keys=keys, args=args))
+
+    def set_cooldown(self, cooldown, seconds):
+        until = time.time() + seconds
+        current = float(self._redis.get(cooldown) or 0)
+        if until > current:
+            self._redis.set(cooldown, until, ex=max(1, int(seconds) + 1))
+
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def get_backend():
+    global _backend
+    with _backend_lock:
+        if _backend is None:
+            url = getattr(settings, 'AI_AGENTS_RATELIMIT_REDIS_URL', None)
+            _backend = RedisBackend(url) if url else LocalBackend()
+    return _backend
+
+
+# ─── Public API ──────────────────────────────────────────────────────────────
+
+def acquire(agent, input_data):
+    """
+    Reserve budget for one execution. Returns ``0`` when admitted, otherwise
+    the number of seconds to wait before trying again (nothing is reserved).
+    """
+    buckets = buckets_for(agent, estimate_tokens(agent, input_data))
+    return get_backend().acquire(cooldown_key(agent), buckets)
+
+
+def penalize(agent, retry_after=None, attempt=0):
+    """
+    Record a provider 429: pause the provider for every worker and return the
+    delay this task should back off for (exponential with jitter).
+    """
+    delay = retry_after if retry_after is not None else backoff(attempt)
+    get_backend().set_cooldown(cooldown_key(agent), delay)
+    return delay
+
+
+def backoff(attempt):
+    base = getattr(settings, 'AI_AGENTS_RATELIMIT_BACKOFF_BASE', 2.0)
+    cap = getattr(settings, 'AI_AGENTS_RATELIMIT_BACKOFF_MAX', 120.0)
+    return min(cap, base * (2 ** attempt)) * random.uniform(0.5, 1.0)
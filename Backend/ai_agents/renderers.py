@@ -0,0 +1,20 @@
+import json
+
+from rest_framework.renderers import BaseRenderer
+
+
+class EventStreamRenderer(BaseRenderer):
+    """
+    Lets ``text/event-stream`` requests pass content negotiation.
+
+    Successful responses are ``StreamingHttpResponse`` objects that bypass
+    rendering; this only renders error payloads as a single SSE frame.
+    """
+    media_type = 'text/event-stream'
+    format = 'sse'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return f'event: error\ndata: {json.dumps(data)}\n\n'.encode(self.charset)
@@ -0,0 +1,106 @@
+"""
+Content-addressed cache of agent outputs.
+
+The key is a SHA-256 of the canonical JSON of ``AIAgent.config``, the model
+id and ``input_data``, so re-running an agent with identical input returns
+the stored output without calling the provider. Entries live in the
+``agent_responses`` cache alias (``AGENT_RESPONSE_CACHE_URL`` on Redis), each
+with a TTL, which bounds its size with LRU eviction (``MAX_ENTRIES`` locally;
+see the settings for the Redis eviction policy).
+
+Agents opt out with ``"cache": false`` in their ``config``.
+"""
+import hashlib
+import json
+
+from django.conf import settings
+from django.core.cache import caches
+
+CACHE_ALIAS = 'agent_responses'
+
+
+def _cache():
+    return caches[CACHE_ALIAS]
+
+
+def is_enabled(agent):
+    return (
+        getattr(settings, 'AI_AGENTS_RESPONSE_CACHE_ENABLED', True)
+        and agent.config.get('cache', True) is not False
+    )
+
+
+def make_key(agent, input_data):
+    canonical = json.dumps(
+        {'config': agent.config, 'model': agent.model.model_id, 'input': input_data},
+        sort_keys=True,
+        separators=(',', ':'),
+        ensure_ascii=False,
+        default=str,
+    )
+    return 'response:' + hashlib.sha256(canonical.encode()).hexdigest()
+
+
+def _count(name, agent, amount=1):
+    if not amount:
+        return
+    cache = _cache()
+    for key in (f'stats:{name}', f'stats:{name}:{agent.pk}'):
+        cache.add(key, 0, timeout=None)
+        try:
+            cache.incr(key, amount)
+        except ValueError:
+            # Evicted between add() and incr(); counters are best-effort.
+            pass
+
+
+def lookup(agent, input_data, record_miss=True):
+    """
+    Return cached ``output_data`` for this execution, or ``None``.
+
+    Workers re-check the cache with ``record_miss=False`` so a request that
+    already missed at submission time is not counted twice.
+    """
+    if not is_enabled(agent):
+        return None
+    output_data = _cache().get(make_key(agent, input_data))
+    if output_data is not None:
+        _count('hits', agent)
+    elif record_miss:
+        _count('misses', agent)
+    return output_data
+
+
+def lookup_many(agent, inputs):
+    """
+    ``lookup`` for a batch in one round trip: cached ``output_data`` or
+    ``None`` for each of ``inputs``, in order.
+    """
+    if not is_enabled(agent):
+        return [None] * len(inputs)
+    keys = [make_key(agent, input_data) for input_data in inputs]
+    found = _cache().get_many(keys)
+    outputs = [found.get(key) for key in keys]
+    hits = sum(output is not None for output in outputs)
+    _count('hits', agent, hits)
+    _count('misses', agent, len(outputs) - hits)
+    return outputs
+
+
+def store(agent, input_data, output_data):
+    if is_enabled(agent):
+        _cache().set(make_key(agent, input_data), output_data)
+
+
+def stats(agent=None):
+    """Hit/miss counters, globally or for one ``agent``."""
+    suffix = f':{agent.pk}' if agent is not None else ''
+    values = _cache().get_many([f'stats:hits{suffix}', f'stats:misses{suffix}'])
+    hits = values.get(f'stats:hits{suffix}', 0)
+    misses = values.get(f'stats:misses{suffix}', 0)
+    total = hits + misses
+    return {
+        'hits': hits,
+        'misses': misses,
+        'hit_rate': round(hits / total, 4) if total else None,
+    }
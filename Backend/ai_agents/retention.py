@@ -0,0 +1,130 @@
+"""
+Retention for ``AgentTask`` rows.
+
+Finished tasks older than the retention window are copied into
+``AgentTaskArchive`` (summary columns plus a zlib-compressed payload) or into
+a JSONL.gz file with only the summary kept in the database, then deleted.
+Work proceeds in primary-key order, one short transaction per chunk, so no
+lock is held for longer than a single chunk.
+
+A file run writes to ``<file>.partial`` and renames it when it stops. Each
+chunk is appended before its transaction and cut off again if the
+transaction fails, so the file only holds tasks whose deletion committed and
+a re-run never writes a task twice. Tasks of a batch are archived like any other;
+batch progress counts the archive rows (``AgentBatchSerializer``).
+"""
+import gzip
+import json
+import logging
+import os
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.utils import timezone
+
+from .models import AgentTask, AgentTaskArchive
+
+logger = logging.getLogger(__name__)
+
+TERMINAL_STATUSES = ('completed', 'failed')
+
+_FIELDS = (
+    'id', 'agent_id', 'user_id', 'batch_id', 'status',
+    'input_data', 'output_data', 'created_at', 'completed_at',
+)
+
+
+def archive_tasks(days=None, batch_size=None, directory=None, dry_run=False):
+    """
+    Archive finished tasks created more than ``days`` ago.
+
+    With ``directory`` the payloads are written to
+    ``<directory>/agent_tasks_<timestamp>.jsonl.gz`` and archive rows keep
+    only the summary. Returns ``{'archived': n, 'file': path_or_None}``.
+    """
+    days = days if days is not None else getattr(settings, 'AI_AGENTS_RETENTION_DAYS', 30)
+    batch_size = batch_size or getattr(settings, 'AI_AGENTS_RETENTION_BATCH_SIZE', 1000)
+    cutoff = timezone.now() - timedelta(days=days)
+    candidates = AgentTask.objects.filter(status__in=TERMINAL_STATUSES, created_at__lt=cutoff)
+
+    if dry_run:
+        return {'archived': candidates.count(), 'file': None}
+
+    path = partial = None
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(
+            directory, f'agent_tasks_{timezone.now():%Y%m%dT%H%M%S%f}.jsonl.gz'
+        )
+        partial = f'{path}.partial'
+
+    archived = 0
+    last_id = 0
+    try:
+        while True:
+            rows = list(
+                candidates.filter(pk__gt=last_id)
+                .order_by('pk')
+                .values(*_FIELDS)[:batch_size]
+            )
+            if not rows:
+                break
+            last_id = rows[-1]['id']
+            if partial:
+                size = _write_file(partial, rows)
+            try:
+                with transaction.atomic():
+                    AgentTaskArchive.objects.bulk_create(
+                        [_archive_row(row, path) for row in rows],
+                        ignore_conflicts=True,
+                    )
+                    AgentTask.objects.filter(pk__in=[row['id'] for row in rows]).delete()
+            except BaseException:
+                if partial:
+                    _truncate(partial, size)
+                raise
+            archived += len(rows)
+            logger.info('Archived %s agent tasks (up to id %s)', archived, last_id)
+    finally:
+        # Archive rows name ``path``; publish whatever committed, even on error.
+        if partial and os.path.exists(partial):
+            os.replace(partial, path)
+
+    return {'archived': archived, 'file': path if archived else None}
+
+
+def _archive_row(row, path):
+    return AgentTaskArchive(
+        task_id=row['id'],
+        agent_id=row['agent_id'],
+        user_id=row['user_id'],
+        batch_id=row['batch_id'],
+        status=row['status'],
+        payload=None if path else AgentTaskArchive.compress(row['input_data'], row['output_data']),
+        archive_file=path or '',
+        created_at=row['created_at'],
+        completed_at=row['completed_at'],
+    )
+
+
+def _write_file(path, rows):
+    """Append ``rows`` as one gzip member, synced to disk; returns the size before."""
+    size = os.path.getsize(path) if os.path.exists(path) else 0
+    with open(path, 'ab') as raw:
+        with gzip.GzipFile(fileobj=raw, mode='ab') as fh:
+            for row in rows:
+                fh.write(json.dumps(row, cls=DjangoJSONEncoder, separators=(',', ':')).encode())
+                fh.write(b'\n')
+        raw.flush()
+        os.fsync(raw.fileno())
+    return size
+
+
+def _truncate(path, size):
+    """Drop what the last ``_write_file`` appended."""
+    if size:
+        os.truncate(path, size)
+    else:
+        os.remove(path)
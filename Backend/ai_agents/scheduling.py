@@ -0,0 +1,222 @@
+"""
+Priority classes and fair-share dispatch for agent tasks.
+
+``interactive`` tasks (single execute calls) go straight to their own
+queues. ``standard`` and ``bulk`` tasks (batches) are held in the database
+until ``dispatch_fair_share`` releases them: it keeps at most
+``AI_AGENTS_FAIR_SHARE_QUEUE_TARGET`` of them in the broker at a time, splits
+free slots across priority classes by ``AI_AGENTS_PRIORITY_WEIGHTS`` and
+then evenly across the users waiting in each class (max-min fair). One user
+submitting thousands of tasks therefore takes at most their share of the
+bulk workers, and never delays interactive work, which has its own queues.
+
+Users are the only fairness key. Agent tasks carry no brand, and every brand
+belongs to exactly one user, so a brand can never take more than its owner's
+share; splitting that share further between one user's brands would only
+reorder that user's own work.
+
+A released task counts against the target until a worker claims it. If its
+message is lost (a broker restart, a ``memory://`` broker going away), the
+task would hold a slot forever, so tasks still pending
+``AI_AGENTS_FAIR_SHARE_VISIBILITY_TIMEOUT`` seconds after release go back to
+waiting and are released again. A late duplicate message is harmless: only
+one worker wins the claim.
+"""
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Avg, Count, DurationField, ExpressionWrapper, F, Max, Q
+from django.utils import timezone
+
+from .models import AgentTask
+
+logger = logging.getLogger(__name__)
+
+PRIORITIES = [priority for priority, _ in AgentTask.PRIORITY_CHOICES]
+FAIR_SHARE_PRIORITIES = ('standard', 'bulk')
+DISPATCH_LOCK_KEY = 'ai_agents:dispatcher:lock'
+
+
+def weights():
+    return getattr(settings, 'AI_AGENTS_PRIORITY_WEIGHTS', {'standard': 3, 'bulk': 1})
+
+
+def water_fill(capacity, demands, shares=None):
+    """
+    Split ``capacity`` integer slots across ``demands`` in proportion to
+    ``shares`` (default 1 each), never giving a key more than it asked for
+    and handing any unused share to the others.
+    """
+    shares = shares or {}
+    allocation = {key: 0 for key in demands}
+    active = sorted(key for key, demand in demands.items() if demand > 0)
+    while capacity > 0 and active:
+        total_weight = sum(shares.get(key, 1) for key in active)
+        round_capacity = capacity
+        for key in list(active):
+            share = max(1, round_capacity * shares.get(key, 1) // total_weight)
+            grant = min(share, demands[key] - allocation[key], capacity)
+            allocation[key] += grant
+            capacity -= grant
+            if allocation[key] >= demands[key]:
+                active.remove(key)
+            if capacity == 0:
+                break
+    return allocation
+
+
+def visibility_timeout():
+    return getattr(settings, 'AI_AGENTS_FAIR_SHARE_VISIBILITY_TIMEOUT', 60 * 60)
+
+
+def expire_stale(now=None):
+    """Return released tasks nobody claimed in time to waiting. Returns the count."""
+    cutoff = (now or timezone.now()) - timedelta(seconds=visibility_timeout())
+    expired = AgentTask.objects.filter(
+        status='pending', priority__in=FAIR_SHARE_PRIORITIES, queued_at__lt=cutoff,
+    ).update(queued_at=None)
+    if expired:
+        logger.warning('Re-queueing %s agent tasks released before %s but never claimed', expired, cutoff)
+    return expired
+
+
+def request_dispatch():
+    """Run the dispatcher as soon as the surrounding transaction commits."""
+    from .tasks import dispatch_agent_tasks
+
+    transaction.on_commit(dispatch_agent_tasks.delay)
+
+
+def dispatch_fair_share():
+    """
+    Move waiting standard/bulk tasks into the broker, fairly. Returns the
+    number of tasks dispatched. Concurrent calls are serialised by a cache lock.
+    """
+    from . import engine
+
+    if not cache.add(DISPATCH_LOCK_KEY, 1, timeout=30):
+        return 0
+    try:
+        expire_stale()
+        pending = AgentTask.objects.filter(status='pending', priority__in=FAIR_SHARE_PRIORITIES)
+        target = getattr(settings, 'AI_AGENTS_FAIR_SHARE_QUEUE_TARGET', 100)
+        free = target - pending.filter(queued_at__isnull=False).count()
+        if free <= 0:
+            return 0
+
+        waiting = pending.filter(queued_at__isnull=True)
+        backlog = {}
+        for row in waiting.values('priority', 'user').annotate(n=Count('id')):
+            backlog.setdefault(row['priority'], {})[row['user']] = row['n']
+        if not backlog:
+            return 0
+
+        per_class = water_fill(
+            free,
+            {priority: sum(users.values()) for priority, users in backlog.items()},
+            weights(),
+        )
+        task_ids = []
+        for priority, users in backlog.items():
+            for user_id, count in water_fill(per_class[priority], users).items():
+                if count:
+                    task_ids += waiting.filter(priority=priority, user=user_id).order_by(
+                        'created_at', 'id'
+                    ).values_list('id', flat=True)[:count]
+
+        AgentTask.objects.filter(pk__in=task_ids, queued_at__isnull=True).update(
+            queued_at=timezone.now()
+        )
+        tasks = list(AgentTask.objects.filter(pk__in=task_ids).only('id', 'agent_id', 'priority'))
+        for task in tasks:
+            task.agent = engine.resolve_agent(task.agent_id)
+        engine.dispatch_many(tasks)
+        logger.info('Fair-share dispatcher released %s agent tasks', len(tasks))
+        return len(tasks)
+    finally:
+        cache.delete(DISPATCH_LOCK_KEY)
+
+
+# ─── Metrics ─────────────────────────────────────────────────────────────────
+
+def queue_metrics(window_minutes=5):
+    """
+    Queue depth and wait time per priority class.
+
+    ``waiting`` tasks are held back by the fair-share dispatcher, ``queued``
+    tasks sit in the broker, and wait time is ``started_at - created_at`` for
+    tasks claimed in the last ``window_minutes``.
+    """
+    depth = {
+        row['priority']: row
+        for row in AgentTask.objects.filter(status__in=('pending', 'processing'))
+        .values('priority')
+        .annotate(
+            waiting=Count('id', filter=Q(status='pending', queued_at__isnull=True)),
+            queued=Count('id', filter=Q(status='pending', queued_at__isnull=False)),
+            processing=Count('id', filter=Q(status='processing')),
+        )
+    }
+    wait = ExpressionWrapper(F('started_at') - F('created_at'), output_field=DurationField())
+    waits = {
+        row['priority']: row
+        for row in AgentTask.objects.filter(
+            started_at__gte=timezone.now() - timedelta(minutes=window_minutes)
+        )
+        .values('priority')
+        .annotate(avg_wait=Avg(wait), max_wait=Max(wait), started=Count('id'))
+    }
+
+    metrics = {}
+    for priority in PRIORITIES:
+        row = depth.get(priority, {})
+        wait_row = waits.get(priority, {})
+        metrics[priority] = {
+            'waiting': row.get('waiting', 0),
+            'queued': row.get('queued', 0),
+            'processing': row.get('processing', 0),
+            'started_last_window': wait_row.get('started', 0),
+            'avg_wait_seconds': _seconds(wait_row.get('avg_wait')),
+            'max_wait_seconds': _seconds(wait_row.get('max_wait')),
+        }
+    return {
+        'window_minutes': window_minutes,
+        'priorities': metrics,
+        'broker_queues': broker_depths(),
+    }
+
+
+def broker_depths():
+    """
+    Messages waiting in each ``agents.<priority>.<task type>`` broker queue.
+    Best-effort: returns ``{}`` when the broker cannot be inspected (e.g. eager mode).
+    """
+    from syncfloww.celery import app
+
+    from . import engine
+    from .models import AIAgent
+
+    if app.conf.task_always_eager:
+        return {}
+    depths = {}
+    try:
+        with app.connection_for_read() as connection:
+            channel = connection.default_channel
+            for priority in PRIORITIES:
+                for task_type, _ in AIAgent.TASK_TYPES:
+                    queue = f'{engine.QUEUE_PREFIX}.{priority}.{task_type}'
+                    try:
+                        depths[queue] = channel.queue_declare(queue, passive=True).message_count
+                    except Exception:
+                        # Queue not declared yet: no worker or publisher has used it.
+                        channel = connection.channel()
+    except Exception:
+        logger.warning('Could not read broker queue depths', exc_info=True)
+    return depths
+
+
+def _seconds(value):
+    return round(value.total_seconds(), 3) if value is not None else None
@@ -1,5 +1,8 @@
+from django.db.models import Count, IntegerField, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
 from rest_framework import serializers
-from .models import AIAgent, AgentTask
+from .models import AIAgent, AgentBatch, AgentTask, AgentTaskArchive
+from .retention import TERMINAL_STATUSES
 
 class AIAgentSerializer(serializers.ModelSerializer):
     class Meta:
@@ -12,4 +15,62 @@ class AgentTaskSerializer(serializers.ModelSerializer):
     class Meta:
         model = AgentTask
         fields = '__all__'
-        read_only_fields = ['status', 'completed_at', 'output_data', 'created_at']
+        read_only_fields = [
+            'user', 'batch', 'status', 'priority', 'queued_at', 'started_at',
+            'completed_at', 'output_data', 'created_at',
+        ]
+
+
+def _archived_count(status):
+    archived = (
+        AgentTaskArchive.objects.filter(batch_id=OuterRef('pk'), status=status)
+        .order_by().values('batch_id').annotate(n=Count('pk')).values('n')
+    )
+    return Coalesce(Subquery(archived, output_field=IntegerField()), 0)
+
+
+def progress_annotations():
+    """
+    Per-status task counts for ``AgentBatch`` querysets, so a page of batches
+    is serialized from one query instead of one aggregate per batch. Tasks
+    moved out by retention are counted from their archive rows.
+    """
+    return {
+        **{
+            f'{status}_count': Count('tasks', filter=Q(tasks__status=status))
+            for status, _ in AgentTask.STATUS_CHOICES
+        },
+        **{f'{status}_archived': _archived_count(status) for status in TERMINAL_STATUSES},
+    }
+
+
+class AgentBatchSerializer(serializers.ModelSerializer):
+    agent_name = serializers.CharField(source='agent.name', read_only=True)
+    progress = serializers.SerializerMethodField()
+
+    class Meta:
+        model = AgentBatch
+        fields = ['id', 'agent', 'agent_name', 'total', 'progress', 'created_at']
+
+    def get_progress(self, batch):
+        statuses = [status for status, _ in AgentTask.STATUS_CHOICES]
+        if hasattr(batch, f'{statuses[0]}_count'):
+            counts = {status: getattr(batch, f'{status}_count') for status in statuses}
+            archived = {status: getattr(batch, f'{status}_archived') for status in TERMINAL_STATUSES}
+        else:
+            counts = batch.tasks.aggregate(**{
+                status: Count('id', filter=Q(status=status)) for status in statuses
+            })
+            archived = dict(
+                AgentTaskArchive.objects.filter(batch_id=batch.pk).order_by()
+                .values_list('status').annotate(Count('pk'))
+            )
+        for status in TERMINAL_STATUSES:
+            counts[status] += archived.get(status, 0)
+        finished = counts['completed'] + counts['failed']
+        return {
+            **counts,
+            'finished': finished,
+            'percent': round(100 * finished / batch.total, 1) if batch.total else 100.0,
+            'done': finished >= batch.total,
+        }
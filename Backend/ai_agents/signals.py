@@ -0,0 +1,17 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from . import agent_registry
+from .models import AIAgent, AIModel, LLMProvider
+
+
+@receiver(post_save, sender=AIAgent)
+@receiver(post_delete, sender=AIAgent)
+@receiver(post_save, sender=AIModel)
+@receiver(post_delete, sender=AIModel)
+@receiver(post_save, sender=LLMProvider)
+@receiver(post_delete, sender=LLMProvider)
+def invalidate_agent_registry(sender, **kwargs):
+    """Drop cached agent configuration whenever an agent, model or provider changes"""
+    transaction.on_commit(agent_registry.invalidate)
@@ -0,0 +1,214 @@
+"""
+Token relay between agent workers and Server-Sent Events clients.
+
+The worker accumulates provider output in a ``TaskStream`` and periodically
+publishes ``{'text', 'done', 'status'}`` to the shared cache. ``event_stream``
+reads that record and emits only the text past the client's offset, so a
+reconnecting client (``Last-Event-ID`` or ``?offset=``) never re-receives
+text. Event ids are character offsets into the completion.
+"""
+import asyncio
+import json
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+
+from .models import AgentTask
+
+TERMINAL_STATUSES = ('completed', 'failed')
+
+
+def _cache():
+    return caches[getattr(settings, 'AI_AGENTS_STREAM_CACHE', 'default')]
+
+
+def stream_key(task_id):
+    return f'ai_agents:stream:{task_id}'
+
+
+class TaskStream:
+    """Writer side, used by the engine while a provider is streaming."""
+
+    def __init__(self, task_id):
+        self.key = stream_key(task_id)
+        self.text = ''
+        self.ttl = getattr(settings, 'AI_AGENTS_STREAM_TTL', 600)
+        self.flush_interval = getattr(settings, 'AI_AGENTS_STREAM_FLUSH_INTERVAL', 0.05)
+        self._last_flush = 0.0
+
+    async def awrite(self, text):
+        self.text += text
+        if time.monotonic() - self._last_flush >= self.flush_interval:
+            await self.aflush()
+
+    async def aflush(self):
+        self._last_flush = time.monotonic()
+        await _cache().aset(self.key, {'text': self.text, 'done': False}, self.ttl)
+
+    def reset(self):
+        """Discard partial output, e.g. before the task is retried."""
+        self.text = ''
+        _cache().delete(self.key)
+
+    def finish(self, status, output_data):
+        """Publish the terminal state so readers can close their stream."""
+        text = self.text
+        if status == 'completed' and isinstance(output_data, dict):
+            text = output_data.get('result', text)
+        _cache().set(
+            self.key,
+            {'text': text, 'done': True, 'status': status, 'output_data': output_data},
+            self.ttl,
+        )
+
+
+def format_event(event, data, event_id=None):
+    lines = []
+    if event_id is not None:
+        lines.append(f'id: {event_id}')
+    lines.append(f'event: {event}')
+    lines.append(f'data: {json.dumps(data, ensure_ascii=False)}')
+    return '\n'.join(lines) + '\n\n'
+
+
+def _settings():
+    return (
+        getattr(settings, 'AI_AGENTS_STREAM_POLL_INTERVAL', 0.1),
+        getattr(settings, 'AI_AGENTS_STREAM_DB_INTERVAL', 2.0),
+        getattr(settings, 'AI_AGENTS_STREAM_HEARTBEAT', 15.0),
+    )
+
+
+def _task_record(task):
+    """Stream record of a finished task read from the database, else ``None``."""
+    if task['status'] not in TERMINAL_STATUSES:
+        return None
+    output_data = task['output_data'] or {}
+    return {
+        'text': output_data.get('result', '') if task['status'] == 'completed' else '',
+        'done': True,
+        'status': task['status'],
+        'output_data': output_data,
+    }
+
+
+def _frames(record, offset):
+    """SSE frames for ``record`` past ``offset``: ``(frames, offset, done)``."""
+    frames = []
+    text = record['text']
+    if len(text) > offset:
+        frames.append(format_event('token', {'text': text[offset:]}, event_id=len(text)))
+        offset = len(text)
+    if record['done']:
+        frames.append(format_event(
+            'done',
+            {'status': record['status'], 'output_data': record.get('output_data')},
+            event_id=offset,
+        ))
+    return frames, offset, record['done']
+
+
+def _task_values(task_id):
+    return AgentTask.objects.filter(pk=task_id).values('status', 'output_data')
+
+
+_UNCHECKED = object()
+
+
+class _Relay:
+    """
+    Per-connection state of one SSE stream. ``event_stream`` and
+    ``event_stream_sync`` only do the I/O and the sleeping; every poll goes
+    through ``wants_task`` and ``poll``.
+    """
+
+    def __init__(self, task_id, offset, timeout):
+        self.poll_interval, self.db_interval, self.heartbeat = _settings()
+        self.key = stream_key(task_id)
+        self.offset = offset
+        self.deadline = time.monotonic() + timeout
+        self.last_db_check = 0.0
+        self.last_sent = time.monotonic()
+        self.finished = False
+
+    @property
+    def expired(self):
+        return time.monotonic() >= self.deadline
+
+    def wants_task(self, record):
+        """Whether to read the task row: no cache record and the DB interval has passed."""
+        now = time.monotonic()
+        if record is None and now - self.last_db_check >= self.db_interval:
+            self.last_db_check = now
+            return True
+        return False
+
+    def poll(self, record, task=_UNCHECKED):
+        """Frames for one poll of the cache ``record`` (and ``task`` row, if read)."""
+        if task is None:
+            self.finished = True
+            return [format_event('error', {'error': 'Task not found'})]
+        if task is not _UNCHECKED:
+            record = _task_record(task)
+        frames = []
+        if record is not None:
+            frames, self.offset, self.finished = _frames(record, self.offset)
+        now = time.monotonic()
+        if frames:
+            self.last_sent = now
+        elif now - self.last_sent >= self.heartbeat:
+            self.last_sent = now
+            frames = [': keep-alive\n\n']
+        return frames
+
+    def timed_out(self):
+        return format_event('error', {'error': 'Stream timed out'}, event_id=self.offset)
+
+
+async def event_stream(task_id, offset=0):
+    """
+    Yield SSE frames for ``task_id`` starting at character ``offset``.
+
+    The shared cache is polled every ``AI_AGENTS_STREAM_POLL_INTERVAL``; the
+    database is only consulted when the cache holds no record (task still
+    queued, served from elsewhere, or the record expired).
+    """
+    relay = _Relay(task_id, offset, getattr(settings, 'AI_AGENTS_STREAM_TIMEOUT', 300))
+    cache = _cache()
+
+    yield 'retry: 1000\n\n'
+    while not relay.expired:
+        record = await cache.aget(relay.key)
+        task = await _task_values(task_id).afirst() if relay.wants_task(record) else _UNCHECKED
+        for frame in relay.poll(record, task):
+            yield frame
+        if relay.finished:
+            return
+        await asyncio.sleep(relay.poll_interval)
+
+    yield relay.timed_out()
+
+
+def event_stream_sync(task_id, offset=0):
+    """
+    ``event_stream`` for WSGI, where ``StreamingHttpResponse`` would buffer an
+    async iterator to the end before sending anything.
+
+    Each open stream holds a sync worker, so it closes after
+    ``AI_AGENTS_STREAM_WSGI_TIMEOUT`` seconds (below gunicorn's 30s worker
+    timeout) without an error event; ``EventSource`` reconnects with
+    ``Last-Event-ID`` and resumes from there. Serve streams from the ASGI
+    mode to hold them open for long.
+    """
+    relay = _Relay(task_id, offset, getattr(settings, 'AI_AGENTS_STREAM_WSGI_TIMEOUT', 25))
+    cache = _cache()
+
+    yield 'retry: 1000\n\n'
+    while not relay.expired:
+        record = cache.get(relay.key)
+        task = _task_values(task_id).first() if relay.wants_task(record) else _UNCHECKED
+        yield from relay.poll(record, task)
+        if relay.finished:
+            return
+        time.sleep(relay.poll_interval)
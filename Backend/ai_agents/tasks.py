@@ -0,0 +1,63 @@
+import random
+import time
+
+from celery import shared_task
+from celery.signals import worker_process_shutdown
+from django.conf import settings
+
+from . import engine, providers, ratelimit, retention, scheduling
+
+
+@shared_task(
+    bind=True,
+    name='ai_agents.run_agent',
+    acks_late=True,
+    ignore_result=True,
+    max_retries=getattr(settings, 'AI_AGENTS_MAX_THROTTLE_RETRIES', 20),
+)
+def run_agent(self, task_id):
+    """Execute a single ``AgentTask`` on a worker, backing off while rate limited."""
+    if self.request.is_eager:
+        return _run_eager(self, task_id)
+    try:
+        engine.execute(task_id, attempt=self.request.retries)
+    except ratelimit.Throttled as exc:
+        if self.request.retries >= self.max_retries:
+            engine.give_up(task_id, exc)
+            return
+        # Jitter spreads out workers that were throttled at the same moment.
+        raise self.retry(countdown=exc.delay + random.uniform(0, 1))
+
+
+def _run_eager(task, task_id):
+    # Eager (in-process) mode cannot reschedule, so back off inline, which
+    # mirrors the throughput a real worker would see.
+    for attempt in range(task.max_retries + 1):
+        try:
+            engine.execute(task_id, attempt=attempt)
+            return
+        except ratelimit.Throttled as exc:
+            if attempt == task.max_retries:
+                engine.give_up(task_id, exc)
+                return
+            time.sleep(exc.delay + random.uniform(0, 1))
+
+
+@shared_task(name='ai_agents.archive_agent_tasks', ignore_result=True)
+def archive_agent_tasks():
+    """Periodic retention job; see ``CELERY_BEAT_SCHEDULE``."""
+    retention.archive_tasks(directory=getattr(settings, 'AI_AGENTS_ARCHIVE_DIR', None) or None)
+
+
+@shared_task(name='ai_agents.dispatch_agent_tasks', ignore_result=True)
+def dispatch_agent_tasks():
+    """Release waiting batch tasks fairly; runs on beat and after each batch submit."""
+    # Loop so eager mode drains the backlog; with a broker the second pass
+    # finds the queue target reached and stops.
+    while scheduling.dispatch_fair_share():
+        pass
+
+
+@worker_process_shutdown.connect
+def close_provider_clients(**kwargs):
+    providers.close_all()
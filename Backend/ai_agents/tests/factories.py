@@ -0,0 +1,19 @@
+from django.contrib.auth import get_user_model
+
+from ai_agents.models import AIAgent, AIModel, AgentTask, LLMProvider
+
+
+def make_user(email='owner@example.com'):
+    return get_user_model().objects.create_user(email=email, password='s3cret-pass!')
+
+
+def make_agent(name='Captioner', provider_class='openai', **config):
+    provider = LLMProvider.objects.create(name=f'{name} provider', provider_class=provider_class, api_key='sk-test')
+    model = AIModel.objects.create(
+        name=f'{name} model', model_id='test-model', model_type='chat', description='', provider=provider,
+    )
+    return AIAgent.objects.create(name=name, description='', task_type='caption', model=model, config=config)
+
+
+def make_task(agent, user, input_data=None, **fields):
+    return AgentTask.objects.create(agent=agent, user=user, input_data=input_data or {'prompt': 'hi'}, **fields)
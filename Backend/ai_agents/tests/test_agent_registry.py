@@ -0,0 +1,41 @@
+import pickle
+
+from django.core.cache import cache
+from django.test import TestCase
+
+from ai_agents import agent_registry
+
+from .factories import make_agent
+
+
+class AgentRegistryTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.agent = make_agent()
+
+    def setUp(self):
+        cache.clear()
+        agent_registry.invalidate()
+
+    def test_resolves_agents_with_model_and_provider(self):
+        agent = agent_registry.get_active_agent('caption')
+        self.assertEqual(agent.pk, self.agent.pk)
+        with self.assertNumQueries(0):
+            self.assertEqual(agent.model.model_id, 'test-model')
+            self.assertEqual(agent.model.provider.api_key, 'sk-test')
+        self.assertEqual(agent_registry.get_agent(self.agent.pk).pk, self.agent.pk)
+
+    def test_shared_entry_holds_no_credentials(self):
+        agent_registry.get_active_agent('caption')
+        shared = cache.get(f'ai_agents:registry:{cache.get(agent_registry.VERSION_KEY)}')
+        self.assertIsNotNone(shared)
+        self.assertNotIn(b'sk-test', pickle.dumps(shared))
+
+    def test_other_processes_load_providers_locally(self):
+        agent_registry.get_active_agent('caption')
+        # A process with an empty local copy reuses the shared entry and only
+        # queries providers.
+        agent_registry._local = None
+        with self.assertNumQueries(1):
+            agent = agent_registry.get_active_agent('caption')
+        self.assertEqual(agent.model.provider.api_key, 'sk-test')
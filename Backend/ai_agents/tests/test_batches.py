@@ -0,0 +1,107 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from ai_agents import agent_registry, scheduling
+from ai_agents.models import AgentBatch, AgentTask
+from ai_agents.tasks import dispatch_agent_tasks
+
+from .factories import make_agent, make_task, make_user
+
+URL = '/api/ai/agents/caption/execute-batch/'
+
+
+@override_settings(AI_AGENTS_RESPONSE_CACHE_ENABLED=False)
+class ExecuteBatchTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.agent = make_agent()
+        cls.user = make_user()
+
+    def setUp(self):
+        cache.clear()
+        agent_registry.invalidate()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_creates_one_task_per_input_and_dispatches_once(self):
+        inputs = [{'prompt': f'post {i}'} for i in range(3)]
+        with mock.patch.object(dispatch_agent_tasks, 'delay') as delay, \
+                self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(URL, {'inputs': inputs, 'priority': 'standard'}, format='json')
+
+        self.assertEqual(response.status_code, 202, response.content)
+        delay.assert_called_once_with()
+        batch = AgentBatch.objects.get(pk=response.data['id'])
+        self.assertEqual(batch.total, 3)
+        tasks = list(batch.tasks.order_by('pk'))
+        self.assertEqual([task.pk for task in tasks], response.data['task_ids'])
+        self.assertEqual([task.input_data for task in tasks], inputs)
+        self.assertEqual({(task.status, task.priority, task.user_id) for task in tasks},
+                         {('pending', 'standard', self.user.pk)})
+        self.assertEqual(response.data['progress']['pending'], 3)
+
+    def test_rejects_invalid_requests(self):
+        for body, error in (
+            ({'inputs': []}, 'non-empty list'),
+            ({'inputs': {'prompt': 'a'}}, 'non-empty list'),
+            ({'inputs': [{'prompt': 'a'}, 'b']}, '`inputs[1]` must be an object'),
+            ({'inputs': [{'prompt': 'a'}], 'priority': 'interactive'}, '`priority`'),
+        ):
+            with self.subTest(body=body):
+                response = self.client.post(URL, body, format='json')
+                self.assertEqual(response.status_code, 400)
+                self.assertIn(error, response.data['error'])
+        self.assertFalse(AgentBatch.objects.exists())
+
+    @override_settings(AI_AGENTS_BATCH_MAX_SIZE=2)
+    def test_caps_the_batch_size(self):
+        response = self.client.post(URL, {'inputs': [{'n': i} for i in range(3)]}, format='json')
+        self.assertEqual(response.status_code, 400)
+
+    def test_batches_are_released_by_the_fair_share_dispatcher(self):
+        response = self.client.post(URL, {'inputs': [{'n': 1}, {'n': 2}]}, format='json')
+        with mock.patch('ai_agents.engine.dispatch_many') as dispatch_many:
+            self.assertEqual(scheduling.dispatch_fair_share(), 2)
+        (tasks,), _ = dispatch_many.call_args
+        self.assertEqual(sorted(task.pk for task in tasks), response.data['task_ids'])
+        self.assertFalse(AgentTask.objects.filter(queued_at__isnull=True).exists())
+
+
+class BatchProgressTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.agent = make_agent()
+        cls.user = make_user()
+        cls.batches = []
+        for statuses in (['completed', 'failed', 'pending', 'processing'], ['completed', 'completed']):
+            batch = AgentBatch.objects.create(agent=cls.agent, user=cls.user, total=len(statuses))
+            for task_status in statuses:
+                make_task(cls.agent, cls.user, batch=batch, status=task_status)
+            cls.batches.append(batch)
+        AgentBatch.objects.create(agent=cls.agent, user=make_user('other@example.com'), total=1)
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_list_counts_progress_in_one_query(self):
+        with self.assertNumQueries(2):  # page count + annotated page
+            response = self.client.get('/api/ai/batches/')
+        progress = {batch['id']: batch['progress'] for batch in response.data['results']}
+        self.assertEqual(set(progress), {str(batch.pk) for batch in self.batches})
+
+        first, second = (progress[str(batch.pk)] for batch in self.batches)
+        self.assertEqual(
+            first,
+            {'pending': 1, 'processing': 1, 'completed': 1, 'failed': 1,
+             'finished': 2, 'percent': 50.0, 'done': False},
+        )
+        self.assertEqual((second['finished'], second['percent'], second['done']), (2, 100.0, True))
+
+    def test_retrieve(self):
+        response = self.client.get(f'/api/ai/batches/{self.batches[1].pk}/')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.data['progress']['done'])
@@ -0,0 +1,79 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from ai_agents import engine
+from ai_agents.models import AgentTask
+
+from .factories import make_agent, make_task, make_user
+
+
+@override_settings(AI_AGENTS_STREAMING=False, AI_AGENTS_RESPONSE_CACHE_ENABLED=False)
+class TaskStateMachineTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = make_user()
+        cls.agent = make_agent()
+
+    def setUp(self):
+        cache.clear()
+        self.task = make_task(self.agent, self.user)
+
+    def status(self):
+        return AgentTask.objects.values_list('status', flat=True).get(pk=self.task.pk)
+
+    def test_only_one_claim_wins(self):
+        self.assertTrue(engine.claim(self.task.pk))
+        self.assertFalse(engine.claim(self.task.pk))
+        self.assertEqual(self.status(), 'processing')
+
+    def test_complete_requires_processing(self):
+        self.assertFalse(engine.complete(self.task.pk, {'result': 'x'}))
+        self.assertEqual(self.status(), 'pending')
+
+    def test_terminal_states_are_final(self):
+        engine.claim(self.task.pk)
+        self.assertTrue(engine.complete(self.task.pk, {'result': 'x'}))
+        self.assertFalse(engine.fail(self.task.pk, 'late failure'))
+        self.assertFalse(engine.complete(self.task.pk, {'result': 'y'}))
+        self.assertFalse(engine.claim(self.task.pk))
+        task = AgentTask.objects.get(pk=self.task.pk)
+        self.assertEqual(task.status, 'completed')
+        self.assertEqual(task.output_data, {'result': 'x'})
+        self.assertIsNotNone(task.completed_at)
+
+    def test_failed_task_is_not_completed_by_a_late_worker(self):
+        engine.claim(self.task.pk)
+        self.assertTrue(engine.fail(self.task.pk, 'boom'))
+        self.assertFalse(engine.complete(self.task.pk, {'result': 'x'}))
+        task = AgentTask.objects.get(pk=self.task.pk)
+        self.assertEqual(task.status, 'failed')
+        self.assertEqual(task.output_data, {'error': 'boom'})
+
+    def test_released_task_can_be_claimed_again(self):
+        engine.claim(self.task.pk)
+        self.assertTrue(engine.release(self.task.pk))
+        self.assertFalse(engine.complete(self.task.pk, {'result': 'x'}))
+        self.assertTrue(engine.claim(self.task.pk))
+
+    def test_duplicate_delivery_runs_the_task_once(self):
+        with mock.patch.object(engine, 'invoke', return_value={'result': 'ok', 'usage': {}}) as invoke:
+            self.assertEqual(engine.execute(self.task.pk), {'result': 'ok', 'usage': {}})
+            self.assertIsNone(engine.execute(self.task.pk))
+        invoke.assert_called_once()
+        self.assertEqual(self.status(), 'completed')
+
+    def test_execute_skips_a_task_claimed_by_another_worker(self):
+        engine.claim(self.task.pk)
+        with mock.patch.object(engine, 'invoke') as invoke:
+            self.assertIsNone(engine.execute(self.task.pk))
+        invoke.assert_not_called()
+        self.assertEqual(self.status(), 'processing')
+
+    def test_provider_error_fails_the_task(self):
+        with mock.patch.object(engine, 'invoke', side_effect=RuntimeError('provider down')):
+            self.assertIsNone(engine.execute(self.task.pk))
+        task = AgentTask.objects.get(pk=self.task.pk)
+        self.assertEqual(task.status, 'failed')
+        self.assertEqual(task.output_data, {'error': 'provider down'})
@@ -0,0 +1,57 @@
+from datetime import timedelta
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from ai_agents.models import AgentTask
+
+from .factories import make_agent, make_task, make_user
+
+
+class AgentTaskPaginationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = make_user()
+        agent = make_agent()
+        now = timezone.now()
+        tasks = [make_task(agent, cls.user, {'n': n}) for n in range(7)]
+        # Two runs of identical timestamps straddle the page boundaries.
+        for task, minutes in zip(tasks, (5, 4, 4, 4, 4, 2, 1)):
+            AgentTask.objects.filter(pk=task.pk).update(created_at=now - timedelta(minutes=minutes))
+        cls.expected = list(AgentTask.objects.order_by('-created_at', '-id').values_list('pk', flat=True))
+        make_task(agent, make_user('other@example.com'))
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def pages(self, url):
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200, response.content)
+            yield response.data
+            url = response.data['next']
+
+    def test_walks_every_task_once_in_order_without_offsets(self):
+        with CaptureQueriesContext(connection) as queries:
+            pages = list(self.pages('/api/ai/tasks/?page_size=2'))
+        self.assertEqual([task['id'] for page in pages for task in page['results']], self.expected)
+        self.assertEqual(len(pages), 4)
+        self.assertFalse([query['sql'] for query in queries if 'OFFSET' in query['sql'].upper()])
+        self.assertFalse([query['sql'] for query in queries if 'COUNT(' in query['sql'].upper()])
+
+    def test_previous_links_return_the_preceding_page(self):
+        pages = list(self.pages('/api/ai/tasks/?page_size=3'))
+        self.assertIsNone(pages[0]['previous'])
+        back = self.client.get(pages[2]['previous']).data
+        self.assertEqual([task['id'] for task in back['results']], self.expected[3:6])
+        first = self.client.get(back['previous']).data
+        self.assertEqual([task['id'] for task in first['results']], self.expected[:3])
+        self.assertIsNone(first['previous'])
+
+    def test_invalid_cursor(self):
+        # p=nope|x
+        self.assertEqual(self.client.get('/api/ai/tasks/?cursor=cD1ub3BlJTdDeA==').status_code, 404)
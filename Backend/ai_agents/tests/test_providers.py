@@ -0,0 +1,88 @@
+import asyncio
+import time
+
+from django.test import SimpleTestCase, override_settings
+
+from ai_agents import providers
+from ai_agents.models import LLMProvider
+from ai_agents.providers.mock import MockProviderServer
+
+MESSAGES = [{'role': 'system', 'content': 'Be brief.'}, {'role': 'user', 'content': 'hello there'}]
+
+
+class ProviderAdapterTests(SimpleTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = MockProviderServer().start()
+        cls.addClassCleanup(cls.server.stop)
+
+    def setUp(self):
+        self.addCleanup(providers.close_all)
+
+    def provider_client(self, provider_class='openai', pk=1):
+        provider = LLMProvider(
+            pk=pk, provider_class=provider_class, base_url=self.server.url, api_key='sk-test',
+        )
+        return providers.get_client(provider)
+
+    def stream(self, client, model_id='test-model'):
+        async def collect():
+            return [chunk async for chunk in client.stream(model_id, MESSAGES)]
+        return providers.run(collect())
+
+    def test_every_adapter_round_trips(self):
+        for pk, provider_class in enumerate(['openai', 'mistral', 'anthropic', 'google', 'cohere'], 1):
+            with self.subTest(provider_class):
+                client = self.provider_client(provider_class, pk)
+                result = providers.run(client.complete('test-model', MESSAGES))
+                self.assertEqual(result['text'], 'mock response to: hello there')
+                self.assertTrue(result['usage'])
+
+                chunks = self.stream(client)
+                self.assertEqual(''.join(text for text, _ in chunks), 'mock response to: hello there')
+                self.assertTrue(any(usage for _, usage in chunks))
+
+    def test_clients_are_cached_and_reuse_pooled_connections(self):
+        client = self.provider_client()
+        self.assertIs(self.provider_client(), client)
+        connections, requests = self.server.connections, self.server.requests
+        for _ in range(5):
+            providers.run(client.complete('test-model', MESSAGES))
+        self.assertEqual(self.server.requests - requests, 5)
+        self.assertLessEqual(self.server.connections - connections, 1)
+
+    def test_http_errors_are_mapped(self):
+        client = self.provider_client()
+        with self.assertRaises(providers.RateLimitError) as raised:
+            providers.run(client.complete('mock-429', MESSAGES))
+        self.assertEqual(raised.exception.retry_after, 1.0)
+        with self.assertRaises(providers.RateLimitError):
+            self.stream(client, 'mock-429')
+
+        client.http.headers['X-Mock-Status'] = '503'
+        with self.assertRaises(providers.ProviderError) as raised:
+            providers.run(client.complete('test-model', MESSAGES))
+        self.assertEqual(raised.exception.status_code, 503)
+
+    @override_settings(AI_PROVIDER_LIMITS={'default': {'timeout': 0.2}})
+    def test_timeouts_become_provider_errors(self):
+        client = self.provider_client()
+        client.http.headers['X-Mock-Delay'] = '1'
+        with self.assertRaisesMessage(providers.ProviderError, 'timed out'):
+            providers.run(client.complete('test-model', MESSAGES))
+        with self.assertRaisesMessage(providers.ProviderError, 'timed out'):
+            self.stream(client)
+
+    @override_settings(AI_PROVIDER_LIMITS={'default': {'max_concurrency': 2}})
+    def test_in_flight_requests_are_capped(self):
+        client = self.provider_client()
+        client.http.headers['X-Mock-Delay'] = '0.2'
+
+        async def burst():
+            return await asyncio.gather(*(client.complete('test-model', MESSAGES) for _ in range(6)))
+
+        started = time.monotonic()
+        self.assertEqual(len(providers.run(burst())), 6)
+        # Three waves of two; unbounded, all six would finish in one delay.
+        self.assertGreaterEqual(time.monotonic() - started, 0.55)
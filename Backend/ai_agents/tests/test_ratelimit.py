@@ -0,0 +1,96 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from ai_agents import engine, ratelimit
+from ai_agents.models import AgentTask
+
+from .factories import make_agent, make_task, make_user
+
+
+class LocalBackendTests(SimpleTestCase):
+    def setUp(self):
+        self.backend = ratelimit.LocalBackend()
+        self.clock = mock.patch('ai_agents.ratelimit.time.time', return_value=1000.0)
+        self.now = self.clock.start()
+        self.addCleanup(self.clock.stop)
+
+    def test_admits_until_the_bucket_is_empty(self):
+        buckets = [('rpm', 2, 2 / 60, 1)]
+        self.assertEqual(self.backend.acquire('cooldown', buckets), 0)
+        self.assertEqual(self.backend.acquire('cooldown', buckets), 0)
+        self.assertAlmostEqual(self.backend.acquire('cooldown', buckets), 30.0)
+
+    def test_refills_over_time(self):
+        buckets = [('rpm', 1, 1 / 60, 1)]
+        self.backend.acquire('cooldown', buckets)
+        self.now.return_value = 1030.0
+        self.assertAlmostEqual(self.backend.acquire('cooldown', buckets), 30.0)
+        self.now.return_value = 1060.0
+        self.assertEqual(self.backend.acquire('cooldown', buckets), 0)
+
+    def test_reserves_all_buckets_or_none(self):
+        rpm, tpm = ('rpm', 10, 10 / 60, 1), ('tpm', 100, 100 / 60, 80)
+        self.assertEqual(self.backend.acquire('cooldown', [rpm, tpm]), 0)
+        self.assertGreater(self.backend.acquire('cooldown', [rpm, tpm]), 0)
+        # The refused attempt did not take a request from the rpm bucket.
+        self.assertEqual(self.backend._levels['rpm'][0], 9)
+
+    def test_cooldown_blocks_every_bucket(self):
+        self.backend.set_cooldown('cooldown', 5)
+        self.assertAlmostEqual(self.backend.acquire('cooldown', []), 5.0)
+        self.now.return_value = 1006.0
+        self.assertEqual(self.backend.acquire('cooldown', []), 0)
+
+
+class BudgetTests(TestCase):
+    def test_estimate_is_capped_by_the_context_window(self):
+        agent = make_agent(max_tokens=500)
+        input_data = {'prompt': 'x' * 400}  # 414 characters of JSON
+        self.assertEqual(ratelimit.estimate_tokens(agent, input_data), 414 // 4 + 500)
+        agent.model.context_window = 300
+        self.assertEqual(ratelimit.estimate_tokens(agent, input_data), 300)
+
+    def test_buckets_cover_configured_limits_only(self):
+        agent = make_agent()
+        agent.model.provider.requests_per_minute = 60
+        agent.model.tokens_per_minute = 1000
+        keys = [key for key, *_ in ratelimit.buckets_for(agent, 5000)]
+        self.assertEqual(keys, [
+            f'ai_agents:ratelimit:provider:{agent.model.provider_id}:rpm',
+            f'ai_agents:ratelimit:model:{agent.model_id}:tpm',
+        ])
+        # A cost above the bucket size is capped so the task can ever run.
+        self.assertEqual(ratelimit.buckets_for(agent, 5000)[1][3], 1000)
+
+
+@override_settings(AI_AGENTS_STREAMING=False, AI_AGENTS_RESPONSE_CACHE_ENABLED=False)
+class EngineAdmissionTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = make_user()
+        cls.agent = make_agent()
+
+    def setUp(self):
+        cache.clear()
+        patcher = mock.patch.object(ratelimit, '_backend', ratelimit.LocalBackend())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_throttled_task_stays_pending(self):
+        task = make_task(self.agent, self.user)
+        with mock.patch.object(ratelimit, 'acquire', return_value=12.0), \
+                mock.patch.object(engine, 'invoke') as invoke:
+            with self.assertRaises(ratelimit.Throttled) as raised:
+                engine.execute(task.pk)
+        self.assertEqual(raised.exception.delay, 12.0)
+        invoke.assert_not_called()
+        self.assertEqual(AgentTask.objects.get(pk=task.pk).status, 'pending')
+
+    def test_losing_the_claim_spends_no_budget(self):
+        task = make_task(self.agent, self.user)
+        with mock.patch.object(engine, 'claim', return_value=False), \
+                mock.patch.object(ratelimit, 'acquire') as acquire:
+            self.assertIsNone(engine.execute(task.pk))
+        acquire.assert_not_called()
@@ -0,0 +1,60 @@
+from django.core.cache import caches
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from ai_agents import agent_registry, response_cache
+from ai_agents.models import AgentTask
+
+from .factories import make_agent, make_user
+
+
+class ResponseCacheTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.agent = make_agent(system_prompt='Write captions')
+
+    def setUp(self):
+        caches[response_cache.CACHE_ALIAS].clear()
+
+    def test_key_covers_config_model_and_input(self):
+        key = response_cache.make_key(self.agent, {'prompt': 'a'})
+        self.assertEqual(key, response_cache.make_key(self.agent, {'prompt': 'a'}))
+        self.assertNotEqual(key, response_cache.make_key(self.agent, {'prompt': 'b'}))
+        self.agent.config = {'system_prompt': 'Write scripts'}
+        self.assertNotEqual(key, response_cache.make_key(self.agent, {'prompt': 'a'}))
+
+    def test_store_then_lookup_counts_hits_and_misses(self):
+        self.assertIsNone(response_cache.lookup(self.agent, {'prompt': 'a'}))
+        response_cache.store(self.agent, {'prompt': 'a'}, {'result': 'A'})
+        self.assertEqual(response_cache.lookup(self.agent, {'prompt': 'a'}), {'result': 'A'})
+        self.assertIsNone(response_cache.lookup(self.agent, {'prompt': 'b'}, record_miss=False))
+        self.assertEqual(response_cache.stats(self.agent), {'hits': 1, 'misses': 1, 'hit_rate': 0.5})
+
+    def test_lookup_many_keeps_input_order(self):
+        response_cache.store(self.agent, {'prompt': 'b'}, {'result': 'B'})
+        outputs = response_cache.lookup_many(self.agent, [{'prompt': 'a'}, {'prompt': 'b'}, {'prompt': 'c'}])
+        self.assertEqual(outputs, [None, {'result': 'B'}, None])
+        self.assertEqual(response_cache.stats(), {'hits': 1, 'misses': 2, 'hit_rate': 0.3333})
+
+    def test_agents_can_opt_out(self):
+        agent = make_agent(name='Uncached', cache=False)
+        response_cache.store(agent, {'prompt': 'a'}, {'result': 'A'})
+        self.assertIsNone(response_cache.lookup(agent, {'prompt': 'a'}))
+        self.assertEqual(response_cache.lookup_many(agent, [{'prompt': 'a'}]), [None])
+
+    def test_batch_completes_cached_inputs_without_queueing(self):
+        user = make_user()
+        agent_registry.invalidate()
+        response_cache.store(self.agent, {'prompt': 'a'}, {'result': 'A'})
+        client = APIClient()
+        client.force_authenticate(user)
+        response = client.post(
+            '/api/ai/agents/caption/execute-batch/',
+            {'inputs': [{'prompt': 'a'}, {'prompt': 'b'}], 'priority': 'bulk'},
+            format='json',
+        )
+        self.assertEqual(response.status_code, 202, response.content)
+        tasks = AgentTask.objects.in_bulk(response.data['task_ids'])
+        first, second = (tasks[pk] for pk in response.data['task_ids'])
+        self.assertEqual((first.status, first.output_data), ('completed', {'result': 'A'}))
+        self.assertEqual((second.status, second.priority), ('pending', 'bulk'))
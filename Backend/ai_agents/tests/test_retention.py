@@ -0,0 +1,109 @@
+import gzip
+import json
+import os
+import shutil
+import tempfile
+from datetime import timedelta
+from unittest import mock
+
+from django.db import DatabaseError
+from django.db.models.query import QuerySet
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from ai_agents import retention
+from ai_agents.models import AgentBatch, AgentTask, AgentTaskArchive
+
+from .factories import make_agent, make_task, make_user
+
+
+class ArchiveTasksTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = make_user()
+        cls.agent = make_agent()
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+
+    def make_old(self, count, days=40, **fields):
+        fields.setdefault('status', 'completed')
+        fields.setdefault('output_data', {'result': 'ok'})
+        tasks = [make_task(self.agent, self.user, {'n': n}, **fields) for n in range(count)]
+        AgentTask.objects.filter(pk__in=[task.pk for task in tasks]).update(
+            created_at=timezone.now() - timedelta(days=days),
+        )
+        return [task.pk for task in tasks]
+
+    def read(self, path):
+        with gzip.open(path, 'rt') as fh:
+            return [json.loads(line)['id'] for line in fh]
+
+    def test_archives_old_finished_tasks_only(self):
+        old = self.make_old(3)
+        kept = [*self.make_old(1, status='pending'), *self.make_old(1, days=5)]
+
+        self.assertEqual(retention.archive_tasks(days=30, dry_run=True), {'archived': 3, 'file': None})
+        self.assertEqual(retention.archive_tasks(days=30, batch_size=2), {'archived': 3, 'file': None})
+
+        self.assertEqual(sorted(AgentTask.objects.values_list('pk', flat=True)), kept)
+        archive = AgentTaskArchive.objects.get(task_id=old[0])
+        self.assertEqual(archive.get_payload(), {'input_data': {'n': 0}, 'output_data': {'result': 'ok'}})
+
+    def test_file_holds_each_task_once(self):
+        old = self.make_old(5)
+        result = retention.archive_tasks(days=30, batch_size=2, directory=self.directory)
+
+        self.assertEqual(self.read(result['file']), old)
+        self.assertEqual(os.listdir(self.directory), [os.path.basename(result['file'])])
+        self.assertEqual(set(AgentTaskArchive.objects.values_list('archive_file', flat=True)), {result['file']})
+        self.assertIsNone(AgentTaskArchive.objects.get(task_id=old[0]).get_payload())
+
+    def test_failed_chunk_is_cut_from_the_file_and_rerun_once(self):
+        old = self.make_old(4)
+        real_delete = QuerySet.delete
+        calls = []
+
+        def flaky_delete(queryset):
+            calls.append(1)
+            if len(calls) == 2:
+                raise DatabaseError('deadlock')
+            return real_delete(queryset)
+
+        with mock.patch.object(QuerySet, 'delete', flaky_delete):
+            with self.assertRaises(DatabaseError):
+                retention.archive_tasks(days=30, batch_size=2, directory=self.directory)
+        (first_file,) = os.listdir(self.directory)
+        self.assertEqual(self.read(os.path.join(self.directory, first_file)), old[:2])
+
+        result = retention.archive_tasks(days=30, batch_size=2, directory=self.directory)
+        self.assertEqual(self.read(result['file']), old[2:])
+        self.assertFalse(AgentTask.objects.exists())
+
+
+class ArchivedBatchProgressTests(TestCase):
+    def test_archived_tasks_still_count_towards_progress(self):
+        user, agent = make_user(), make_agent()
+        batch = AgentBatch.objects.create(agent=agent, user=user, total=3)
+        for task_status in ('completed', 'failed', 'pending'):
+            make_task(agent, user, batch=batch, status=task_status)
+        AgentTask.objects.filter(batch=batch).update(created_at=timezone.now() - timedelta(days=40))
+        retention.archive_tasks(days=30)
+        self.assertEqual(AgentTask.objects.filter(batch=batch).count(), 1)
+
+        client = APIClient()
+        client.force_authenticate(user)
+        for url in ('/api/ai/batches/', f'/api/ai/batches/{batch.pk}/'):
+            with self.subTest(url=url):
+                data = client.get(url).data
+                progress = (data['results'][0] if 'results' in data else data)['progress']
+                self.assertEqual(
+                    (progress['completed'], progress['failed'], progress['pending'], progress['finished']),
+                    (1, 1, 1, 2),
+                )
+                self.assertFalse(progress['done'])
+
+        AgentTask.objects.filter(batch=batch).update(status='completed')
+        self.assertTrue(client.get(f'/api/ai/batches/{batch.pk}/').data['progress']['done'])
@@ -0,0 +1,67 @@
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+
+from ai_agents import agent_registry, scheduling
+from ai_agents.models import AgentTask
+
+from .factories import make_agent, make_task, make_user
+
+
+class WaterFillTests(SimpleTestCase):
+    def test_splits_evenly_and_redistributes_unused_share(self):
+        self.assertEqual(scheduling.water_fill(10, {'a': 2, 'b': 50, 'c': 50}), {'a': 2, 'b': 4, 'c': 4})
+
+    def test_honours_shares(self):
+        self.assertEqual(
+            scheduling.water_fill(8, {'standard': 100, 'bulk': 100}, {'standard': 3, 'bulk': 1}),
+            {'standard': 6, 'bulk': 2},
+        )
+
+    def test_never_exceeds_capacity_or_demand(self):
+        allocation = scheduling.water_fill(3, {'a': 5, 'b': 5, 'c': 5, 'd': 5})
+        self.assertEqual(sum(allocation.values()), 3)
+        self.assertEqual(scheduling.water_fill(10, {'a': 1, 'b': 0}), {'a': 1, 'b': 0})
+
+
+@override_settings(AI_AGENTS_FAIR_SHARE_QUEUE_TARGET=4)
+class FairShareDispatchTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.agent = make_agent()
+        cls.heavy = make_user('heavy@example.com')
+        cls.light = make_user('light@example.com')
+
+    def setUp(self):
+        cache.clear()
+        agent_registry.invalidate()
+
+    def queued(self, user):
+        return AgentTask.objects.filter(user=user, queued_at__isnull=False).count()
+
+    def test_users_share_the_queue_target(self):
+        for _ in range(10):
+            make_task(self.agent, self.heavy, priority='bulk')
+        make_task(self.agent, self.light, priority='bulk')
+        self.assertEqual(scheduling.dispatch_fair_share(), 4)
+        self.assertEqual((self.queued(self.heavy), self.queued(self.light)), (3, 1))
+        # The target is reached until workers claim something.
+        self.assertEqual(scheduling.dispatch_fair_share(), 0)
+
+    def test_unclaimed_tasks_are_released_again_after_the_visibility_timeout(self):
+        stale = timezone.now() - timedelta(seconds=scheduling.visibility_timeout() + 1)
+        for _ in range(4):
+            make_task(self.agent, self.heavy, priority='bulk', queued_at=stale)
+        make_task(self.agent, self.light, priority='bulk')
+        with self.assertLogs('ai_agents.scheduling', 'WARNING'):
+            self.assertEqual(scheduling.dispatch_fair_share(), 4)
+        self.assertEqual(self.queued(self.light), 1)
+        self.assertFalse(AgentTask.objects.filter(queued_at__lte=stale).exists())
+
+    def test_recently_released_tasks_keep_their_slot(self):
+        for _ in range(4):
+            make_task(self.agent, self.heavy, priority='bulk', queued_at=timezone.now())
+        make_task(self.agent, self.light, priority='bulk')
+        self.assertEqual(scheduling.dispatch_fair_share(), 0)
@@ -0,0 +1,77 @@
+from asgiref.sync import async_to_sync
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from ai_agents import streams
+
+from .factories import make_agent, make_task, make_user
+
+
+@override_settings(AI_AGENTS_STREAM_POLL_INTERVAL=0, AI_AGENTS_STREAM_DB_INTERVAL=0)
+class SyncEventStreamTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = make_user()
+        cls.agent = make_agent()
+
+    def setUp(self):
+        cache.clear()
+
+    def test_relays_text_past_the_offset_then_done(self):
+        task = make_task(self.agent, self.user)
+        cache.set(streams.stream_key(task.pk), {
+            'text': 'Hello world', 'done': True, 'status': 'completed', 'output_data': {'result': 'Hello world'},
+        })
+        frames = list(streams.event_stream_sync(task.pk, offset=6))
+        self.assertEqual(frames[0], 'retry: 1000\n\n')
+        self.assertIn('event: token\ndata: {"text": "world"}', frames[1])
+        self.assertTrue(frames[1].startswith('id: 11\n'))
+        self.assertIn('event: done', frames[2])
+        self.assertEqual(len(frames), 3)
+
+    def test_falls_back_to_the_database(self):
+        task = make_task(self.agent, self.user, status='failed', output_data={'error': 'boom'})
+        frames = list(streams.event_stream_sync(task.pk))
+        self.assertIn('"status": "failed"', frames[-1])
+
+    @override_settings(AI_AGENTS_STREAM_WSGI_TIMEOUT=0.05)
+    def test_closes_without_error_at_the_wsgi_timeout(self):
+        task = make_task(self.agent, self.user)
+        frames = list(streams.event_stream_sync(task.pk))
+        self.assertEqual(frames, ['retry: 1000\n\n'])
+
+    def test_async_stream_sends_the_same_frames(self):
+        task = make_task(self.agent, self.user, status='completed', output_data={'result': 'Hello'})
+
+        @async_to_sync
+        async def collect():
+            return [frame async for frame in streams.event_stream(task.pk)]
+
+        self.assertEqual(collect(), list(streams.event_stream_sync(task.pk)))
+
+    @override_settings(AI_AGENTS_STREAM_TIMEOUT=0.05, AI_AGENTS_STREAM_HEARTBEAT=0)
+    def test_async_stream_heartbeats_then_times_out(self):
+        task = make_task(self.agent, self.user)
+
+        @async_to_sync
+        async def collect():
+            return [frame async for frame in streams.event_stream(task.pk)]
+
+        frames = collect()
+        self.assertIn(': keep-alive\n\n', frames)
+        self.assertIn('event: error', frames[-1])
+
+    def test_unknown_task(self):
+        frames = list(streams.event_stream_sync(0))
+        self.assertIn('Task not found', frames[-1])
+
+    def test_view_streams_synchronously_under_wsgi(self):
+        task = make_task(self.agent, self.user, status='completed', output_data={'result': 'done'})
+        client = APIClient()
+        client.force_authenticate(self.user)
+        response = client.get(f'/api/ai/tasks/{task.pk}/stream/', HTTP_ACCEPT='text/event-stream')
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.is_async)
+        body = b''.join(response.streaming_content).decode()
+        self.assertIn('event: done', body)
@@ -1,10 +1,11 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import AIAgentViewSet, AgentTaskViewSet
+from .views import AIAgentViewSet, AgentBatchViewSet, AgentTaskViewSet
 
 router = DefaultRouter()
 router.register(r'agents', AIAgentViewSet, basename='agent')
 router.register(r'tasks', AgentTaskViewSet, basename='task')
+router.register(r'batches', AgentBatchViewSet, basename='batch')
 
 urlpatterns = [
     path('', include(router.urls)),
@@ -1,11 +1,20 @@
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.db import transaction
+from django.http import StreamingHttpResponse
+from django.utils import timezone
 from rest_framework import viewsets, permissions, status
 from rest_framework.decorators import action
+from rest_framework.renderers import JSONRenderer
 from rest_framework.response import Response
 from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
 
-from .models import AIAgent, AgentTask
-from .serializers import AIAgentSerializer, AgentTaskSerializer
+from . import agent_registry, engine, response_cache, scheduling, streams
+from .models import AIAgent, AgentBatch, AgentTask
+from .pagination import AgentTaskCursorPagination
+from .renderers import EventStreamRenderer
+from .serializers import AIAgentSerializer, AgentBatchSerializer, AgentTaskSerializer, progress_annotations
 
 
 _agent_example = {
@@ -25,6 +34,23 @@ _task_example = {
     'created_at': '2024-06-01T09:00:00Z',
 }
 
+_batch_example = {
+    'id': '6f1c2b9e-8a4d-4c1e-9d7a-2f3b4c5d6e7f',
+    'agent': 1,
+    'agent_name': 'Caption Writer',
+    'total': 3,
+    'progress': {
+        'pending': 1,
+        'processing': 1,
+        'completed': 1,
+        'failed': 0,
+        'finished': 1,
+        'percent': 33.3,
+        'done': False,
+    },
+    'created_at': '2024-06-01T09:00:00Z',
+}
+
 
 class AIAgentViewSet(viewsets.ReadOnlyModelViewSet):
     """
@@ -69,7 +95,8 @@ class AIAgentViewSet(viewsets.ReadOnlyModelViewSet):
         operation_description=(
             'Creates and queues a new task for the agent matching `type`.\n\n'
             'The task is processed asynchronously. '
-            'Poll `GET /api/ai/tasks/{id}/` to check progress.\n\n'
+            'Stream tokens from `GET /api/ai/tasks/{id}/stream/` or '
+            'poll `GET /api/ai/tasks/{id}/` to check progress.\n\n'
             '**Common agent types:** `content_writing`, `image_generation`, `caption_generator`'
         ),
         tags=['AI Agents'],
@@ -92,6 +119,10 @@ class AIAgentViewSet(viewsets.ReadOnlyModelViewSet):
             },
         ),
         responses={
+            200: openapi.Response(
+                'Identical execution served from the response cache; task is already completed',
+                examples={'application/json': {**_task_example, 'status': 'completed'}},
+            ),
             202: openapi.Response(
                 'Task accepted and queued',
                 examples={'application/json': _task_example},
@@ -105,21 +136,178 @@ class AIAgentViewSet(viewsets.ReadOnlyModelViewSet):
     @action(detail=False, methods=['post'], url_path='(?P<type>[^/.]+)/execute')
     def execute(self, request, type=None):
         """Dispatch a task to the matching agent type."""
-        agent = AIAgent.objects.filter(task_type=type, is_active=True).first()
+        agent = agent_registry.get_active_agent(type)
         if not agent:
             return Response(
                 {'error': 'Agent not found for this type'},
                 status=status.HTTP_404_NOT_FOUND,
             )
+        cached_output = response_cache.lookup(agent, request.data)
+        if cached_output is not None:
+            task = engine.create_completed(agent, request.data, cached_output, user=request.user)
+            return Response(AgentTaskSerializer(task).data, status=status.HTTP_200_OK)
+
         task = AgentTask.objects.create(
             agent=agent,
+            user=request.user,
             input_data=request.data,
             status='pending',
+            priority='interactive',
+            queued_at=timezone.now(),
         )
-        # Uncomment when Celery is configured:
-        # run_agent.delay(task.id)
+        engine.dispatch(task)
         return Response(AgentTaskSerializer(task).data, status=status.HTTP_202_ACCEPTED)
 
+    @swagger_auto_schema(
+        operation_summary='Execute an AI agent on many inputs',
+        operation_description=(
+            'Creates one task per input in a single bulk insert and queues them together.\n\n'
+            'Inputs already answered by the response cache are recorded as completed '
+            'immediately. The rest run at `priority` `standard` or `bulk` (default): they are '
+            'released by the fair-share dispatcher, which splits worker capacity across '
+            'users so one large batch cannot starve others.\n\n'
+            'Track aggregate progress with `GET /api/ai/batches/{id}/`; '
+            'individual tasks are listed in `task_ids`.'
+        ),
+        tags=['AI Agents'],
+        manual_parameters=[
+            openapi.Parameter(
+                'type',
+                openapi.IN_PATH,
+                description='Agent task type identifier',
+                type=openapi.TYPE_STRING,
+                example='caption',
+            )
+        ],
+        request_body=openapi.Schema(
+            type=openapi.TYPE_OBJECT,
+            required=['inputs'],
+            properties={
+                'inputs': openapi.Schema(
+                    type=openapi.TYPE_ARRAY,
+                    items=openapi.Schema(type=openapi.TYPE_OBJECT),
+                    description='One input object per task (same shape as `execute`).',
+                ),
+                'priority': openapi.Schema(
+                    type=openapi.TYPE_STRING,
+                    enum=['standard', 'bulk'],
+                    default='bulk',
+                    description='Scheduling class; `standard` gets 3× the share of `bulk`.',
+                ),
+            },
+            example={
+                'inputs': [{'topic': 'Summer sale'}, {'topic': 'New arrivals'}],
+                'priority': 'standard',
+            },
+        ),
+        responses={
+            202: openapi.Response(
+                'Batch accepted and queued',
+                examples={'application/json': {**_batch_example, 'task_ids': [42, 43, 44]}},
+            ),
+            400: openapi.Response(
+                'Invalid inputs',
+                examples={'application/json': {'error': '`inputs` must be a non-empty list'}},
+            ),
+            404: openapi.Response(
+                'No active agent found for this type',
+                examples={'application/json': {'error': 'Agent not found for this type'}},
+            ),
+        },
+    )
+    @action(detail=False, methods=['post'], url_path='(?P<type>[^/.]+)/execute-batch')
+    def execute_batch(self, request, type=None):
+        """Create and enqueue one task per input with a single INSERT."""
+        agent = agent_registry.get_active_agent(type)
+        if not agent:
+            return Response(
+                {'error': 'Agent not found for this type'},
+                status=status.HTTP_404_NOT_FOUND,
+            )
+        inputs = request.data.get('inputs') if isinstance(request.data, dict) else None
+        if not isinstance(inputs, list) or not inputs:
+            return Response(
+                {'error': '`inputs` must be a non-empty list'},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        invalid = next((index for index, item in enumerate(inputs) if not isinstance(item, dict)), None)
+        if invalid is not None:
+            return Response(
+                {'error': f'`inputs[{invalid}]` must be an object'},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        priority = request.data.get('priority', 'bulk')
+        if priority not in scheduling.FAIR_SHARE_PRIORITIES:
+            return Response(
+                {'error': '`priority` must be "standard" or "bulk"'},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        max_size = getattr(settings, 'AI_AGENTS_BATCH_MAX_SIZE', 1000)
+        if len(inputs) > max_size:
+            return Response(
+                {'error': f'A batch may contain at most {max_size} inputs'},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        # One cache round trip for the whole batch, outside the transaction.
+        cached_outputs = response_cache.lookup_many(agent, inputs)
+        with transaction.atomic():
+            batch = AgentBatch.objects.create(agent=agent, user=request.user, total=len(inputs))
+            tasks = []
+            for input_data, cached_output in zip(inputs, cached_outputs):
+                if cached_output is not None:
+                    tasks.append(AgentTask(
+                        agent=agent,
+                        user=request.user,
+                        batch=batch,
+                        input_data=input_data,
+                        output_data=cached_output,
+                        status='completed',
+                        completed_at=timezone.now(),
+                    ))
+                else:
+                    tasks.append(AgentTask(
+                        agent=agent,
+                        user=request.user,
+                        batch=batch,
+                        input_data=input_data,
+                        priority=priority,
+                    ))
+            AgentTask.objects.bulk_create(tasks, batch_size=500)
+            scheduling.request_dispatch()
+
+        data = AgentBatchSerializer(batch).data
+        data['task_ids'] = [task.pk for task in tasks]
+        return Response(data, status=status.HTTP_202_ACCEPTED)
+
+    @swagger_auto_schema(
+        operation_summary='Response cache statistics',
+        operation_description=(
+            'Hit/miss counters for the agent response cache. '
+            'Pass `?agent=<id>` for a single agent. Staff only.'
+        ),
+        tags=['AI Agents'],
+        responses={
+            200: openapi.Response(
+                'Cache counters',
+                examples={'application/json': {'hits': 120, 'misses': 380, 'hit_rate': 0.24}},
+            ),
+        },
+    )
+    @action(detail=False, methods=['get'], url_path='cache-stats',
+            permission_classes=[permissions.IsAdminUser])
+    def cache_stats(self, request):
+        """Return response cache hit/miss counters."""
+        agent = None
+        if request.query_params.get('agent'):
+            agent = AIAgent.objects.filter(pk=request.query_params['agent']).first()
+            if agent is None:
+                return Response(
+                    {'error': 'Agent not found'},
+                    status=status.HTTP_404_NOT_FOUND,
+                )
+        return Response(response_cache.stats(agent))
+
 
 class AgentTaskViewSet(viewsets.ReadOnlyModelViewSet):
     """
@@ -130,14 +318,24 @@ class AgentTaskViewSet(viewsets.ReadOnlyModelViewSet):
     """
     serializer_class = AgentTaskSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = AgentTaskCursorPagination
     swagger_tags = ['AI Agents']
 
     def get_queryset(self):
-        return AgentTask.objects.all()
+        queryset = AgentTask.objects.filter(user=self.request.user).select_related('agent')
+        task_status = self.request.query_params.get('status')
+        if task_status:
+            queryset = queryset.filter(status=task_status)
+        return queryset
 
     @swagger_auto_schema(
         operation_summary='List agent tasks',
-        operation_description='Returns all agent tasks. Filter by status using `?status=pending|running|completed|failed`.',
+        operation_description=(
+            'Returns the authenticated user\'s agent tasks, newest first. '
+            'Filter by status using `?status=pending|processing|completed|failed`.\n\n'
+            'Results are cursor-paginated: follow the `next`/`previous` links '
+            '(optionally with `?page_size=`, max 100).'
+        ),
         tags=['AI Agents'],
         manual_parameters=[
             openapi.Parameter(
@@ -145,25 +343,36 @@ class AgentTaskViewSet(viewsets.ReadOnlyModelViewSet):
                 openapi.IN_QUERY,
                 description='Filter tasks by status',
                 type=openapi.TYPE_STRING,
-                enum=['pending', 'running', 'completed', 'failed'],
+                enum=['pending', 'processing', 'completed', 'failed'],
                 required=False,
             )
         ],
         responses={
             200: openapi.Response(
-                'List of tasks',
-                examples={'application/json': [_task_example]},
-            )
+                'Page of tasks',
+                examples={'application/json': {
+                    'next': 'https://api.syncfloww.com/api/ai/tasks/?cursor=cD0yMDI0LTA2LTAx',
+                    'previous': None,
+                    'results': [_task_example],
+                }},
+            ),
+            400: openapi.Response('Unknown status'),
         },
     )
     def list(self, request, *args, **kwargs):
+        task_status = request.query_params.get('status')
+        if task_status and task_status not in dict(AgentTask.STATUS_CHOICES):
+            return Response(
+                {'error': f'Unknown status "{task_status}"'},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
         return super().list(request, *args, **kwargs)
 
     @swagger_auto_schema(
         operation_summary='Retrieve task details',
         operation_description=(
             'Returns the current status and output of a specific agent task.\n\n'
-            '**Task statuses:** `pending` → `running` → `completed` | `failed`'
+            '**Task statuses:** `pending` → `processing` → `completed` | `failed`'
         ),
         tags=['AI Agents'],
         responses={
@@ -182,3 +391,155 @@ class AgentTaskViewSet(viewsets.ReadOnlyModelViewSet):
     )
     def retrieve(self, request, *args, **kwargs):
         return super().retrieve(request, *args, **kwargs)
+
+    @swagger_auto_schema(
+        operation_summary='Stream task output (Server-Sent Events)',
+        operation_description=(
+            'Relays tokens as the provider produces them, as `text/event-stream`.\n\n'
+            '**Events:** `token` (`{"text": ...}`), `done` (`{"status", "output_data"}`), `error`.\n\n'
+            'Each event `id` is the character offset reached so far. Reconnecting clients '
+            'send it back as `Last-Event-ID` (browsers do this automatically) or `?offset=` '
+            'and only receive text past that offset. Under the default WSGI server mode '
+            'a stream closes after `AI_AGENTS_STREAM_WSGI_TIMEOUT` seconds and the client '
+            'reconnects; the ASGI mode holds it open.'
+        ),
+        tags=['AI Agents'],
+        manual_parameters=[
+            openapi.Parameter(
+                'offset',
+                openapi.IN_QUERY,
+                description='Character offset already received; overridden by `Last-Event-ID`',
+                type=openapi.TYPE_INTEGER,
+                required=False,
+            )
+        ],
+        responses={
+            200: openapi.Response(
+                'Event stream',
+                examples={'text/event-stream': (
+                    'id: 12\nevent: token\ndata: {"text": "Here is your"}\n\n'
+                    'id: 12\nevent: done\ndata: {"status": "completed", "output_data": {...}}\n\n'
+                )},
+            ),
+            400: openapi.Response('Invalid offset'),
+            404: openapi.Response('Task not found'),
+        },
+    )
+    @action(detail=True, methods=['get'], renderer_classes=[JSONRenderer, EventStreamRenderer])
+    def stream(self, request, pk=None):
+        """Relay task tokens over SSE, resuming from the client's offset."""
+        task = self.get_object()
+        offset = request.headers.get('Last-Event-ID') or request.query_params.get('offset') or 0
+        try:
+            offset = max(int(offset), 0)
+        except (TypeError, ValueError):
+            return Response(
+                {'error': 'offset must be an integer'},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if isinstance(request._request, ASGIRequest):
+            events = streams.event_stream(task.pk, offset)
+        else:
+            events = streams.event_stream_sync(task.pk, offset)
+        response = StreamingHttpResponse(events, content_type='text/event-stream')
+        response['Cache-Control'] = 'no-cache'
+        response['X-Accel-Buffering'] = 'no'
+        return response
+
+    @swagger_auto_schema(
+        operation_summary='Queue depth and wait-time metrics',
+        operation_description=(
+            'Per priority class (`interactive`, `standard`, `bulk`): tasks `waiting` for the '
+            'fair-share dispatcher, `queued` in the broker and `processing`, plus average and '
+            'maximum wait (creation → start) over the last `?window=` minutes (default 5). '
+            'Staff only.'
+        ),
+        tags=['AI Agents'],
+        manual_parameters=[
+            openapi.Parameter(
+                'window',
+                openapi.IN_QUERY,
+                description='Wait-time window in minutes',
+                type=openapi.TYPE_INTEGER,
+                required=False,
+            )
+        ],
+        responses={
+            200: openapi.Response(
+                'Queue metrics',
+                examples={'application/json': {
+                    'window_minutes': 5,
+                    'priorities': {
+                        'interactive': {
+                            'waiting': 0, 'queued': 2, 'processing': 4,
+                            'started_last_window': 310,
+                            'avg_wait_seconds': 0.42, 'max_wait_seconds': 3.1,
+                        },
+                    },
+                    'broker_queues': {'agents.interactive.caption': 2},
+                }},
+            ),
+            400: openapi.Response('Invalid window'),
+        },
+    )
+    @action(detail=False, methods=['get'], url_path='queue-metrics',
+            permission_classes=[permissions.IsAdminUser])
+    def queue_metrics(self, request):
+        """Report queue depth and wait time per priority class."""
+        try:
+            window = max(int(request.query_params.get('window', 5)), 1)
+        except (TypeError, ValueError):
+            return Response(
+                {'error': 'window must be an integer'},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        return Response(scheduling.queue_metrics(window))
+
+
+class AgentBatchViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    Monitor batches created by the **execute-batch** action.
+
+    Progress is counted from the batch's tasks (and the archive rows of those
+    removed by retention) on each request, in the same query that loads the
+    batches.
+    """
+    serializer_class = AgentBatchSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    swagger_tags = ['AI Agents']
+
+    def get_queryset(self):
+        return (
+            AgentBatch.objects.filter(user=self.request.user)
+            .select_related('agent')
+            .annotate(**progress_annotations())
+        )
+
+    @swagger_auto_schema(
+        operation_summary='List agent batches',
+        operation_description='Returns the authenticated user\'s agent batches with aggregate task progress.',
+        tags=['AI Agents'],
+        responses={
+            200: openapi.Response(
+                'List of batches',
+                examples={'application/json': [_batch_example]},
+            )
+        },
+    )
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
+    @swagger_auto_schema(
+        operation_summary='Retrieve batch progress',
+        operation_description=(
+            'Returns per-status task counts for a batch. '
+            '`progress.done` is true once every task has completed or failed.'
+        ),
+        tags=['AI Agents'],
+        responses={
+            200: openapi.Response('Batch progress', examples={'application/json': _batch_example}),
+            404: openapi.Response('Batch not found'),
+        },
+    )
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import AnalyticsData
+from .models import AccountRollup, AnalyticsData, BrandRollup
 
 @admin.register(AnalyticsData)
 class AnalyticsDataAdmin(admin.ModelAdmin):
@@ -8,3 +8,21 @@ class AnalyticsDataAdmin(admin.ModelAdmin):
     search_fields = ['social_account__username']
     readonly_fields = ['created_at', 'updated_at']
     date_hierarchy = 'date'
+
+
+@admin.register(AccountRollup)
+class AccountRollupAdmin(admin.ModelAdmin):
+    list_display = ['social_account', 'period', 'period_start', 'followers', 'likes', 'impressions', 'days']
+    list_filter = ['period', 'social_account__platform']
+    search_fields = ['social_account__username']
+    readonly_fields = ['updated_at']
+    date_hierarchy = 'period_start'
+
+
+@admin.register(BrandRollup)
+class BrandRollupAdmin(admin.ModelAdmin):
+    list_display = ['brand', 'period', 'period_start', 'followers', 'likes', 'impressions', 'days']
+    list_filter = ['period']
+    search_fields = ['brand__name']
+    readonly_fields = ['updated_at']
+    date_hierarchy = 'period_start'
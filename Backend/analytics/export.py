@@ -0,0 +1,194 @@
+"""
+Full exports of ``AnalyticsData`` as CSV, Parquet or Arrow IPC.
+
+Rows are read column-wise with ``values_list(...).iterator(chunk_size=...)``
+(a server-side cursor on PostgreSQL) and encoded one chunk at a time:
+CSV as text blocks, Parquet as one row group per chunk, Arrow as one record
+batch per chunk of an IPC stream. Every writer yields bytes as soon as a
+chunk is encoded, so memory is bounded by ``ANALYTICS_EXPORT_CHUNK_SIZE``
+rows whatever the size of the table, both for ``StreamingHttpResponse`` and
+for ``manage.py export_analytics``.
+
+Parquet and Arrow need ``pyarrow``; it is imported only when used.
+"""
+import csv
+import io
+from datetime import date
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+
+from .models import AnalyticsData
+from .platforms import METRIC_FIELDS
+
+COLUMNS = ('social_account_id', 'brand_id', 'platform', 'date', *METRIC_FIELDS)
+_SOURCE_FIELDS = ('social_account_id', 'social_account__brand_id', 'social_account__platform', 'date', *METRIC_FIELDS)
+
+FORMATS = {
+    'csv': ('text/csv', 'csv'),
+    'parquet': ('application/vnd.apache.parquet', 'parquet'),
+    'arrow': ('application/vnd.apache.arrow.stream', 'arrows'),
+}
+
+
+class ExportError(Exception):
+    """The export cannot be produced (unknown format, missing dependency)."""
+
+
+def chunk_size():
+    return getattr(settings, 'ANALYTICS_EXPORT_CHUNK_SIZE', 10000)
+
+
+def export_queryset(start=None, end=None, account_ids=None, brand_ids=None, user=None):
+    """Rows to export, in ``(social_account, date)`` order (the unique index)."""
+    queryset = AnalyticsData.objects.all()
+    if user is not None:
+        queryset = queryset.filter(social_account__user=user)
+    if start is not None:
+        queryset = queryset.filter(date__gte=start)
+    if end is not None:
+        queryset = queryset.filter(date__lte=end)
+    if account_ids:
+        queryset = queryset.filter(social_account_id__in=account_ids)
+    if brand_ids:
+        queryset = queryset.filter(social_account__brand_id__in=brand_ids)
+    return queryset.order_by('social_account_id', 'date')
+
+
+def iter_chunks(queryset, size=None):
+    """Yield lists of row tuples (``COLUMNS`` order) of at most ``size`` rows."""
+    size = size or chunk_size()
+    chunk = []
+    for row in queryset.values_list(*_SOURCE_FIELDS).iterator(chunk_size=size):
+        chunk.append(row)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def stream(queryset, fmt, size=None):
+    """Yield the encoded export of ``queryset`` in ``fmt`` as byte blocks."""
+    if fmt not in FORMATS:
+        raise ExportError(f'Unknown export format: {fmt}')
+    writer = {'csv': _csv, 'parquet': _parquet, 'arrow': _arrow}[fmt]
+    if fmt != 'csv':
+        _pyarrow()
+    return writer(iter_chunks(queryset, size))
+
+
+async def aiterate(iterator):
+    """
+    Drive a sync byte iterator from async code one block at a time.
+
+    ``StreamingHttpResponse`` under ASGI would otherwise read a sync iterator
+    to the end before sending anything.
+    """
+    step = sync_to_async(next, thread_sensitive=True)
+    done = object()
+    while True:
+        block = await step(iterator, done)
+        if block is done:
+            return
+        yield block
+
+
+# ─── Writers ─────────────────────────────────────────────────────────────────
+
+def _csv(chunks):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(COLUMNS)
+    for chunk in chunks:
+        writer.writerows(chunk)
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+
+class _Sink:
+    """Write-only file object whose contents are drained after each chunk."""
+
+    closed = False
+
+    def __init__(self):
+        self._parts = []
+
+    def write(self, data):
+        self._parts.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self):
+        data = b''.join(self._parts)
+        self._parts.clear()
+        return data
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+    except ImportError as exc:
+        raise ExportError('Parquet and Arrow exports require pyarrow') from exc
+    return pyarrow
+
+
+def arrow_schema():
+    pa = _pyarrow()
+    return pa.schema([
+        ('social_account_id', pa.int64()),
+        ('brand_id', pa.int64()),
+        ('platform', pa.string()),
+        ('date', pa.date32()),
+        *((name, pa.int64()) for name in METRIC_FIELDS),
+    ])
+
+
+def record_batch(chunk, schema):
+    pa = _pyarrow()
+    columns = list(zip(*chunk))
+    return pa.RecordBatch.from_arrays(
+        [pa.array(column, type=field.type) for column, field in zip(columns, schema)],
+        schema=schema,
+    )
+
+
+def _parquet(chunks):
+    import pyarrow.parquet as pq
+
+    schema = arrow_schema()
+    sink = _Sink()
+    writer = pq.ParquetWriter(sink, schema, compression='zstd')
+    try:
+        for chunk in chunks:
+            writer.write_batch(record_batch(chunk, schema))
+            yield sink.drain()
+    finally:
+        writer.close()
+    yield sink.drain()
+
+
+def _arrow(chunks):
+    pa = _pyarrow()
+    schema = arrow_schema()
+    sink = _Sink()
+    writer = pa.ipc.new_stream(sink, schema)
+    try:
+        for chunk in chunks:
+            writer.write_batch(record_batch(chunk, schema))
+            yield sink.drain()
+    finally:
+        writer.close()
+    yield sink.drain()
+
+
+def filename(fmt, today=None):
+    return f'analytics_{(today or date.today()):%Y%m%d}.{FORMATS[fmt][1]}'
@@ -0,0 +1,131 @@
+"""
+Ingestion of daily ``AnalyticsData`` snapshots from the social platforms.
+
+``schedule_sync`` splits the active ``SocialAccount`` ids into chunks of
+``ANALYTICS_INGEST_ACCOUNTS_PER_TASK`` and fans them out as
+``analytics.ingest_accounts`` tasks. Each task fetches its accounts through
+the platform adapters on a small thread pool, normalizes the metrics and
+writes them with ``bulk_create(update_conflicts=True)`` on
+``(social_account, date)``: one INSERT ... ON CONFLICT DO UPDATE per
+``ANALYTICS_INGEST_CHUNK_SIZE`` rows instead of two queries per account-day.
+Re-running a window is idempotent; platforms revise recent days, which is
+why every sync re-reads the last ``ANALYTICS_INGEST_LOOKBACK_DAYS``. Written
+days mark their week and month for ``rollups`` to recompute.
+"""
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+from social.models import SocialAccount
+
+from . import platforms, rollups
+from .models import AnalyticsData
+
+logger = logging.getLogger(__name__)
+
+
+def default_window(days=None):
+    """``(start, end)`` covering the last ``days`` full days, ending yesterday."""
+    days = days or getattr(settings, 'ANALYTICS_INGEST_LOOKBACK_DAYS', 3)
+    end = timezone.localdate() - timedelta(days=1)
+    return end - timedelta(days=days - 1), end
+
+
+def account_chunks(account_ids=None, chunk_size=None):
+    """Yield lists of active account ids in primary-key order."""
+    chunk_size = chunk_size or getattr(settings, 'ANALYTICS_INGEST_ACCOUNTS_PER_TASK', 200)
+    accounts = SocialAccount.objects.filter(is_active=True)
+    if account_ids is not None:
+        accounts = accounts.filter(pk__in=account_ids)
+    chunk = []
+    for pk in accounts.order_by('pk').values_list('pk', flat=True).iterator(chunk_size=chunk_size):
+        chunk.append(pk)
+        if len(chunk) == chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def schedule_sync(start=None, end=None, account_ids=None):
+    """Fan out one ``ingest_accounts`` task per chunk of accounts; returns the task count."""
+    from .tasks import ingest_accounts
+
+    if start is None or end is None:
+        start, end = default_window()
+    queue = getattr(settings, 'ANALYTICS_INGEST_QUEUE', 'analytics')
+    count = 0
+    for chunk in account_chunks(account_ids):
+        ingest_accounts.apply_async(args=[chunk, start.isoformat(), end.isoformat()], queue=queue)
+        count += 1
+    return count
+
+
+def _fetch(account, start, end):
+    pk, platform, external_id, access_token = account
+    adapter = platforms.get_adapter(platform)
+    if adapter is None:
+        return pk, None, platforms.PlatformError(f'No adapter for platform {platform!r}')
+    try:
+        return pk, adapter.fetch_daily(external_id, access_token, start, end), None
+    except platforms.PlatformError as exc:
+        return pk, None, exc
+
+
+def upsert(rows, batch_size=None):
+    """
+    Insert or update ``AnalyticsData`` rows on ``(social_account, date)`` and
+    mark their rollup periods for refresh.
+    """
+    if not rows:
+        return 0
+    AnalyticsData.objects.bulk_create(
+        rows,
+        batch_size=batch_size or getattr(settings, 'ANALYTICS_INGEST_CHUNK_SIZE', 5000),
+        update_conflicts=True,
+        unique_fields=['social_account', 'date'],
+        update_fields=[*platforms.METRIC_FIELDS, 'updated_at'],
+    )
+    rollups.mark_dirty({(row.social_account_id, row.date) for row in rows})
+    return len(rows)
+
+
+def ingest_accounts(account_ids, start, end, chunk_size=None, concurrency=None):
+    """
+    Fetch and upsert ``start``..``end`` for ``account_ids``.
+
+    Returns ``{'accounts', 'rows', 'failed', 'throttled', 'retry_after'}``;
+    ``throttled`` lists the ids a platform rate limited, for the caller to retry.
+    """
+    chunk_size = chunk_size or getattr(settings, 'ANALYTICS_INGEST_CHUNK_SIZE', 5000)
+    concurrency = concurrency or getattr(settings, 'ANALYTICS_INGEST_FETCH_CONCURRENCY', 8)
+    accounts = list(
+        SocialAccount.objects.filter(pk__in=account_ids, is_active=True)
+        .values_list('pk', 'platform', 'account_id', 'access_token')
+    )
+
+    result = {'accounts': 0, 'rows': 0, 'failed': [], 'throttled': [], 'retry_after': None}
+    buffer = []
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for pk, daily, error in pool.map(lambda account: _fetch(account, start, end), accounts):
+            if isinstance(error, platforms.RateLimitError):
+                result['throttled'].append(pk)
+                result['retry_after'] = max(result['retry_after'] or 0, error.retry_after or 0)
+                continue
+            if error is not None:
+                logger.warning('Analytics fetch for social account %s failed: %s', pk, error)
+                result['failed'].append(pk)
+                continue
+            result['accounts'] += 1
+            buffer.extend(
+                AnalyticsData(social_account_id=pk, date=day, **metrics)
+                for day, metrics in daily.items()
+            )
+            if len(buffer) >= chunk_size:
+                result['rows'] += upsert(buffer, chunk_size)
+                buffer = []
+    result['rows'] += upsert(buffer, chunk_size)
+    return result
@@ -0,0 +1,27 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand
+
+from analytics import rollups
+
+
+class Command(BaseCommand):
+    help = 'Mark weekly/monthly analytics rollups for recomputation and rebuild them from AnalyticsData.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--start', type=date.fromisoformat, help='Only periods from this day (YYYY-MM-DD).')
+        parser.add_argument('--end', type=date.fromisoformat, help='Only periods up to this day (YYYY-MM-DD).')
+        parser.add_argument('--account', type=int, action='append', help='Only this SocialAccount id (repeatable).')
+        parser.add_argument(
+            '--mark-only',
+            action='store_true',
+            help='Only mark periods dirty and leave the refresh to the beat job.',
+        )
+
+    def handle(self, *args, **options):
+        marked = rollups.mark_range_dirty(options['start'], options['end'], options['account'])
+        self.stdout.write(f'Marked {marked} account periods for refresh.')
+        if options['mark_only']:
+            return
+        refreshed = rollups.refresh_dirty()
+        self.stdout.write(self.style.SUCCESS(f'Refreshed {refreshed} account periods and their brands.'))
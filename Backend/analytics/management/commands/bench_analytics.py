@@ -0,0 +1,199 @@
+import random
+import statistics
+import time
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.utils import timezone
+
+from analytics import storage
+from analytics.models import AnalyticsData
+from analytics.platforms import METRIC_FIELDS
+from analytics.views import AnalyticsView
+from social.models import Brand, SocialAccount
+
+BENCH_EMAIL = 'bench-analytics@syncfloww.local'
+
+
+class Command(BaseCommand):
+    help = (
+        'Seed AnalyticsData with synthetic daily snapshots (10M rows by default) '
+        'and measure the latency of the dashboard range queries against it.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=10_000_000, help='Snapshots to seed.')
+        parser.add_argument('--accounts', type=int, default=5000, help='Social accounts to spread them over.')
+        parser.add_argument('--accounts-per-brand', type=int, default=10)
+        parser.add_argument('--queries', type=int, default=200, help='Timed runs of each query.')
+        parser.add_argument('--days', type=int, default=90, help='Width of the queried date ranges.')
+        parser.add_argument('--explain', action='store_true', help='Print the plan of one run of each query.')
+        parser.add_argument('--reseed', action='store_true', help='Delete and re-create the benchmark data first.')
+        parser.add_argument('--cleanup', action='store_true', help='Delete the benchmark data and exit.')
+
+    def handle(self, *args, **options):
+        user = get_user_model().objects.filter(email=BENCH_EMAIL).first()
+        if user and (options['cleanup'] or options['reseed']):
+            self._delete(user)
+            user = None
+        if options['cleanup']:
+            self.stdout.write('Benchmark data deleted.')
+            return
+
+        days = -(-options['rows'] // options['accounts'])
+        end = timezone.localdate() - timedelta(days=1)
+        start = end - timedelta(days=days - 1)
+        if user is None:
+            user = self._seed(options, start, end)
+        else:
+            self.stdout.write('Reusing the existing benchmark data (pass --reseed to re-create it).')
+
+        accounts = list(SocialAccount.objects.filter(user=user).values_list('pk', flat=True))
+        brands = list(Brand.objects.filter(user=user).values_list('pk', flat=True))
+        first, last = self._date_bounds(accounts)
+        total = AnalyticsData.objects.count()
+        self.stdout.write(
+            f'{connection.vendor}, {total} rows '
+            f"({'partitioned, %d partitions' % len(storage.partitions()) if storage.is_partitioned() else 'not partitioned'}), "
+            f'benchmark data {first}..{last} over {len(accounts)} accounts / {len(brands)} brands'
+        )
+
+        width = timedelta(days=options['days'] - 1)
+        span = max((last - first - width).days, 0)
+
+        def window():
+            day = first + timedelta(days=random.randint(0, span))
+            return day, min(day + width, last)
+
+        def series(scope_type, scope_id):
+            day_from, day_to = window()
+            _, rows = AnalyticsView._source(
+                {'type': scope_type, 'id': scope_id},
+                {'granularity': 'day', 'metrics': list(METRIC_FIELDS), 'start': day_from, 'end': day_to},
+            )
+            return rows
+
+        def all_accounts():
+            day_from, _ = window()
+            return AnalyticsData.objects.filter(date__gte=day_from, date__lte=day_from + timedelta(days=6)).values_list(
+                'social_account_id', 'date', 'reach',
+            )
+
+        queries = [
+            (f'Account, {options["days"]} days', lambda: series('social_account', random.choice(accounts))),
+            ('Account, latest 30', lambda: AnalyticsData.objects.filter(
+                social_account_id=random.choice(accounts),
+            ).order_by('-date').values_list('date', *METRIC_FIELDS)[:30]),
+            (f'Brand, {options["days"]} days', lambda: series('brand', random.choice(brands))),
+            ('All accounts, 7 days', all_accounts),
+        ]
+        width_label = max(len(label) for label, _ in queries) + 1
+        for label, build in queries:
+            if options['explain']:
+                self.stdout.write(f'{label}:\n{build().explain()}\n')
+            samples = []
+            for _ in range(options['queries']):
+                queryset = build()
+                started = time.perf_counter()
+                list(queryset)
+                samples.append(time.perf_counter() - started)
+            self.stdout.write(f'{label + ":":<{width_label}} ' + self._summary(samples))
+
+    def _seed(self, options, start, end):
+        user = get_user_model().objects.create_user(email=BENCH_EMAIL, password=None, is_active=False)
+        brands = Brand.objects.bulk_create(
+            Brand(user=user, name=f'Bench brand {i}')
+            for i in range(-(-options['accounts'] // options['accounts_per_brand']))
+        )
+        platforms = [code for code, _ in SocialAccount.PLATFORMS]
+        accounts = SocialAccount.objects.bulk_create(
+            SocialAccount(
+                user=user,
+                brand=brands[i // options['accounts_per_brand']],
+                platform=platforms[i % len(platforms)],
+                account_id=f'bench-{i}',
+            )
+            for i in range(options['accounts'])
+        )
+        account_ids = [account.pk for account in accounts]
+
+        days = (end - start).days + 1
+        self.stdout.write(f'Seeding {days * len(account_ids)} rows ({len(account_ids)} accounts x {days} days)...')
+        started = time.perf_counter()
+        # Day by day, like nightly ingestion, so the physical order follows date.
+        step = 30
+        for offset in range(0, days, step):
+            day_from = start + timedelta(days=offset)
+            day_to = min(day_from + timedelta(days=step - 1), end)
+            with transaction.atomic():
+                if connection.vendor == 'postgresql':
+                    self._seed_sql(account_ids, day_from, day_to)
+                else:
+                    self._seed_orm(account_ids, day_from, day_to)
+            self.stdout.write(f'  {day_to}: {time.perf_counter() - started:.0f}s')
+        with connection.cursor() as cursor:
+            cursor.execute(f'ANALYZE {connection.ops.quote_name(storage.TABLE)}')
+        self.stdout.write(f'Seeded in {time.perf_counter() - started:.1f}s.')
+        return user
+
+    @staticmethod
+    def _seed_sql(account_ids, day_from, day_to):
+        metrics = ', '.join(METRIC_FIELDS)
+        values = ', '.join(f'(random() * {10 ** (6 if i < 2 else 4)})::int' for i, _ in enumerate(METRIC_FIELDS))
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'INSERT INTO {connection.ops.quote_name(storage.TABLE)} '
+                f'(social_account_id, date, {metrics}, created_at, updated_at) '
+                f'SELECT a.id, d::date, {values}, now(), now() '
+                f'FROM generate_series(%s::date, %s::date, interval \'1 day\') AS d '
+                f'CROSS JOIN unnest(%s::bigint[]) AS a(id) ORDER BY d, a.id',
+                [day_from, day_to, account_ids],
+            )
+
+    @staticmethod
+    def _seed_orm(account_ids, day_from, day_to):
+        rows = []
+        day = day_from
+        while day <= day_to:
+            rows.extend(
+                AnalyticsData(
+                    social_account_id=pk,
+                    date=day,
+                    **{name: random.randrange(10 ** (6 if i < 2 else 4)) for i, name in enumerate(METRIC_FIELDS)},
+                )
+                for pk in account_ids
+            )
+            day += timedelta(days=1)
+        AnalyticsData.objects.bulk_create(rows, batch_size=5000)
+
+    @staticmethod
+    def _date_bounds(account_ids):
+        queryset = AnalyticsData.objects.filter(social_account_id__in=account_ids[:1])
+        first = queryset.order_by('date').values_list('date', flat=True).first()
+        last = queryset.order_by('-date').values_list('date', flat=True).first()
+        return first, last
+
+    @staticmethod
+    def _delete(user):
+        # Raw DELETE: the ORM would load every row to send post_delete signals.
+        accounts, params = SocialAccount.objects.filter(user=user).values('pk').query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'DELETE FROM {connection.ops.quote_name(storage.TABLE)} WHERE social_account_id IN ({accounts})',
+                params,
+            )
+        user.delete()
+
+    @staticmethod
+    def _summary(samples):
+        if not samples:
+            return 'no samples'
+        samples = sorted(samples)
+
+        def pct(p):
+            return samples[min(len(samples) - 1, int(p * len(samples)))] * 1000
+
+        return (f'p50 {pct(0.50):.1f}ms  p95 {pct(0.95):.1f}ms  p99 {pct(0.99):.1f}ms  '
+                f'max {samples[-1] * 1000:.1f}ms  mean {statistics.mean(samples) * 1000:.1f}ms  (n={len(samples)})')
@@ -0,0 +1,52 @@
+import sys
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from analytics import export
+
+
+class Command(BaseCommand):
+    help = 'Export AnalyticsData as CSV, Parquet or Arrow IPC with flat memory use.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('output', help="Output file path, or '-' for stdout.")
+        parser.add_argument('--format', dest='file_format', choices=list(export.FORMATS), help='Default: from the file extension, else csv.')
+        parser.add_argument('--start', type=date.fromisoformat, help='First day (YYYY-MM-DD).')
+        parser.add_argument('--end', type=date.fromisoformat, help='Last day (YYYY-MM-DD), inclusive.')
+        parser.add_argument('--account', type=int, action='append', help='Only this SocialAccount id (repeatable).')
+        parser.add_argument('--brand', type=int, action='append', help='Only accounts of this Brand id (repeatable).')
+        parser.add_argument('--chunk-size', type=int, default=export.chunk_size(), help='Rows per read and per row group/record batch.')
+
+    def handle(self, *args, **options):
+        fmt = options['file_format'] or self._detect(options['output'])
+        queryset = export.export_queryset(
+            start=options['start'],
+            end=options['end'],
+            account_ids=options['account'],
+            brand_ids=options['brand'],
+        )
+        try:
+            blocks = export.stream(queryset, fmt, options['chunk_size'])
+        except export.ExportError as e:
+            raise CommandError(str(e)) from e
+
+        written = 0
+        if options['output'] == '-':
+            for block in blocks:
+                sys.stdout.buffer.write(block)
+                written += len(block)
+            sys.stdout.buffer.flush()
+            return
+        with open(options['output'], 'wb') as out:
+            for block in blocks:
+                out.write(block)
+                written += len(block)
+        self.stderr.write(self.style.SUCCESS(f"Wrote {written} bytes of {fmt} to {options['output']}."))
+
+    @staticmethod
+    def _detect(path):
+        for fmt, (_, extension) in export.FORMATS.items():
+            if path.endswith(f'.{extension}'):
+                return fmt
+        return 'arrow' if path.endswith('.arrow') else 'csv'
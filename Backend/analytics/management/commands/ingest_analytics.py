@@ -0,0 +1,50 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from analytics import ingestion, rollups
+
+
+class Command(BaseCommand):
+    help = 'Pull daily metrics for social accounts and upsert them into AnalyticsData.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            help='Sync the last N full days (default ANALYTICS_INGEST_LOOKBACK_DAYS).',
+        )
+        parser.add_argument('--start', type=date.fromisoformat, help='First day (YYYY-MM-DD); overrides --days.')
+        parser.add_argument('--end', type=date.fromisoformat, help='Last day (YYYY-MM-DD), inclusive.')
+        parser.add_argument('--account', type=int, action='append', help='Only this SocialAccount id (repeatable).')
+        parser.add_argument(
+            '--queue',
+            action='store_true',
+            help='Fan out Celery tasks instead of ingesting in this process.',
+        )
+
+    def handle(self, *args, **options):
+        start, end = ingestion.default_window(options['days'])
+        start = options['start'] or start
+        end = options['end'] or end
+        if start > end:
+            raise CommandError('--start must not be after --end')
+
+        if options['queue']:
+            count = ingestion.schedule_sync(start, end, options['account'])
+            self.stdout.write(self.style.SUCCESS(f'Queued {count} ingestion tasks for {start}..{end}.'))
+            return
+
+        totals = {'accounts': 0, 'rows': 0, 'failed': 0, 'throttled': 0}
+        for chunk in ingestion.account_chunks(options['account']):
+            result = ingestion.ingest_accounts(chunk, start, end)
+            totals['accounts'] += result['accounts']
+            totals['rows'] += result['rows']
+            totals['failed'] += len(result['failed'])
+            totals['throttled'] += len(result['throttled'])
+            self.stdout.write(f"{totals['accounts']} accounts, {totals['rows']} rows ...")
+        rollups.refresh_dirty()
+        self.stdout.write(self.style.SUCCESS(
+            f"Ingested {totals['rows']} rows for {totals['accounts']} accounts ({start}..{end}); "
+            f"{totals['failed']} failed, {totals['throttled']} rate limited."
+        ))
@@ -0,0 +1,53 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from analytics import storage
+
+
+class Command(BaseCommand):
+    help = (
+        'Convert AnalyticsData into a table range-partitioned by month on date '
+        '(PostgreSQL only), or create upcoming partitions if it already is. '
+        'Conversion locks the table while rows are copied: run it in a maintenance window.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--months-ahead',
+            type=int,
+            default=storage.months_ahead(),
+            help='Future monthly partitions to create.',
+        )
+        parser.add_argument(
+            '--drop-old',
+            action='store_true',
+            help=f'Drop {storage.UNPARTITIONED_TABLE} after the copy instead of keeping it.',
+        )
+        parser.add_argument('--dry-run', action='store_true', help='Print the conversion SQL without running it.')
+
+    def handle(self, *args, **options):
+        if not storage.is_postgresql():
+            raise CommandError('Partitioning analytics data requires PostgreSQL; the plain table is kept.')
+
+        if storage.is_partitioned():
+            created = [] if options['dry_run'] else storage.ensure_partitions(options['months_ahead'])
+            self.stdout.write(
+                f'{storage.TABLE} is already partitioned ({len(storage.partitions())} partitions); '
+                f'created {len(created)} upcoming.'
+            )
+            return
+
+        if options['dry_run']:
+            self.stdout.write('BEGIN;')
+            for statement in storage.conversion_plan(options['months_ahead'], options['drop_old']):
+                self.stdout.write(f'{statement};')
+            self.stdout.write(f'COMMIT;\n{storage.vacuum_sql()};')
+            return
+
+        try:
+            storage.convert(options['months_ahead'], options['drop_old'])
+        except storage.StorageError as e:
+            raise CommandError(str(e)) from e
+        self.stdout.write(self.style.SUCCESS(
+            f'Partitioned {storage.TABLE} into {len(storage.partitions())} partitions.'
+            + ('' if options['drop_old'] else f' The original rows remain in {storage.UNPARTITIONED_TABLE}.')
+        ))
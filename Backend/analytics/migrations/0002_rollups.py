@@ -0,0 +1,85 @@
+# Generated by Django 5.2.18 on 2026-10-17 17:16
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0001_initial'),
+        ('social', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AccountRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('period', models.CharField(choices=[('week', 'Week'), ('month', 'Month')], max_length=10)),
+                ('period_start', models.DateField()),
+                ('days', models.IntegerField(default=0)),
+                ('followers', models.IntegerField(default=0)),
+                ('following', models.IntegerField(default=0)),
+                ('likes', models.BigIntegerField(default=0)),
+                ('comments', models.BigIntegerField(default=0)),
+                ('shares', models.BigIntegerField(default=0)),
+                ('impressions', models.BigIntegerField(default=0)),
+                ('reach', models.BigIntegerField(default=0)),
+                ('profile_views', models.BigIntegerField(default=0)),
+                ('website_clicks', models.BigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('social_account', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='analytics_rollups', to='social.socialaccount')),
+            ],
+            options={
+                'verbose_name': 'Account Rollup',
+                'verbose_name_plural': 'Account Rollups',
+                'db_table': 'analytics_accountrollup',
+                'ordering': ['-period_start'],
+                'abstract': False,
+                'unique_together': {('social_account', 'period', 'period_start')},
+            },
+        ),
+        migrations.CreateModel(
+            name='BrandRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('period', models.CharField(choices=[('week', 'Week'), ('month', 'Month')], max_length=10)),
+                ('period_start', models.DateField()),
+                ('days', models.IntegerField(default=0)),
+                ('followers', models.IntegerField(default=0)),
+                ('following', models.IntegerField(default=0)),
+                ('likes', models.BigIntegerField(default=0)),
+                ('comments', models.BigIntegerField(default=0)),
+                ('shares', models.BigIntegerField(default=0)),
+                ('impressions', models.BigIntegerField(default=0)),
+                ('reach', models.BigIntegerField(default=0)),
+                ('profile_views', models.BigIntegerField(default=0)),
+                ('website_clicks', models.BigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('brand', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='analytics_rollups', to='social.brand')),
+            ],
+            options={
+                'verbose_name': 'Brand Rollup',
+                'verbose_name_plural': 'Brand Rollups',
+                'db_table': 'analytics_brandrollup',
+                'ordering': ['-period_start'],
+                'abstract': False,
+                'unique_together': {('brand', 'period', 'period_start')},
+            },
+        ),
+        migrations.CreateModel(
+            name='DirtyRollupPeriod',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('period', models.CharField(choices=[('week', 'Week'), ('month', 'Month')], max_length=10)),
+                ('period_start', models.DateField()),
+                ('marked_at', models.DateTimeField()),
+                ('social_account', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='social.socialaccount')),
+            ],
+            options={
+                'db_table': 'analytics_dirtyrollupperiod',
+                'unique_together': {('social_account', 'period', 'period_start')},
+            },
+        ),
+    ]
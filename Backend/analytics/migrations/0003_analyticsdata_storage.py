@@ -0,0 +1,38 @@
+# Generated by Django 5.2.18 on 2026-10-17 17:22
+
+from django.db import migrations, models
+
+
+def create_date_index(apps, schema_editor):
+    # BRIN on PostgreSQL: daily rows arrive roughly in date order, so a few
+    # pages of block ranges index the whole table. SQLite and others get a
+    # plain B-tree instead.
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(
+            'CREATE INDEX IF NOT EXISTS analytics_date_brin ON analytics_analyticsdata USING brin (date)'
+        )
+    else:
+        schema_editor.execute(
+            'CREATE INDEX IF NOT EXISTS analytics_date_idx ON analytics_analyticsdata (date)'
+        )
+
+
+def drop_date_index(apps, schema_editor):
+    name = 'analytics_date_brin' if schema_editor.connection.vendor == 'postgresql' else 'analytics_date_idx'
+    schema_editor.execute(f'DROP INDEX IF EXISTS {name}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0002_rollups'),
+        ('social', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='analyticsdata',
+            index=models.Index(fields=['social_account', '-date'], include=('followers', 'following', 'likes', 'comments', 'shares', 'impressions', 'reach', 'profile_views', 'website_clicks', 'updated_at'), name='analytics_account_date_desc'),
+        ),
+        migrations.RunPython(create_date_index, drop_date_index, elidable=False),
+    ]
@@ -1,5 +1,5 @@
 from django.db import models
-from social.models import SocialAccount
+from social.models import Brand, SocialAccount
 
 
 class AnalyticsData(models.Model):
@@ -28,3 +28,93 @@ class AnalyticsData(models.Model):
         verbose_name_plural = 'Analytics Data'
         unique_together = ['social_account', 'date']
         ordering = ['-date']
+        indexes = [
+            # An account's latest days, newest first, answered from the index
+            # alone on PostgreSQL (metrics are INCLUDE columns; other
+            # databases build a plain composite index). The BRIN index on
+            # ``date`` and monthly partitioning live in ``analytics.storage``.
+            models.Index(
+                fields=['social_account', '-date'],
+                include=[
+                    'followers', 'following', 'likes', 'comments', 'shares',
+                    'impressions', 'reach', 'profile_views', 'website_clicks', 'updated_at',
+                ],
+                name='analytics_account_date_desc',
+            ),
+        ]
+
+
+PERIODS = [
+    ('week', 'Week'),
+    ('month', 'Month'),
+]
+
+
+class RollupMetrics(models.Model):
+    """
+    Metrics of one period. ``followers``/``following`` are the last daily
+    snapshot in the period; the other counters are summed over its days.
+    """
+    period = models.CharField(max_length=10, choices=PERIODS)
+    period_start = models.DateField()
+    days = models.IntegerField(default=0)  # daily snapshots covered
+    followers = models.IntegerField(default=0)
+    following = models.IntegerField(default=0)
+    likes = models.BigIntegerField(default=0)
+    comments = models.BigIntegerField(default=0)
+    shares = models.BigIntegerField(default=0)
+    impressions = models.BigIntegerField(default=0)
+    reach = models.BigIntegerField(default=0)
+    profile_views = models.BigIntegerField(default=0)
+    website_clicks = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        abstract = True
+        ordering = ['-period_start']
+
+
+class AccountRollup(RollupMetrics):
+    """Weekly/monthly totals per social account, maintained by ``analytics.rollups``"""
+    social_account = models.ForeignKey(
+        SocialAccount,
+        on_delete=models.CASCADE,
+        related_name='analytics_rollups'
+    )
+
+    class Meta(RollupMetrics.Meta):
+        db_table = 'analytics_accountrollup'
+        verbose_name = 'Account Rollup'
+        verbose_name_plural = 'Account Rollups'
+        unique_together = ['social_account', 'period', 'period_start']
+
+
+class BrandRollup(RollupMetrics):
+    """Weekly/monthly totals per brand (sum of its accounts' rollups)"""
+    brand = models.ForeignKey(
+        Brand,
+        on_delete=models.CASCADE,
+        related_name='analytics_rollups'
+    )
+
+    class Meta(RollupMetrics.Meta):
+        db_table = 'analytics_brandrollup'
+        verbose_name = 'Brand Rollup'
+        verbose_name_plural = 'Brand Rollups'
+        unique_together = ['brand', 'period', 'period_start']
+
+
+class DirtyRollupPeriod(models.Model):
+    """An account period whose rollups must be recomputed"""
+    social_account = models.ForeignKey(
+        SocialAccount,
+        on_delete=models.CASCADE,
+        related_name='+'
+    )
+    period = models.CharField(max_length=10, choices=PERIODS)
+    period_start = models.DateField()
+    marked_at = models.DateTimeField()
+
+    class Meta:
+        db_table = 'analytics_dirtyrollupperiod'
+        unique_together = ['social_account', 'period', 'period_start']
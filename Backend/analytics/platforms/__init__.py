@@ -0,0 +1,12 @@
+from .base import METRIC_FIELDS, PlatformAdapter, PlatformError, RateLimitError
+from .registry import close_all, get_adapter, register
+
+__all__ = [
+    'METRIC_FIELDS',
+    'PlatformAdapter',
+    'PlatformError',
+    'RateLimitError',
+    'close_all',
+    'get_adapter',
+    'register',
+]
@@ -0,0 +1,97 @@
+"""
+Platform adapters. Each one names the insights endpoint for an account and
+maps the platform's daily metric names onto ``AnalyticsData`` fields.
+"""
+from .base import PlatformAdapter
+
+
+class TikTokAdapter(PlatformAdapter):
+    platform = 'tiktok'
+    default_base_url = 'https://open.tiktokapis.com'
+    path = '/v2/business/{account_id}/insights/daily'
+    records_key = 'metrics'
+    field_map = {
+        'followers_count': 'followers',
+        'following_count': 'following',
+        'likes': 'likes',
+        'comments': 'comments',
+        'shares': 'shares',
+        'video_views': 'impressions',
+        'reach': 'reach',
+        'profile_views': 'profile_views',
+        'bio_link_clicks': 'website_clicks',
+    }
+
+    def build_params(self, start, end):
+        return {'start_date': start.isoformat(), 'end_date': end.isoformat()}
+
+
+class InstagramAdapter(PlatformAdapter):
+    platform = 'instagram'
+    default_base_url = 'https://graph.facebook.com/v19.0'
+    path = '/{account_id}/insights/daily'
+    field_map = {
+        'follower_count': 'followers',
+        'follows_count': 'following',
+        'likes': 'likes',
+        'comments': 'comments',
+        'shares': 'shares',
+        'impressions': 'impressions',
+        'reach': 'reach',
+        'profile_views': 'profile_views',
+        'website_clicks': 'website_clicks',
+    }
+    date_key = 'end_time'
+
+
+class FacebookAdapter(InstagramAdapter):
+    """Facebook Pages share the Graph API insights shape with Instagram."""
+    platform = 'facebook'
+    field_map = {
+        'page_fans': 'followers',
+        'page_actions_post_reactions_total': 'likes',
+        'page_comments': 'comments',
+        'page_shares': 'shares',
+        'page_impressions': 'impressions',
+        'page_impressions_unique': 'reach',
+        'page_views_total': 'profile_views',
+        'page_website_clicks': 'website_clicks',
+    }
+
+
+class YouTubeAdapter(PlatformAdapter):
+    platform = 'youtube'
+    default_base_url = 'https://youtubeanalytics.googleapis.com/v2'
+    path = '/channels/{account_id}/reports/daily'
+    records_key = 'rows'
+    date_key = 'day'
+    field_map = {
+        'subscribers': 'followers',
+        'likes': 'likes',
+        'comments': 'comments',
+        'shares': 'shares',
+        'views': 'impressions',
+        'uniqueViewers': 'reach',
+    }
+
+    def build_params(self, start, end):
+        return {'startDate': start.isoformat(), 'endDate': end.isoformat()}
+
+
+class TwitterAdapter(PlatformAdapter):
+    platform = 'twitter'
+    default_base_url = 'https://api.twitter.com/2'
+    path = '/users/{account_id}/metrics/daily'
+    field_map = {
+        'followers_count': 'followers',
+        'following_count': 'following',
+        'like_count': 'likes',
+        'reply_count': 'comments',
+        'retweet_count': 'shares',
+        'impression_count': 'impressions',
+        'profile_visits': 'profile_views',
+        'url_link_clicks': 'website_clicks',
+    }
+
+    def build_params(self, start, end):
+        return {'start_time': start.isoformat(), 'end_time': end.isoformat()}
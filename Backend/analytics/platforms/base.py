@@ -0,0 +1,147 @@
+"""
+Base class for social platform metrics adapters.
+
+Each adapter owns one pooled ``httpx.Client`` shared by every ingestion
+thread in the process, fetches the daily metrics of one account over a date
+range and maps the platform's metric names onto ``AnalyticsData`` fields.
+The base URL comes from ``ANALYTICS_PLATFORM_BASE_URLS`` so the fixture
+server in ``mock`` can stand in for every platform.
+"""
+import threading
+from datetime import date
+
+import httpx
+from django.conf import settings
+
+METRIC_FIELDS = (
+    'followers',
+    'following',
+    'likes',
+    'comments',
+    'shares',
+    'impressions',
+    'reach',
+    'profile_views',
+    'website_clicks',
+)
+
+
+class PlatformError(Exception):
+    """The platform returned an error or an unparseable response."""
+
+    def __init__(self, message, status_code=None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class RateLimitError(PlatformError):
+    """The platform rejected the request with HTTP 429."""
+
+    def __init__(self, message, retry_after=None):
+        super().__init__(message, status_code=429)
+        self.retry_after = retry_after
+
+
+class PlatformAdapter:
+    """Adapter between one platform's insights API and ``AnalyticsData`` rows."""
+    platform = None
+    default_base_url = None
+    # Formatted with ``account_id``.
+    path = None
+    # Key of the list of daily records in the response body.
+    records_key = 'data'
+    date_key = 'date'
+    # Platform metric name → ``AnalyticsData`` field.
+    field_map = {}
+
+    def __init__(self):
+        urls = getattr(settings, 'ANALYTICS_PLATFORM_BASE_URLS', {})
+        self.base_url = (urls.get(self.platform) or urls.get('default') or self.default_base_url).rstrip('/')
+        self.timeout = getattr(settings, 'ANALYTICS_PLATFORM_TIMEOUT', 20)
+        self.max_connections = getattr(settings, 'ANALYTICS_PLATFORM_MAX_CONNECTIONS', 16)
+        self._http = None
+        self._lock = threading.Lock()
+
+    @property
+    def http(self):
+        with self._lock:
+            if self._http is None:
+                self._http = httpx.Client(
+                    base_url=self.base_url,
+                    limits=httpx.Limits(
+                        max_connections=self.max_connections,
+                        max_keepalive_connections=self.max_connections,
+                    ),
+                    timeout=httpx.Timeout(self.timeout, connect=5),
+                )
+        return self._http
+
+    def close(self):
+        with self._lock:
+            if self._http is not None:
+                self._http.close()
+                self._http = None
+
+    # ── Platform-specific hooks ──────────────────────────────────────────────
+
+    def get_headers(self, access_token):
+        return {'Authorization': f'Bearer {access_token}'} if access_token else {}
+
+    def build_params(self, start, end):
+        return {'since': start.isoformat(), 'until': end.isoformat()}
+
+    def parse_records(self, data):
+        """Return the list of daily records in a response body."""
+        return data[self.records_key]
+
+    # ── Public API ───────────────────────────────────────────────────────────
+
+    def fetch_daily(self, account_id, access_token, start, end):
+        """
+        Return ``{date: {field: int}}`` for ``account_id`` between ``start``
+        and ``end`` (inclusive), normalized to ``AnalyticsData`` fields.
+        Metrics the platform does not report are 0.
+        """
+        try:
+            response = self.http.get(
+                self.path.format(account_id=account_id),
+                params=self.build_params(start, end),
+                headers=self.get_headers(access_token),
+            )
+        except httpx.HTTPError as exc:
+            raise PlatformError(f'{self.platform} request failed: {exc}') from exc
+        self.raise_for_status(response)
+        try:
+            return self.normalize(self.parse_records(response.json()))
+        except (KeyError, IndexError, TypeError, ValueError) as exc:
+            raise PlatformError(f'Unexpected {self.platform} response: {exc}') from exc
+
+    def normalize(self, records):
+        # Keyed by date so a platform repeating a day yields one row, which
+        # a single upsert statement requires.
+        rows = {}
+        for record in records:
+            day = date.fromisoformat(str(record[self.date_key])[:10])
+            row = dict.fromkeys(METRIC_FIELDS, 0)
+            for name, field in self.field_map.items():
+                value = record.get(name)
+                if value is not None:
+                    row[field] = max(int(value), 0)
+            rows[day] = row
+        return rows
+
+    def raise_for_status(self, response):
+        if response.status_code == 429:
+            try:
+                retry_after = float(response.headers.get('retry-after', ''))
+            except ValueError:
+                retry_after = None
+            raise RateLimitError(
+                f'{self.platform} rate limit exceeded',
+                retry_after=retry_after,
+            )
+        if response.status_code >= 400:
+            raise PlatformError(
+                f'{self.platform} returned HTTP {response.status_code}: {response.text[:500]}',
+                status_code=response.status_code,
+            )
@@ -0,0 +1,136 @@
+"""
+Local fixture server standing in for every social platform's insights API.
+
+Serves each adapter's ``path`` in that adapter's response shape with
+deterministic daily metrics derived from the account id and the date, so
+repeated ingestion runs produce the same rows. Point
+``ANALYTICS_PLATFORM_BASE_URLS['default']`` (env ``ANALYTICS_PLATFORM_BASE_URL``)
+at ``MockPlatformServer().url`` or run
+``python -m analytics.platforms.mock --port 8091``.
+
+Request headers understood by the server:
+
+* ``X-Mock-Status`` — respond with this HTTP status instead of 200.
+* ``X-Mock-Delay`` — sleep this many seconds before responding.
+
+Accounts whose id starts with ``ratelimited`` are always rejected with HTTP 429.
+"""
+import argparse
+import json
+import re
+import threading
+import time
+import zlib
+from datetime import date, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlsplit
+
+from .registry import PLATFORM_ADAPTERS
+
+_METRIC_NAMES = sorted({name for adapter in PLATFORM_ADAPTERS.values() for name in adapter.field_map})
+
+_ROUTES = []
+for _adapter in PLATFORM_ADAPTERS.values():
+    _pattern = '^' + re.escape(_adapter.path).replace(re.escape('{account_id}'), '(?P<account_id>[^/]+)') + '$'
+    if all(route.pattern != _pattern for route, _ in _ROUTES):
+        _ROUTES.append((re.compile(_pattern), _adapter))
+
+
+def daily_metrics(account_id, day):
+    """Deterministic metrics for one account-day; followers grow over time."""
+    seed = zlib.crc32(f'{account_id}:{day.isoformat()}'.encode())
+    base = zlib.crc32(account_id.encode()) % 50000
+    reach = 500 + seed % 20000
+    metrics = {name: seed % (97 + i * 31) for i, name in enumerate(_METRIC_NAMES)}
+    metrics.update({
+        name: base + day.toordinal() % 1000 * 3
+        for name in _METRIC_NAMES if 'follower' in name or name in ('subscribers', 'page_fans')
+    })
+    metrics.update({name: reach for name in ('reach', 'uniqueViewers', 'page_impressions_unique')})
+    return metrics
+
+
+class MockPlatformHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        delay = float(self.headers.get('X-Mock-Delay', 0))
+        if delay:
+            time.sleep(delay)
+
+        url = urlsplit(self.path)
+        for pattern, adapter in _ROUTES:
+            match = pattern.match(url.path)
+            if match:
+                break
+        else:
+            return self._send(404, {'error': {'message': f'unknown path {url.path}'}})
+
+        account_id = match.group('account_id')
+        status = int(self.headers.get('X-Mock-Status', 200))
+        if account_id.startswith('ratelimited'):
+            status = 429
+        if status != 200:
+            extra = {'Retry-After': '1'} if status == 429 else {}
+            return self._send(status, {'error': {'message': 'mock error'}}, extra)
+
+        dates = sorted(date.fromisoformat(value[:10]) for _, value in parse_qsl(url.query))
+        if not dates:
+            return self._send(400, {'error': {'message': 'a date range is required'}})
+        start, end = dates[0], dates[-1]
+        records = []
+        for offset in range((end - start).days + 1):
+            day = start + timedelta(days=offset)
+            records.append({adapter.date_key: day.isoformat(), **daily_metrics(account_id, day)})
+        self._send(200, {adapter.records_key: records})
+
+    def _send(self, status, payload, headers=None):
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+
+class MockPlatformServer:
+    """Threaded mock server; usable as a context manager."""
+
+    def __init__(self, host='127.0.0.1', port=0):
+        self.httpd = ThreadingHTTPServer((host, port), MockPlatformHandler)
+        self.thread = None
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def start(self):
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Run the mock social platform insights server.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8091)
+    args = parser.parse_args()
+    server = MockPlatformServer(args.host, args.port)
+    print(f'Mock platform insights server listening on {server.url}')
+    server.httpd.serve_forever()
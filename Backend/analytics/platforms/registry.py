@@ -0,0 +1,54 @@
+"""
+Resolve a ``SocialAccount.platform`` to its process-wide adapter.
+
+Adapters are created once per process so their pooled connections are
+reused by every ingestion task the worker runs.
+"""
+import threading
+
+from .adapters import (
+    FacebookAdapter,
+    InstagramAdapter,
+    TikTokAdapter,
+    TwitterAdapter,
+    YouTubeAdapter,
+)
+
+PLATFORM_ADAPTERS = {
+    adapter.platform: adapter
+    for adapter in (TikTokAdapter, InstagramAdapter, YouTubeAdapter, TwitterAdapter, FacebookAdapter)
+}
+
+_adapters = {}
+_adapters_lock = threading.Lock()
+
+
+def register(adapter_class):
+    """Register (or replace) the adapter used for ``adapter_class.platform``."""
+    PLATFORM_ADAPTERS[adapter_class.platform] = adapter_class
+    with _adapters_lock:
+        stale = _adapters.pop(adapter_class.platform, None)
+    if stale is not None:
+        stale.close()
+    return adapter_class
+
+
+def get_adapter(platform):
+    """Return the adapter for ``platform``, or ``None`` if there is none."""
+    adapter_class = PLATFORM_ADAPTERS.get(platform)
+    if adapter_class is None:
+        return None
+    with _adapters_lock:
+        adapter = _adapters.get(platform)
+        if adapter is None:
+            adapter = _adapters[platform] = adapter_class()
+    return adapter
+
+
+def close_all():
+    """Close every adapter's connection pool (worker shutdown)."""
+    with _adapters_lock:
+        adapters = list(_adapters.values())
+        _adapters.clear()
+    for adapter in adapters:
+        adapter.close()
@@ -0,0 +1,219 @@
+"""
+Weekly and monthly rollups of ``AnalyticsData``, per account and per brand.
+
+Every write of daily snapshots marks the week and month it falls in as dirty
+(``DirtyRollupPeriod``, one row per account period however many days were
+written). ``refresh_dirty`` (beat, every minute) recomputes only those
+periods: one aggregate query per period over the affected accounts, upserted
+into ``AccountRollup``, then the affected brands' ``BrandRollup`` rows are
+summed from the fresh account rollups. A 12-month brand dashboard reads 12
+``BrandRollup`` rows instead of aggregating every account-day.
+
+``followers``/``following`` are gauges: a period keeps its last snapshot
+(brands sum their accounts'). Every other metric is a daily counter and is
+summed. Refreshing is idempotent; a mark renewed while its period was being
+recomputed survives for the next pass.
+"""
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Count, Max, OuterRef, Subquery, Sum
+from django.db.models.functions import TruncMonth, TruncWeek
+from django.utils import timezone
+
+from social.models import SocialAccount
+
+from .models import AccountRollup, AnalyticsData, BrandRollup, DirtyRollupPeriod
+
+WEEK = 'week'
+MONTH = 'month'
+PERIODS = (WEEK, MONTH)
+
+GAUGES = ('followers', 'following')
+COUNTERS = ('likes', 'comments', 'shares', 'impressions', 'reach', 'profile_views', 'website_clicks')
+METRICS = GAUGES + COUNTERS
+
+
+def period_start(period, day):
+    if period == WEEK:
+        return day - timedelta(days=day.weekday())
+    return day.replace(day=1)
+
+
+def period_end(period, start):
+    """First day after the period starting at ``start``."""
+    if period == WEEK:
+        return start + timedelta(days=7)
+    return (start.replace(day=28) + timedelta(days=4)).replace(day=1)
+
+
+def _batch_size():
+    return getattr(settings, 'ANALYTICS_ROLLUP_BATCH_SIZE', 1000)
+
+
+# ─── Dirty tracking ──────────────────────────────────────────────────────────
+
+def mark_dirty(pairs):
+    """Mark the week and month of each ``(social_account_id, date)`` for refresh."""
+    now = timezone.now()
+    keys = {(pk, period, period_start(period, day)) for pk, day in pairs for period in PERIODS}
+    _mark(keys, now)
+    return len(keys)
+
+
+def _mark(keys, now):
+    DirtyRollupPeriod.objects.bulk_create(
+        [
+            DirtyRollupPeriod(social_account_id=pk, period=period, period_start=start, marked_at=now)
+            for pk, period, start in keys
+        ],
+        batch_size=_batch_size(),
+        update_conflicts=True,
+        unique_fields=['social_account', 'period', 'period_start'],
+        update_fields=['marked_at'],
+    )
+
+
+def mark_range_dirty(start=None, end=None, account_ids=None):
+    """Mark every period that has data (optionally within a range) for refresh; for backfills."""
+    data = AnalyticsData.objects.order_by()
+    if start is not None:
+        data = data.filter(date__gte=period_start(MONTH, start))
+    if end is not None:
+        data = data.filter(date__lte=end)
+    if account_ids is not None:
+        data = data.filter(social_account_id__in=account_ids)
+
+    now = timezone.now()
+    marked = 0
+    for period, trunc in ((WEEK, TruncWeek), (MONTH, TruncMonth)):
+        keys = (
+            data.annotate(start=trunc('date'))
+            .values_list('social_account_id', 'start')
+            .distinct()
+            .iterator(chunk_size=_batch_size())
+        )
+        chunk = []
+        for pk, day in keys:
+            chunk.append((pk, period, day))
+            if len(chunk) == _batch_size():
+                _mark(chunk, now)
+                marked += len(chunk)
+                chunk = []
+        _mark(chunk, now)
+        marked += len(chunk)
+    return marked
+
+
+# ─── Refresh ─────────────────────────────────────────────────────────────────
+
+def refresh_dirty(batch_size=None, max_batches=None):
+    """Recompute dirty periods, oldest marks first; returns the number refreshed."""
+    batch_size = batch_size or _batch_size()
+    refreshed = 0
+    batches = 0
+    while max_batches is None or batches < max_batches:
+        dirty = list(
+            DirtyRollupPeriod.objects.order_by('marked_at', 'pk')
+            .values_list('pk', 'social_account_id', 'period', 'period_start', 'marked_at')[:batch_size]
+        )
+        if not dirty:
+            break
+        refresh_account_periods({(pk, period, start) for _, pk, period, start, _ in dirty})
+        # Marks renewed after this batch was read are newer than all of it.
+        DirtyRollupPeriod.objects.filter(
+            pk__in=[row[0] for row in dirty],
+            marked_at__lte=max(row[4] for row in dirty),
+        ).delete()
+        refreshed += len(dirty)
+        batches += 1
+        if len(dirty) < batch_size:
+            break
+    return refreshed
+
+
+def refresh_account_periods(keys):
+    """Recompute ``AccountRollup`` for ``(social_account_id, period, period_start)`` keys, then their brands."""
+    by_period = defaultdict(set)
+    for pk, period, start in keys:
+        by_period[period, start].add(pk)
+
+    for (period, start), account_ids in by_period.items():
+        end = period_end(period, start)
+        data = AnalyticsData.objects.filter(
+            social_account_id__in=account_ids, date__gte=start, date__lt=end,
+        ).order_by()
+        latest = data.filter(social_account=OuterRef('social_account')).order_by('-date')
+        rows = data.values('social_account_id').annotate(
+            days=Count('id'),
+            **{f'total_{name}': Sum(name) for name in COUNTERS},
+            **{f'last_{name}': Subquery(latest.values(name)[:1]) for name in GAUGES},
+        )
+        rollups = [
+            AccountRollup(
+                social_account_id=row['social_account_id'],
+                period=period,
+                period_start=start,
+                days=row['days'],
+                **{name: row[f'total_{name}'] or 0 for name in COUNTERS},
+                **{name: row[f'last_{name}'] or 0 for name in GAUGES},
+            )
+            for row in rows
+        ]
+        AccountRollup.objects.bulk_create(
+            rollups,
+            batch_size=_batch_size(),
+            update_conflicts=True,
+            unique_fields=['social_account', 'period', 'period_start'],
+            update_fields=['days', *METRICS, 'updated_at'],
+        )
+        # Periods whose snapshots were all deleted.
+        AccountRollup.objects.filter(
+            social_account_id__in=account_ids - {rollup.social_account_id for rollup in rollups},
+            period=period,
+            period_start=start,
+        ).delete()
+
+        brand_ids = set(
+            SocialAccount.objects.filter(pk__in=account_ids, brand__isnull=False)
+            .values_list('brand_id', flat=True)
+        )
+        if brand_ids:
+            refresh_brand_period(period, start, brand_ids)
+
+
+def refresh_brand_period(period, start, brand_ids):
+    """Recompute ``BrandRollup`` for ``brand_ids`` from their accounts' rollups."""
+    rows = (
+        AccountRollup.objects.filter(
+            period=period,
+            period_start=start,
+            social_account__brand_id__in=brand_ids,
+        )
+        .order_by()
+        .values('social_account__brand_id')
+        .annotate(days=Max('days'), **{f'total_{name}': Sum(name) for name in METRICS})
+    )
+    rollups = [
+        BrandRollup(
+            brand_id=row['social_account__brand_id'],
+            period=period,
+            period_start=start,
+            days=row['days'],
+            **{name: row[f'total_{name}'] or 0 for name in METRICS},
+        )
+        for row in rows
+    ]
+    BrandRollup.objects.bulk_create(
+        rollups,
+        batch_size=_batch_size(),
+        update_conflicts=True,
+        unique_fields=['brand', 'period', 'period_start'],
+        update_fields=['days', *METRICS, 'updated_at'],
+    )
+    BrandRollup.objects.filter(
+        brand_id__in=set(brand_ids) - {rollup.brand_id for rollup in rollups},
+        period=period,
+        period_start=start,
+    ).delete()
@@ -0,0 +1,52 @@
+from datetime import timedelta
+
+from django.utils import timezone
+from rest_framework import serializers
+
+from .export import FORMATS
+from .platforms import METRIC_FIELDS
+
+GRANULARITIES = ['day', 'week', 'month']
+
+
+class AnalyticsQuerySerializer(serializers.Serializer):
+    """Query parameters of ``GET /api/analytics/``"""
+    social_account = serializers.IntegerField(required=False)
+    brand = serializers.IntegerField(required=False)
+    start = serializers.DateField(required=False)
+    end = serializers.DateField(required=False)
+    granularity = serializers.ChoiceField(choices=GRANULARITIES, default='day')
+    metrics = serializers.CharField(required=False)
+    window = serializers.IntegerField(min_value=1, max_value=90, default=7)
+
+    def validate_metrics(self, value):
+        metrics = [name.strip() for name in value.split(',') if name.strip()]
+        unknown = sorted(set(metrics) - set(METRIC_FIELDS))
+        if unknown:
+            raise serializers.ValidationError(f'Unknown metrics: {", ".join(unknown)}')
+        return metrics or list(METRIC_FIELDS)
+
+    def validate(self, attrs):
+        if ('social_account' in attrs) == ('brand' in attrs):
+            raise serializers.ValidationError('Pass exactly one of social_account or brand')
+        attrs.setdefault('metrics', list(METRIC_FIELDS))
+        attrs.setdefault('end', timezone.localdate())
+        attrs.setdefault('start', attrs['end'] - timedelta(days=29))
+        if attrs['start'] > attrs['end']:
+            raise serializers.ValidationError('start must not be after end')
+        return attrs
+
+
+class AnalyticsExportQuerySerializer(serializers.Serializer):
+    """Query parameters of ``GET /api/analytics/export/``"""
+    # ``format`` is taken by DRF's content negotiation.
+    file_format = serializers.ChoiceField(choices=list(FORMATS), default='csv')
+    social_account = serializers.IntegerField(required=False)
+    brand = serializers.IntegerField(required=False)
+    start = serializers.DateField(required=False)
+    end = serializers.DateField(required=False)
+
+    def validate(self, attrs):
+        if attrs.get('start') and attrs.get('end') and attrs['start'] > attrs['end']:
+            raise serializers.ValidationError('start must not be after end')
+        return attrs
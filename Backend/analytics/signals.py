@@ -0,0 +1,37 @@
+from django.db import transaction
+from django.db.models import QuerySet
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from social.models import SocialAccount
+
+from . import rollups
+from .models import AnalyticsData
+
+
+@receiver(post_save, sender=AnalyticsData)
+def mark_rollups_dirty(sender, instance, raw=False, **kwargs):
+    """Single-row writes (admin, fixtures) go stale in the rollups like bulk ingestion does"""
+    if raw:
+        return
+    pair = (instance.social_account_id, instance.date)
+    transaction.on_commit(lambda: rollups.mark_dirty([pair]))
+
+
+@receiver(post_delete, sender=AnalyticsData)
+def mark_rollups_dirty_on_delete(sender, instance, origin=None, **kwargs):
+    """
+    Deleted snapshots go stale in the rollups too, unless they go with their
+    account: its rollups and marks are then deleted by the same cascade.
+    """
+    model = origin.model if isinstance(origin, QuerySet) else type(origin)
+    if origin is not None and model is not AnalyticsData:
+        return
+    pair = (instance.social_account_id, instance.date)
+
+    def mark():
+        # The account may have been deleted by the time this commits.
+        if SocialAccount.objects.filter(pk=pair[0]).exists():
+            rollups.mark_dirty([pair])
+
+    transaction.on_commit(mark)
@@ -0,0 +1,215 @@
+"""
+Physical layout of ``AnalyticsData``.
+
+Migrations give the table a covering ``(social_account, date DESC)`` index
+and an index on ``date`` (BRIN on PostgreSQL, B-tree elsewhere). On
+PostgreSQL the table can additionally be converted, once, into a table
+range-partitioned by month on ``date`` (``manage.py partition_analytics``):
+date-range reads only scan the months they cover, every partition keeps
+small indexes, and an old month can be detached or dropped whole. Reads
+without a date bound (an account's latest days) visit every partition
+instead, so partition once retention or table size calls for it and
+compare with ``manage.py bench_analytics`` first.
+``ensure_partitions`` (beat, daily) keeps the next
+``ANALYTICS_PARTITION_MONTHS_AHEAD`` months created; a row outside every
+month lands in the DEFAULT partition.
+
+On other databases, and while the table is not partitioned, partition
+management is a no-op and conversion raises ``StorageError``. SQLite
+development setups keep the plain table.
+"""
+import logging
+from datetime import date
+
+from django.conf import settings
+from django.db import DatabaseError, connection, transaction
+
+from .models import AnalyticsData
+
+logger = logging.getLogger(__name__)
+
+TABLE = AnalyticsData._meta.db_table
+UNPARTITIONED_TABLE = f'{TABLE}_unpartitioned'
+DEFAULT_PARTITION = f'{TABLE}_default'
+ID_SEQUENCE = f'{TABLE}_part_id_seq'
+
+
+class StorageError(Exception):
+    """The requested layout change is not possible on this database."""
+
+
+def months_ahead():
+    return getattr(settings, 'ANALYTICS_PARTITION_MONTHS_AHEAD', 3)
+
+
+def is_postgresql():
+    return connection.vendor == 'postgresql'
+
+
+def is_partitioned():
+    if not is_postgresql():
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(%s)', [TABLE])
+        return cursor.fetchone() is not None
+
+
+def month_start(day):
+    return day.replace(day=1)
+
+
+def add_months(month, count):
+    index = month.year * 12 + month.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month):
+    return f'{TABLE}_y{month:%Y}m{month:%m}'
+
+
+def partition_sql(month):
+    quote = connection.ops.quote_name
+    return (
+        f'CREATE TABLE IF NOT EXISTS {quote(partition_name(month))} PARTITION OF {quote(TABLE)} '
+        f"FOR VALUES FROM ('{month.isoformat()}') TO ('{add_months(month, 1).isoformat()}')"
+    )
+
+
+def partitions():
+    """Names of the current partitions, oldest first (DEFAULT last)."""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid '
+            'WHERE i.inhparent = to_regclass(%s) ORDER BY c.relname',
+            [TABLE],
+        )
+        names = [name for (name,) in cursor.fetchall()]
+    return sorted(names, key=lambda name: name == DEFAULT_PARTITION)
+
+
+def ensure_partitions(ahead=None, today=None):
+    """
+    Create the partitions of this month and the next ``ahead`` months.
+
+    Returns the names created. A month whose rows already sit in the DEFAULT
+    partition is skipped with a warning; move them out by hand.
+    """
+    if not is_partitioned():
+        return []
+    ahead = months_ahead() if ahead is None else ahead
+    first = month_start(today or date.today())
+    existing = set(partitions())
+    created = []
+    for offset in range(ahead + 1):
+        month = add_months(first, offset)
+        if partition_name(month) in existing:
+            continue
+        try:
+            with transaction.atomic(), connection.cursor() as cursor:
+                cursor.execute(partition_sql(month))
+        except DatabaseError as exc:
+            logger.warning('Could not create analytics partition for %s: %s', month, exc)
+            continue
+        created.append(partition_name(month))
+    return created
+
+
+def _suffixed(name, suffix='_old'):
+    return name[:63 - len(suffix)] + suffix
+
+
+def conversion_plan(ahead=None, drop_old=False, today=None):
+    """
+    SQL statements converting the plain table into a partitioned one.
+
+    The statements run in one transaction holding an ACCESS EXCLUSIVE lock:
+    the old table's constraints and indexes are renamed out of the way, the
+    table itself becomes ``<table>_unpartitioned``, and a partitioned table
+    of the same columns takes its name with one partition per month from the
+    oldest row to ``ahead`` months past ``today``, plus DEFAULT. Rows are
+    copied before the constraints and indexes are rebuilt under their
+    original names; ``vacuum_sql`` follows the commit. The primary key
+    becomes ``(id, date)`` because a partitioned table's unique keys must
+    contain the partition key; ``id`` stays unique through its own sequence.
+    """
+    if not is_postgresql():
+        raise StorageError('Partitioning analytics data requires PostgreSQL')
+    if is_partitioned():
+        raise StorageError(f'{TABLE} is already partitioned')
+    ahead = months_ahead() if ahead is None else ahead
+    quote = connection.ops.quote_name
+    table, old = quote(TABLE), quote(UNPARTITIONED_TABLE)
+
+    with connection.cursor() as cursor:
+        cursor.execute(f'SELECT min(date) FROM {table}')
+        (oldest,) = cursor.fetchone()
+        cursor.execute(
+            'SELECT conname, contype, pg_get_constraintdef(oid) FROM pg_constraint '
+            'WHERE conrelid = to_regclass(%s) ORDER BY contype, conname',
+            [TABLE],
+        )
+        constraints = cursor.fetchall()
+        cursor.execute(
+            'SELECT i.relname, pg_get_indexdef(x.indexrelid) FROM pg_index x '
+            'JOIN pg_class i ON i.oid = x.indexrelid '
+            'WHERE x.indrelid = to_regclass(%s) AND NOT EXISTS ('
+            '  SELECT 1 FROM pg_constraint c WHERE c.conrelid = x.indrelid AND c.conindid = x.indexrelid'
+            ') ORDER BY i.relname',
+            [TABLE],
+        )
+        indexes = cursor.fetchall()
+
+    current = month_start(today or date.today())
+    month, last = month_start(oldest or current), add_months(current, ahead)
+
+    plan = [f'LOCK TABLE {table} IN ACCESS EXCLUSIVE MODE']
+    # The kept copy must not hold foreign keys, or it would block deleting
+    # the social accounts it references.
+    plan += [
+        f'ALTER TABLE {table} DROP CONSTRAINT {quote(name)}' if kind == 'f'
+        else f'ALTER TABLE {table} RENAME CONSTRAINT {quote(name)} TO {quote(_suffixed(name))}'
+        for name, kind, _ in constraints
+    ]
+    plan += [f'ALTER INDEX {quote(name)} RENAME TO {quote(_suffixed(name))}' for name, _ in indexes]
+    plan += [
+        f'ALTER TABLE {table} RENAME TO {old}',
+        f'CREATE TABLE {table} (LIKE {old} INCLUDING DEFAULTS) PARTITION BY RANGE ("date")',
+        f'CREATE SEQUENCE {quote(ID_SEQUENCE)} AS bigint OWNED BY {table}."id"',
+        f"ALTER TABLE {table} ALTER COLUMN \"id\" SET DEFAULT nextval('{ID_SEQUENCE}')",
+    ]
+    while month <= last:
+        plan.append(partition_sql(month))
+        month = add_months(month, 1)
+    plan += [
+        f'CREATE TABLE {quote(DEFAULT_PARTITION)} PARTITION OF {table} DEFAULT',
+        f'INSERT INTO {table} SELECT * FROM {old}',
+        f"SELECT setval('{ID_SEQUENCE}', COALESCE((SELECT max(\"id\") FROM {table}), 0) + 1, false)",
+    ]
+    for name, kind, definition in constraints:
+        if kind == 'p':
+            definition = 'PRIMARY KEY ("id", "date")'
+        plan.append(f'ALTER TABLE {table} ADD CONSTRAINT {quote(name)} {definition}')
+    # Index definitions name the table, which by now is the partitioned one.
+    plan += [definition for _, definition in indexes]
+    if drop_old:
+        plan.append(f'DROP TABLE {old}')
+    return plan
+
+
+def vacuum_sql():
+    """
+    Run after a conversion commits: the copied rows have no visibility map
+    yet, which keeps the planner off index-only scans, and no statistics.
+    """
+    return f'VACUUM (ANALYZE) {connection.ops.quote_name(TABLE)}'
+
+
+def convert(ahead=None, drop_old=False):
+    """Run ``conversion_plan`` atomically, then ``vacuum_sql``; returns the plan."""
+    plan = conversion_plan(ahead, drop_old)
+    with transaction.atomic(), connection.cursor() as cursor:
+        for statement in plan:
+            cursor.execute(statement)
+    with connection.cursor() as cursor:
+        cursor.execute(vacuum_sql())
+    return plan
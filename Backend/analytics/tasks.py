@@ -0,0 +1,40 @@
+from datetime import date
+
+from celery import shared_task
+from celery.signals import worker_process_shutdown
+
+from . import ingestion, platforms, rollups, storage
+
+
+@shared_task(name='analytics.sync_all_accounts', ignore_result=True)
+def sync_all_accounts():
+    """Nightly fan-out of the ingestion window; see ``CELERY_BEAT_SCHEDULE``."""
+    ingestion.schedule_sync()
+
+
+@shared_task(bind=True, name='analytics.ingest_accounts', acks_late=True, ignore_result=True, max_retries=5)
+def ingest_accounts(self, account_ids, start, end):
+    """Fetch and upsert one chunk of accounts; retries only the rate-limited ones."""
+    result = ingestion.ingest_accounts(account_ids, date.fromisoformat(start), date.fromisoformat(end))
+    if result['throttled'] and not self.request.is_eager and self.request.retries < self.max_retries:
+        raise self.retry(
+            args=[result['throttled'], start, end],
+            countdown=max(result['retry_after'] or 0, 60 * 2 ** self.request.retries),
+        )
+
+
+@shared_task(name='analytics.refresh_rollups', ignore_result=True)
+def refresh_rollups():
+    """Recompute dirty rollup periods; see ``CELERY_BEAT_SCHEDULE``."""
+    rollups.refresh_dirty()
+
+
+@shared_task(name='analytics.ensure_partitions', ignore_result=True)
+def ensure_partitions():
+    """Create upcoming monthly partitions (no-op unless partitioned); see ``CELERY_BEAT_SCHEDULE``."""
+    storage.ensure_partitions()
+
+
+@worker_process_shutdown.connect
+def close_platform_clients(**kwargs):
+    platforms.close_all()
@@ -0,0 +1,165 @@
+import csv
+import io
+import sys
+from datetime import date
+from unittest import mock
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+from asgiref.sync import async_to_sync
+from django.contrib.auth import get_user_model
+from django.test import AsyncClient, TestCase
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from analytics import export
+from analytics.models import AnalyticsData
+from social.models import Brand, SocialAccount
+
+URL = '/api/analytics/export/'
+
+
+class ExportDataMixin:
+    @classmethod
+    def setUpTestData(cls):
+        User = get_user_model()
+        cls.user = User.objects.create_user(email='owner@example.com', password='s3cret-pass!')
+        cls.other = User.objects.create_user(email='other@example.com', password='s3cret-pass!')
+        cls.staff = User.objects.create_user(email='staff@example.com', password='s3cret-pass!', is_staff=True)
+        cls.brand = Brand.objects.create(user=cls.user, name='Acme')
+        cls.mine = SocialAccount.objects.create(user=cls.user, brand=cls.brand, platform='tiktok', account_id='a')
+        cls.theirs = SocialAccount.objects.create(user=cls.other, platform='youtube', account_id='b')
+        for account, days in ((cls.mine, range(1, 6)), (cls.theirs, (1, 2))):
+            for day in days:
+                AnalyticsData.objects.create(social_account=account, date=date(2025, 4, day), followers=day, reach=10)
+
+
+class StreamTests(ExportDataMixin, TestCase):
+    def queryset(self):
+        return export.export_queryset(account_ids=[self.mine.pk])
+
+    def test_chunks_are_bounded_and_ordered(self):
+        chunks = list(export.iter_chunks(self.queryset(), size=2))
+        self.assertEqual([len(chunk) for chunk in chunks], [2, 2, 1])
+        self.assertEqual([row[3] for chunk in chunks for row in chunk], [date(2025, 4, day) for day in range(1, 6)])
+        self.assertEqual(chunks[0][0][:3], (self.mine.pk, self.brand.pk, 'tiktok'))
+
+    def test_csv_yields_a_block_per_chunk(self):
+        blocks = list(export.stream(self.queryset(), 'csv', size=2))
+        self.assertEqual(len(blocks), 3)
+        rows = list(csv.reader(io.StringIO(b''.join(blocks).decode())))
+        self.assertEqual(tuple(rows[0]), export.COLUMNS)
+        self.assertEqual([row[3] for row in rows[1:]], [f'2025-04-0{day}' for day in range(1, 6)])
+        followers = export.COLUMNS.index('followers')
+        self.assertEqual([int(row[followers]) for row in rows[1:]], [1, 2, 3, 4, 5])
+
+    def test_parquet_writes_one_row_group_per_chunk(self):
+        blocks = export.stream(self.queryset(), 'parquet', size=2)
+        parquet = pq.ParquetFile(io.BytesIO(b''.join(blocks)))
+        self.assertEqual(parquet.num_row_groups, 3)
+        self.assertEqual(parquet.schema_arrow, export.arrow_schema())
+        table = parquet.read()
+        self.assertEqual(table.column('followers').to_pylist(), [1, 2, 3, 4, 5])
+        self.assertEqual(table.column('date').to_pylist()[0], date(2025, 4, 1))
+
+    def test_arrow_writes_one_record_batch_per_chunk(self):
+        blocks = list(export.stream(self.queryset(), 'arrow', size=2))
+        reader = pa.ipc.open_stream(b''.join(blocks))
+        batches = list(reader)
+        self.assertEqual([batch.num_rows for batch in batches], [2, 2, 1])
+        self.assertEqual(reader.schema, export.arrow_schema())
+        # The schema and the first batch go out before the rest is read.
+        self.assertGreaterEqual(len(blocks), 3)
+
+    def test_empty_exports_are_still_valid_files(self):
+        empty = export.export_queryset(start=date(2030, 1, 1))
+        self.assertEqual(b''.join(export.stream(empty, 'csv')).decode().strip(), ','.join(export.COLUMNS))
+        self.assertEqual(pq.ParquetFile(io.BytesIO(b''.join(export.stream(empty, 'parquet')))).metadata.num_rows, 0)
+        self.assertEqual(pa.ipc.open_stream(b''.join(export.stream(empty, 'arrow'))).read_all().num_rows, 0)
+
+    def test_unknown_format(self):
+        with self.assertRaises(export.ExportError):
+            export.stream(self.queryset(), 'xlsx')
+
+    def test_missing_pyarrow_fails_before_streaming(self):
+        with mock.patch.dict(sys.modules, {'pyarrow': None}):
+            with self.assertRaises(export.ExportError):
+                export.stream(self.queryset(), 'parquet')
+            self.assertTrue(list(export.stream(self.queryset(), 'csv')))
+
+    def test_filters(self):
+        self.assertEqual(export.export_queryset(user=self.other).count(), 2)
+        self.assertEqual(export.export_queryset(brand_ids=[self.brand.pk]).count(), 5)
+        self.assertEqual(export.export_queryset(start=date(2025, 4, 2), end=date(2025, 4, 3)).count(), 3)
+
+
+class AiterateTests(TestCase):
+    def test_blocks_are_pulled_one_at_a_time(self):
+        pulled = []
+
+        def blocks():
+            for block in (b'a', b'b', b'c'):
+                pulled.append(block)
+                yield block
+
+        async def first_then_rest():
+            iterator = export.aiterate(blocks())
+            first = await iterator.__anext__()
+            seen = list(pulled)
+            return first, seen, [block async for block in iterator]
+
+        first, seen, rest = async_to_sync(first_then_rest)()
+        self.assertEqual(first, b'a')
+        self.assertEqual(seen, [b'a'])
+        self.assertEqual(rest, [b'b', b'c'])
+
+
+class ExportViewTests(ExportDataMixin, TestCase):
+    def export(self, user, **params):
+        client = APIClient()
+        client.force_authenticate(user)
+        return client.get(URL, params)
+
+    def rows(self, response):
+        return list(csv.reader(io.StringIO(b''.join(response.streaming_content).decode())))[1:]
+
+    def test_users_only_export_their_own_accounts(self):
+        response = self.export(self.user)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        self.assertIn('attachment; filename="analytics_', response['Content-Disposition'])
+        self.assertEqual({int(row[0]) for row in self.rows(response)}, {self.mine.pk})
+
+        response = self.export(self.user, social_account=self.theirs.pk)
+        self.assertEqual(self.rows(response), [])
+
+    def test_staff_export_every_account(self):
+        rows = self.rows(self.export(self.staff))
+        self.assertEqual(len(rows), 7)
+        self.assertEqual({int(row[0]) for row in rows}, {self.mine.pk, self.theirs.pk})
+
+    def test_arrow_format(self):
+        response = self.export(self.other, file_format='arrow')
+        self.assertEqual(response['Content-Type'], export.FORMATS['arrow'][0])
+        table = pa.ipc.open_stream(b''.join(response.streaming_content)).read_all()
+        self.assertEqual(table.column('social_account_id').to_pylist(), [self.theirs.pk] * 2)
+
+    def test_invalid_parameters(self):
+        self.assertEqual(self.export(self.user, file_format='xlsx').status_code, 400)
+        self.assertEqual(self.export(self.user, start='2025-04-05', end='2025-04-01').status_code, 400)
+
+    def test_missing_pyarrow_is_501(self):
+        with mock.patch.dict(sys.modules, {'pyarrow': None}):
+            self.assertEqual(self.export(self.user, file_format='parquet').status_code, 501)
+
+    def test_asgi_requests_stream_asynchronously(self):
+        token = str(RefreshToken.for_user(self.user).access_token)
+
+        async def fetch():
+            response = await AsyncClient().get(URL, headers={'Authorization': f'Bearer {token}'})
+            self.assertTrue(response.is_async)
+            return response.status_code, b''.join([block async for block in response.streaming_content])
+
+        code, body = async_to_sync(fetch)()
+        self.assertEqual(code, 200)
+        self.assertEqual(len(body.decode().strip().splitlines()), 6)
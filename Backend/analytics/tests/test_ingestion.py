@@ -0,0 +1,115 @@
+from datetime import date
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+
+from analytics import ingestion, platforms
+from analytics.models import AnalyticsData, DirtyRollupPeriod
+from analytics.platforms.mock import MockPlatformServer
+from social.models import SocialAccount
+
+START, END = date(2025, 3, 30), date(2025, 4, 2)
+
+
+def metrics(value):
+    return {name: value for name in platforms.METRIC_FIELDS}
+
+
+class UpsertTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        user = get_user_model().objects.create_user(email='owner@example.com', password='s3cret-pass!')
+        cls.account = SocialAccount.objects.create(user=user, platform='tiktok', account_id='acct-1')
+
+    def rows(self, value, days):
+        return [AnalyticsData(social_account=self.account, date=day, **metrics(value)) for day in days]
+
+    def test_inserts_new_rows_and_updates_existing_ones_in_place(self):
+        ingestion.upsert(self.rows(1, [date(2025, 4, 1), date(2025, 4, 2)]))
+        original = AnalyticsData.objects.get(date=date(2025, 4, 1)).pk
+
+        self.assertEqual(ingestion.upsert(self.rows(7, [date(2025, 4, 1), date(2025, 4, 3)])), 2)
+
+        values = dict(AnalyticsData.objects.values_list('date', 'reach'))
+        self.assertEqual(values, {date(2025, 4, 1): 7, date(2025, 4, 2): 1, date(2025, 4, 3): 7})
+        self.assertEqual(AnalyticsData.objects.get(date=date(2025, 4, 1)).pk, original)
+
+    def test_small_batches_write_every_row(self):
+        days = [date(2025, 4, day) for day in range(1, 8)]
+        ingestion.upsert(self.rows(3, days), batch_size=2)
+        ingestion.upsert(self.rows(4, days), batch_size=2)
+        self.assertEqual(set(AnalyticsData.objects.values_list('reach', flat=True)), {4})
+        self.assertEqual(AnalyticsData.objects.count(), 7)
+
+    def test_marks_the_week_and_month_of_written_days(self):
+        ingestion.upsert(self.rows(1, [START, END]))
+        self.assertEqual(
+            set(DirtyRollupPeriod.objects.values_list('period', 'period_start')),
+            {('week', date(2025, 3, 24)), ('week', date(2025, 3, 31)),
+             ('month', date(2025, 3, 1)), ('month', date(2025, 4, 1))},
+        )
+
+    def test_nothing_to_write(self):
+        self.assertEqual(ingestion.upsert([]), 0)
+        self.assertFalse(DirtyRollupPeriod.objects.exists())
+
+
+class IngestAccountsTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = MockPlatformServer().start()
+        cls.addClassCleanup(cls.server.stop)
+
+    @classmethod
+    def setUpTestData(cls):
+        user = get_user_model().objects.create_user(email='owner@example.com', password='s3cret-pass!')
+        cls.accounts = [
+            SocialAccount.objects.create(user=user, platform=platform, account_id=f'{platform}-1')
+            for platform in ('tiktok', 'instagram', 'youtube', 'twitter', 'facebook')
+        ]
+        cls.limited = SocialAccount.objects.create(user=user, platform='tiktok', account_id='ratelimited-1')
+
+    def setUp(self):
+        # Adapters read their base URL once; drop the ones built for other settings.
+        platforms.close_all()
+        self.addCleanup(platforms.close_all)
+        settings = override_settings(ANALYTICS_PLATFORM_BASE_URLS={'default': self.server.url})
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+    def ingest(self, **kwargs):
+        return ingestion.ingest_accounts([account.pk for account in self.accounts], START, END, **kwargs)
+
+    def snapshot(self):
+        return list(AnalyticsData.objects.order_by('social_account', 'date').values_list(
+            'social_account', 'date', *platforms.METRIC_FIELDS,
+        ))
+
+    def test_writes_one_row_per_account_day(self):
+        result = self.ingest(chunk_size=3)
+        self.assertEqual(result['accounts'], 5)
+        self.assertEqual(result['rows'], 20)
+        self.assertEqual(result['failed'], [])
+        self.assertEqual(AnalyticsData.objects.count(), 20)
+        self.assertTrue(AnalyticsData.objects.filter(followers__gt=0, reach__gt=0).exists())
+
+    def test_rerunning_a_window_is_idempotent(self):
+        self.ingest()
+        first = self.snapshot()
+        self.ingest(chunk_size=7)
+        self.assertEqual(self.snapshot(), first)
+
+    def test_revised_days_overwrite_stored_values(self):
+        account = self.accounts[0]
+        AnalyticsData.objects.create(social_account=account, date=END, **metrics(-1))
+        self.ingest()
+        self.assertEqual(AnalyticsData.objects.filter(social_account=account, date=END).count(), 1)
+        self.assertFalse(AnalyticsData.objects.filter(reach=-1).exists())
+
+    def test_rate_limited_accounts_are_returned_for_retry(self):
+        result = ingestion.ingest_accounts([self.accounts[0].pk, self.limited.pk], START, END)
+        self.assertEqual(result['throttled'], [self.limited.pk])
+        self.assertEqual(result['retry_after'], 1)
+        self.assertFalse(AnalyticsData.objects.filter(social_account=self.limited).exists())
+        self.assertEqual(AnalyticsData.objects.filter(social_account=self.accounts[0]).count(), 4)
@@ -0,0 +1,56 @@
+from datetime import date
+
+from django.contrib.auth import get_user_model
+from django.test import TransactionTestCase
+
+from analytics import rollups
+from analytics.models import AccountRollup, AnalyticsData, DirtyRollupPeriod
+from social.models import Brand, SocialAccount
+
+DAY = date(2025, 4, 2)
+
+
+# on_commit callbacks only run when the transaction really commits.
+class RollupSignalTests(TransactionTestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(email='owner@example.com', password='s3cret-pass!')
+        self.brand = Brand.objects.create(user=self.user, name='Acme')
+        self.account = SocialAccount.objects.create(
+            user=self.user, brand=self.brand, platform='tiktok', account_id='a',
+        )
+        self.row = AnalyticsData.objects.create(social_account=self.account, date=DAY, followers=10, reach=5)
+
+    def dirty(self):
+        return set(DirtyRollupPeriod.objects.values_list('social_account_id', 'period', 'period_start'))
+
+    def test_save_marks_the_week_and_month(self):
+        self.assertEqual(self.dirty(), {
+            (self.account.pk, rollups.WEEK, date(2025, 3, 31)),
+            (self.account.pk, rollups.MONTH, date(2025, 4, 1)),
+        })
+
+    def test_delete_marks_the_periods_again(self):
+        rollups.refresh_dirty()
+        self.assertEqual(self.dirty(), set())
+        self.row.delete()
+        self.assertEqual(len(self.dirty()), 2)
+
+        rollups.refresh_dirty()
+        self.assertFalse(AccountRollup.objects.exists())
+
+    def test_queryset_delete_marks_the_periods(self):
+        rollups.refresh_dirty()
+        AnalyticsData.objects.filter(social_account=self.account).delete()
+        self.assertEqual(len(self.dirty()), 2)
+
+    def test_deleting_the_account_cascades_cleanly(self):
+        rollups.refresh_dirty()
+        self.account.delete()
+        self.assertFalse(AnalyticsData.objects.exists())
+        self.assertEqual(self.dirty(), set())
+        self.assertFalse(AccountRollup.objects.exists())
+
+    def test_deleting_the_user_cascades_cleanly(self):
+        self.user.delete()
+        self.assertFalse(SocialAccount.objects.exists())
+        self.assertEqual(self.dirty(), set())
@@ -0,0 +1,134 @@
+from datetime import date
+from io import StringIO
+from unittest import mock, skipIf
+
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import SimpleTestCase, TestCase
+
+from analytics import storage
+
+
+class FakeCursor:
+    """Answers ``fetchone``/``fetchall`` calls with ``results`` in order."""
+
+    def __init__(self, results):
+        self.results = iter(results)
+        self.executed = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def execute(self, sql, params=None):
+        self.executed.append(sql)
+
+    def fetchone(self):
+        return next(self.results)
+
+    fetchall = fetchone
+
+
+def postgresql(cursor):
+    return mock.patch.object(
+        storage, 'connection', mock.Mock(vendor='postgresql', ops=connection.ops, cursor=lambda: cursor),
+    )
+
+
+class MonthTests(SimpleTestCase):
+    def test_add_months_crosses_years(self):
+        self.assertEqual(storage.add_months(date(2025, 11, 1), 2), date(2026, 1, 1))
+        self.assertEqual(storage.add_months(date(2025, 1, 1), -1), date(2024, 12, 1))
+        self.assertEqual(storage.add_months(date(2025, 4, 1), 0), date(2025, 4, 1))
+        self.assertEqual(storage.month_start(date(2024, 2, 29)), date(2024, 2, 1))
+
+    def test_partition_covers_one_month(self):
+        self.assertEqual(storage.partition_name(date(2025, 12, 1)), 'analytics_analyticsdata_y2025m12')
+        self.assertEqual(
+            storage.partition_sql(date(2025, 12, 1)),
+            'CREATE TABLE IF NOT EXISTS "analytics_analyticsdata_y2025m12" PARTITION OF '
+            '"analytics_analyticsdata" FOR VALUES FROM (\'2025-12-01\') TO (\'2026-01-01\')',
+        )
+
+
+class ConversionPlanTests(SimpleTestCase):
+    def plan(self, drop_old=False):
+        cursor = FakeCursor([
+            None,  # is_partitioned
+            (date(2025, 11, 20),),
+            [
+                ('analytics_fk', 'f', 'FOREIGN KEY (social_account_id) REFERENCES social_socialaccount(id)'),
+                ('analytics_pkey', 'p', 'PRIMARY KEY (id)'),
+                ('analytics_uniq', 'u', 'UNIQUE (social_account_id, date)'),
+            ],
+            [('analytics_date_brin', 'CREATE INDEX analytics_date_brin ON analytics_analyticsdata USING brin (date)')],
+        ])
+        with postgresql(cursor):
+            return storage.conversion_plan(ahead=1, drop_old=drop_old, today=date(2026, 1, 15))
+
+    def test_partitions_run_from_the_oldest_row_to_months_ahead(self):
+        plan = self.plan()
+        months = [statement for statement in plan if 'FOR VALUES FROM' in statement]
+        self.assertEqual(
+            [statement.split('"')[1] for statement in months],
+            [storage.partition_name(month) for month in (
+                date(2025, 11, 1), date(2025, 12, 1), date(2026, 1, 1), date(2026, 2, 1),
+            )],
+        )
+        self.assertIn('CREATE TABLE "analytics_analyticsdata_default" PARTITION OF "analytics_analyticsdata" DEFAULT', plan)
+        self.assertEqual(plan[0], 'LOCK TABLE "analytics_analyticsdata" IN ACCESS EXCLUSIVE MODE')
+
+    def test_constraints_are_moved_and_rebuilt(self):
+        plan = self.plan()
+        self.assertIn('ALTER TABLE "analytics_analyticsdata" DROP CONSTRAINT "analytics_fk"', plan)
+        self.assertIn('ALTER TABLE "analytics_analyticsdata" RENAME CONSTRAINT "analytics_pkey" TO "analytics_pkey_old"', plan)
+        self.assertIn('ALTER INDEX "analytics_date_brin" RENAME TO "analytics_date_brin_old"', plan)
+        copy = plan.index('INSERT INTO "analytics_analyticsdata" SELECT * FROM "analytics_analyticsdata_unpartitioned"')
+        rebuilt = plan[copy + 2:]
+        self.assertEqual(rebuilt, [
+            'ALTER TABLE "analytics_analyticsdata" ADD CONSTRAINT "analytics_fk" '
+            'FOREIGN KEY (social_account_id) REFERENCES social_socialaccount(id)',
+            'ALTER TABLE "analytics_analyticsdata" ADD CONSTRAINT "analytics_pkey" PRIMARY KEY ("id", "date")',
+            'ALTER TABLE "analytics_analyticsdata" ADD CONSTRAINT "analytics_uniq" UNIQUE (social_account_id, date)',
+            'CREATE INDEX analytics_date_brin ON analytics_analyticsdata USING brin (date)',
+        ])
+
+    def test_drop_old(self):
+        self.assertNotIn('DROP TABLE "analytics_analyticsdata_unpartitioned"', self.plan())
+        self.assertEqual(self.plan(drop_old=True)[-1], 'DROP TABLE "analytics_analyticsdata_unpartitioned"')
+
+    def test_long_names_stay_within_the_identifier_limit(self):
+        self.assertEqual(len(storage._suffixed('x' * 70)), 63)
+        self.assertTrue(storage._suffixed('x' * 70).endswith('_old'))
+
+
+class EnsurePartitionsTests(SimpleTestCase):
+    def test_creates_only_missing_months(self):
+        cursor = FakeCursor([
+            (1,),  # is_partitioned
+            [(storage.partition_name(date(2026, 1, 1)),), (storage.DEFAULT_PARTITION,)],
+        ])
+        with postgresql(cursor), mock.patch.object(storage.transaction, 'atomic'):
+            created = storage.ensure_partitions(ahead=2, today=date(2026, 1, 15))
+        self.assertEqual(created, [storage.partition_name(date(2026, 2, 1)), storage.partition_name(date(2026, 3, 1))])
+        self.assertEqual(cursor.executed[-2:], [storage.partition_sql(date(2026, 2, 1)), storage.partition_sql(date(2026, 3, 1))])
+
+
+class DatabaseStorageTests(TestCase):
+    @skipIf(connection.vendor == 'postgresql', 'partitioning is available on PostgreSQL')
+    def test_partitioning_is_a_no_op_or_an_error_elsewhere(self):
+        self.assertFalse(storage.is_partitioned())
+        self.assertEqual(storage.ensure_partitions(), [])
+        with self.assertRaises(storage.StorageError):
+            storage.conversion_plan()
+        with self.assertRaises(CommandError):
+            call_command('partition_analytics', stdout=StringIO())
+
+    def test_indexes_exist(self):
+        with connection.cursor() as cursor:
+            constraints = connection.introspection.get_constraints(cursor, storage.TABLE)
+        self.assertEqual(constraints['analytics_account_date_desc']['columns'], ['social_account_id', 'date'])
+        date_index = 'analytics_date_brin' if connection.vendor == 'postgresql' else 'analytics_date_idx'
+        self.assertEqual(constraints[date_index]['columns'], ['date'])
@@ -0,0 +1,47 @@
+from datetime import date
+
+import numpy as np
+from django.test import SimpleTestCase
+
+from analytics import timeseries
+
+NAN = np.nan
+DAYS = [date(2025, 4, day) for day in range(1, 6)]
+
+
+class TimeseriesTests(SimpleTestCase):
+    def test_missing_days_are_null_points(self):
+        dates, columns = timeseries.to_columns(
+            [(DAYS[0], 10), (DAYS[3], 40), (date(2025, 5, 1), 99)], ['reach'], DAYS,
+        )
+        self.assertEqual(dates, DAYS)
+        self.assertEqual(timeseries.to_json(columns['reach']), [10, None, None, 40, None])
+
+    def test_gaps_propagate_into_deltas_and_averages(self):
+        values = np.array([10, 20, NAN, 40, 50, 60])
+        self.assertEqual(timeseries.to_json(timeseries.delta(values)), [None, 10, None, None, 10, 10])
+        self.assertEqual(timeseries.to_json(timeseries.growth_rate(values)), [None, 1, None, None, 0.25, 0.2])
+        self.assertEqual(
+            timeseries.to_json(timeseries.moving_average(values, 2)), [None, 15, None, None, 45, 55],
+        )
+
+    def test_summaries_skip_missing_points_and_gauge_totals(self):
+        values = np.array([NAN, 100, NAN, 150])
+        self.assertEqual(
+            timeseries.summarize(values),
+            {'first': 100, 'last': 150, 'change': 50, 'growth_rate': 0.5, 'total': 250},
+        )
+        self.assertNotIn('total', timeseries.summarize(values, total=False))
+
+    def test_series_payload(self):
+        metrics = ['followers', 'likes', 'comments', 'shares', 'reach']
+        rows = [(DAYS[0], 100, 5, 3, 2, 100), (DAYS[2], 110, 10, 0, 0, 50)]
+        payload = timeseries.build_series(rows, metrics, 2, DAYS[:3])
+
+        self.assertEqual(payload['dates'], [day.isoformat() for day in DAYS[:3]])
+        self.assertEqual(payload['metrics']['followers']['delta'], [None, None, None])
+        self.assertEqual(payload['summary']['followers']['change'], 10)
+        self.assertNotIn('total', payload['summary']['followers'])
+        self.assertEqual(payload['summary']['likes']['total'], 15)
+        self.assertEqual(payload['engagement_rate'], [0.1, None, 0.2])
+        self.assertEqual(payload['summary']['engagement_rate'], 0.133333)
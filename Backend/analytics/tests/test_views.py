@@ -0,0 +1,75 @@
+from datetime import date
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from analytics.models import AnalyticsData
+from social.models import Brand, SocialAccount
+
+URL = '/api/analytics/'
+
+
+class AnalyticsViewTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(email='owner@example.com', password='s3cret-pass!')
+        cls.brand = Brand.objects.create(user=cls.user, name='Acme')
+        cls.first = SocialAccount.objects.create(user=cls.user, brand=cls.brand, platform='tiktok', account_id='a')
+        cls.second = SocialAccount.objects.create(user=cls.user, brand=cls.brand, platform='youtube', account_id='b')
+        for account, days in ((cls.first, (1, 2, 3, 4)), (cls.second, (1, 3, 4))):
+            for day in days:
+                AnalyticsData.objects.create(social_account=account, date=date(2025, 4, day), followers=100, reach=10)
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def series(self, headers=None, **params):
+        query = {'start': '2025-04-01', 'end': '2025-04-05', 'metrics': 'followers,reach', **params}
+        return self.client.get(URL, query, headers=headers)
+
+    def test_every_day_of_the_range_is_a_point(self):
+        self.first.analytics.filter(date=date(2025, 4, 3)).delete()
+        data = self.series(social_account=self.first.pk).json()
+
+        self.assertEqual(data['dates'], [f'2025-04-0{day}' for day in range(1, 6)])
+        self.assertEqual(data['metrics']['followers']['values'], [100, 100, None, 100, None])
+        self.assertEqual(data['metrics']['followers']['delta'], [None, 0, None, None, None])
+        self.assertNotIn('total', data['summary']['followers'])
+        self.assertEqual(data['summary']['reach']['total'], 30)
+
+    def test_brand_days_missed_by_an_account_are_gaps_not_dips(self):
+        data = self.series(brand=self.brand.pk).json()
+        self.assertEqual(data['metrics']['followers']['values'], [200, None, 200, 200, None])
+        self.assertEqual(data['summary']['followers']['change'], 0)
+
+    def test_accounts_that_start_reporting_later_do_not_blank_earlier_days(self):
+        self.second.analytics.filter(date__lt=date(2025, 4, 3)).delete()
+        data = self.series(brand=self.brand.pk).json()
+        self.assertEqual(data['metrics']['followers']['values'], [100, 100, 200, 200, None])
+
+    def test_month_series_lists_every_period(self):
+        data = self.series(social_account=self.first.pk, granularity='month', start='2025-03-15').json()
+        self.assertEqual(data['dates'], ['2025-03-01', '2025-04-01'])
+        self.assertEqual(data['metrics']['reach']['values'], [None, None])
+
+    def test_if_none_match(self):
+        etag = self.series(social_account=self.first.pk)['ETag']
+        for header in (etag, f'"other", {etag}', f'W/{etag}', '*'):
+            with self.subTest(header=header):
+                response = self.series(social_account=self.first.pk, headers={'If-None-Match': header})
+                self.assertEqual(response.status_code, 304)
+                self.assertEqual(response['ETag'], etag)
+
+        for header in ('"other"', f'"x{etag[1:]}', etag[1:-5]):
+            with self.subTest(header=header):
+                response = self.series(social_account=self.first.pk, headers={'If-None-Match': header})
+                self.assertEqual(response.status_code, 200)
+
+    def test_changed_data_invalidates_the_etag(self):
+        etag = self.series(social_account=self.first.pk)['ETag']
+        AnalyticsData.objects.create(social_account=self.first, date=date(2025, 4, 5), followers=101)
+        response = self.series(social_account=self.first.pk, headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['metrics']['followers']['values'][-1], 101)
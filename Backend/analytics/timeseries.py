@@ -0,0 +1,149 @@
+"""
+Time-series math for the analytics API, vectorized with NumPy.
+
+Rows are fetched column-wise (``values_list``) in date order and turned into
+one float array per metric; deltas, growth rates, moving averages and
+engagement rate are then whole-array operations rather than a Python loop
+per row. Series are reindexed onto every day (or period) of the requested
+range first, so a missing snapshot is a ``NaN`` point rather than two
+neighbours that look adjacent. Undefined points (missing snapshots and
+anything derived from them, the first delta, growth from zero, the first
+``window - 1`` averages, engagement without reach) are ``NaN`` internally
+and ``null`` in JSON.
+"""
+import numpy as np
+
+from .rollups import GAUGES
+
+DECIMALS = 6
+
+
+def to_columns(rows, metrics, index=None):
+    """
+    ``[(date, m1, m2, ...)]`` → ``(dates, {metric: float64 array})``.
+
+    With ``index`` (every date of the range, ascending) the columns are laid
+    out on it, ``NaN`` where ``rows`` has no date; rows outside it are dropped.
+    """
+    if index is None:
+        if not rows:
+            return [], {name: np.empty(0) for name in metrics}
+        dates, *columns = zip(*rows)
+        return list(dates), {
+            name: np.asarray(column, dtype=np.float64) for name, column in zip(metrics, columns)
+        }
+
+    index = list(index)
+    positions = {day: i for i, day in enumerate(index)}
+    rows = [row for row in rows if row[0] in positions]
+    out = {name: np.full(len(index), np.nan) for name in metrics}
+    if rows:
+        dates, *columns = zip(*rows)
+        at = np.fromiter((positions[day] for day in dates), dtype=np.intp, count=len(dates))
+        for name, column in zip(metrics, columns):
+            out[name][at] = np.asarray(column, dtype=np.float64)
+    return index, out
+
+
+def delta(values):
+    """Change from the previous point."""
+    out = np.full(values.shape, np.nan)
+    out[1:] = np.diff(values)
+    return out
+
+
+def growth_rate(values):
+    """Relative change from the previous point (``NaN`` where it was 0)."""
+    out = np.full(values.shape, np.nan)
+    previous = values[:-1]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        out[1:] = np.where(previous != 0, np.diff(values) / previous, np.nan)
+    return out
+
+
+def moving_average(values, window):
+    """Trailing mean over ``window`` points (``NaN`` if any of them is missing)."""
+    out = np.full(values.shape, np.nan)
+    if window < 1 or len(values) < window:
+        return out
+    present = ~np.isnan(values)
+    sums = np.cumsum(np.insert(np.where(present, values, 0.0), 0, 0.0))
+    counts = np.cumsum(np.insert(present, 0, False))
+    complete = counts[window:] - counts[:-window] == window
+    out[window - 1:] = np.where(complete, (sums[window:] - sums[:-window]) / window, np.nan)
+    return out
+
+
+def engagement_rate(likes, comments, shares, reach):
+    """``(likes + comments + shares) / reach`` (``NaN`` where reach is 0)."""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(reach > 0, (likes + comments + shares) / reach, np.nan)
+
+
+def summarize(values, total=True):
+    """
+    First/last present value, absolute and relative change over the range
+    and, unless ``total`` is false (gauges), the sum of the present values.
+    """
+    values = values[~np.isnan(values)]
+    if not len(values):
+        summary = {'first': None, 'last': None, 'change': None, 'growth_rate': None}
+    else:
+        first, last = values[0], values[-1]
+        summary = {
+            'first': _scalar(first),
+            'last': _scalar(last),
+            'change': _scalar(last - first),
+            'growth_rate': _scalar((last - first) / first) if first else None,
+        }
+    if total:
+        summary['total'] = _scalar(values.sum())
+    return summary
+
+
+def to_json(values):
+    """Float array → list with ``None`` for ``NaN`` and integral values as ints."""
+    return [_scalar(value) for value in np.round(values, DECIMALS).tolist()]
+
+
+def _scalar(value):
+    value = round(float(value), DECIMALS)
+    if np.isnan(value):
+        return None
+    return int(value) if value.is_integer() else value
+
+
+def build_series(rows, metrics, window, index=None):
+    """
+    Full response payload for ``rows`` of ``(date, *metrics)`` in date order,
+    laid out on ``index`` when given (see ``to_columns``).
+
+    ``engagement_rate`` is included when likes, comments, shares and reach
+    are all among ``metrics``. Gauges (followers, following) are snapshots,
+    so their summaries have no ``total``.
+    """
+    dates, columns = to_columns(rows, metrics, index)
+    payload = {
+        'dates': [day.isoformat() for day in dates],
+        'metrics': {},
+        'summary': {},
+    }
+    for name in metrics:
+        values = columns[name]
+        payload['metrics'][name] = {
+            'values': to_json(values),
+            'delta': to_json(delta(values)),
+            'growth_rate': to_json(growth_rate(values)),
+            'moving_average': to_json(moving_average(values, window)),
+        }
+        payload['summary'][name] = summarize(values, total=name not in GAUGES)
+    if {'likes', 'comments', 'shares', 'reach'} <= set(metrics):
+        rate = engagement_rate(columns['likes'], columns['comments'], columns['shares'], columns['reach'])
+        payload['engagement_rate'] = to_json(rate)
+        present = ~np.isnan(columns['reach'])
+        totals = {name: columns[name][present].sum() for name in ('likes', 'comments', 'shares', 'reach')}
+        payload['summary']['engagement_rate'] = (
+            _scalar((totals['likes'] + totals['comments'] + totals['shares']) / totals['reach'])
+            if totals['reach'] else None
+        )
+    return payload
@@ -0,0 +1,8 @@
+from django.urls import path
+
+from .views import AnalyticsExportView, AnalyticsView
+
+urlpatterns = [
+    path('', AnalyticsView.as_view(), name='analytics'),
+    path('export/', AnalyticsExportView.as_view(), name='analytics_export'),
+]
@@ -0,0 +1,270 @@
+import hashlib
+from datetime import timedelta
+
+from django.core.handlers.asgi import ASGIRequest
+from django.db.models import Count, Max, Min, Sum
+from django.http import StreamingHttpResponse
+from django.utils.cache import parse_etags
+from rest_framework import permissions, status
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from drf_yasg.utils import swagger_auto_schema
+from drf_yasg import openapi
+
+from social.models import Brand, SocialAccount
+
+from . import export, rollups, timeseries
+from .models import AccountRollup, AnalyticsData, BrandRollup
+from .serializers import AnalyticsExportQuerySerializer, AnalyticsQuerySerializer
+
+_series_example = {
+    'scope': {'type': 'social_account', 'id': 1},
+    'granularity': 'day',
+    'start': '2024-03-01',
+    'end': '2024-03-03',
+    'window': 2,
+    'dates': ['2024-03-01', '2024-03-02', '2024-03-03'],
+    'metrics': {
+        'followers': {
+            'values': [1000, 1010, 1030],
+            'delta': [None, 10, 20],
+            'growth_rate': [None, 0.01, 0.019802],
+            'moving_average': [None, 1005, 1020],
+        },
+        'likes': {
+            'values': [40, None, 55],
+            'delta': [None, None, None],
+            'growth_rate': [None, None, None],
+            'moving_average': [None, None, None],
+        },
+    },
+    'engagement_rate': [0.042, None, 0.047],
+    'summary': {
+        'followers': {'first': 1000, 'last': 1030, 'change': 30, 'growth_rate': 0.03},
+        'likes': {'first': 40, 'last': 55, 'change': 15, 'growth_rate': 0.375, 'total': 95},
+        'engagement_rate': 0.0445,
+    },
+}
+
+
+def _parameter(name, description, param_type=openapi.TYPE_STRING, **kwargs):
+    return openapi.Parameter(name, openapi.IN_QUERY, description=description, type=param_type, **kwargs)
+
+
+class AnalyticsView(APIView):
+    """Time-series analytics for one social account or brand."""
+    permission_classes = [permissions.IsAuthenticated]
+
+    @swagger_auto_schema(
+        operation_summary='Analytics time series',
+        operation_description=(
+            'Per-point values, deltas, growth rates and trailing moving averages of each '
+            'requested metric for one social account or brand over `[start, end]`, plus '
+            'engagement rate (`(likes + comments + shares) / reach`) and range summaries.\n\n'
+            '`granularity=day` reads daily snapshots (summed across accounts for a brand); '
+            '`week`/`month` read the pre-aggregated rollups, whose `followers`/`following` are '
+            'the last snapshot of each period.\n\n'
+            '`dates` lists every day (or period) of the range; where no snapshot exists, and on '
+            'brand days some of its accounts did not report, values are `null`. `followers` and '
+            '`following` are snapshots, so their summaries have no `total`.\n\n'
+            'Responses carry an `ETag`; send it back as `If-None-Match` to get `304 Not Modified` '
+            'while the underlying data is unchanged.'
+        ),
+        tags=['Analytics'],
+        manual_parameters=[
+            _parameter('social_account', 'Social account id (or pass `brand`)', openapi.TYPE_INTEGER),
+            _parameter('brand', 'Brand id (or pass `social_account`)', openapi.TYPE_INTEGER),
+            _parameter('start', 'First day, `YYYY-MM-DD` (default: 29 days before `end`)', format='date'),
+            _parameter('end', 'Last day, `YYYY-MM-DD` (default: today)', format='date'),
+            _parameter('granularity', '`day` (default), `week` or `month`', enum=['day', 'week', 'month']),
+            _parameter('metrics', 'Comma-separated metrics (default: all)'),
+            _parameter('window', 'Moving-average window in points (default 7)', openapi.TYPE_INTEGER),
+        ],
+        responses={
+            200: openapi.Response('Time series', examples={'application/json': _series_example}),
+            304: openapi.Response('Not modified since the `If-None-Match` ETag'),
+            400: openapi.Response('Invalid parameters'),
+            404: openapi.Response('Social account or brand not found'),
+        },
+    )
+    def get(self, request):
+        query = AnalyticsQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        params = query.validated_data
+
+        if 'social_account' in params:
+            scope = {'type': 'social_account', 'id': params['social_account']}
+            owned = SocialAccount.objects.filter(pk=scope['id'], user=request.user).exists()
+        else:
+            scope = {'type': 'brand', 'id': params['brand']}
+            owned = Brand.objects.filter(pk=scope['id'], user=request.user).exists()
+        if not owned:
+            return Response(
+                {'error': f"{scope['type'].replace('_', ' ').capitalize()} not found"},
+                status=status.HTTP_404_NOT_FOUND,
+            )
+
+        source, rows = self._source(scope, params)
+        # One aggregate query decides between 304 and computing the series.
+        version = source.aggregate(rows=Count('pk'), updated=Max('updated_at'))
+        etag = self._etag(request.user.pk, params, version)
+        if self._etag_matches(request.headers.get('If-None-Match', ''), etag):
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            rows = list(rows)
+            if scope['type'] == 'brand' and params['granularity'] == 'day':
+                rows = self._complete_days(source, rows)
+            response = Response({
+                'scope': scope,
+                'granularity': params['granularity'],
+                'start': params['start'].isoformat(),
+                'end': params['end'].isoformat(),
+                'window': params['window'],
+                **timeseries.build_series(rows, params['metrics'], params['window'], self._index(params)),
+            })
+        response['ETag'] = etag
+        response['Cache-Control'] = 'private, no-cache'
+        return response
+
+    @staticmethod
+    def _source(scope, params):
+        """
+        Return ``(source, rows)``: ``source`` is the queryset the series is
+        built from (versioned for the ETag), ``rows`` its ``(date, *metrics)``
+        tuples in date order. A brand's daily rows end with the number of
+        accounts summed into them.
+        """
+        metrics = params['metrics']
+        start, end = params['start'], params['end']
+
+        if params['granularity'] != 'day':
+            period = params['granularity']
+            model, owner = (
+                (AccountRollup, 'social_account_id') if scope['type'] == 'social_account'
+                else (BrandRollup, 'brand_id')
+            )
+            queryset = model.objects.filter(
+                **{owner: scope['id']},
+                period=period,
+                period_start__gte=rollups.period_start(period, start),
+                period_start__lte=end,
+            )
+            return queryset, queryset.order_by('period_start').values_list('period_start', *metrics)
+
+        if scope['type'] == 'social_account':
+            queryset = AnalyticsData.objects.filter(
+                social_account_id=scope['id'], date__gte=start, date__lte=end,
+            )
+            return queryset, queryset.order_by('date').values_list('date', *metrics)
+        # One row per day summed across the brand's accounts, grouped in SQL.
+        queryset = AnalyticsData.objects.filter(
+            social_account__brand_id=scope['id'], date__gte=start, date__lte=end,
+        )
+        rows = (
+            queryset.order_by()
+            .values('date')
+            .annotate(**{f'total_{name}': Sum(name) for name in metrics}, accounts=Count('social_account'))
+            .order_by('date')
+            .values_list('date', *(f'total_{name}' for name in metrics), 'accounts')
+        )
+        return queryset, rows
+
+    @staticmethod
+    def _complete_days(source, rows):
+        """
+        Drop the brand days some account skipped between its first and last
+        snapshot in the range, so a missed sync shows as a gap rather than a
+        dip in the sum; strip the account counts from the rest.
+        """
+        spans = list(
+            source.order_by().values('social_account_id')
+            .annotate(first=Min('date'), last=Max('date'))
+            .values_list('first', 'last')
+        )
+        return [
+            row[:-1] for row in rows
+            if row[-1] >= sum(first <= row[0] <= last for first, last in spans)
+        ]
+
+    @staticmethod
+    def _index(params):
+        """Every day, or every period start, the series covers."""
+        start, end, granularity = params['start'], params['end'], params['granularity']
+        if granularity == 'day':
+            return [start + timedelta(days=offset) for offset in range((end - start).days + 1)]
+        index = []
+        day = rollups.period_start(granularity, start)
+        while day <= end:
+            index.append(day)
+            day = rollups.period_end(granularity, day)
+        return index
+
+    @staticmethod
+    def _etag_matches(header, etag):
+        """Weak comparison of ``etag`` with an ``If-None-Match`` list (or ``*``)."""
+        etags = parse_etags(header)
+        return '*' in etags or any(tag.removeprefix('W/') == etag for tag in etags)
+
+    @staticmethod
+    def _etag(user_id, params, version):
+        key = '|'.join([
+            str(user_id),
+            *(f'{name}={params.get(name)}' for name in sorted(params)),
+            str(version['rows']),
+            version['updated'].isoformat() if version['updated'] else '',
+        ])
+        return '"%s"' % hashlib.sha256(key.encode()).hexdigest()[:32]
+
+
+class AnalyticsExportView(APIView):
+    """Streaming export of daily analytics snapshots."""
+    permission_classes = [permissions.IsAuthenticated]
+
+    @swagger_auto_schema(
+        operation_summary='Export analytics data',
+        operation_description=(
+            'Streams every daily snapshot of your social accounts (all accounts for staff), '
+            'optionally filtered, as CSV, Parquet (zstd, one row group per chunk) or an '
+            'Arrow IPC stream. Rows are ordered by social account and date.\n\n'
+            '**Columns:** `' + '`, `'.join(export.COLUMNS) + '`.\n\n'
+            'The response is produced while reading the table, so it starts immediately '
+            'and has no `Content-Length`. Use `manage.py export_analytics` for scheduled dumps.'
+        ),
+        tags=['Analytics'],
+        manual_parameters=[
+            _parameter('file_format', '`csv` (default), `parquet` or `arrow`', enum=list(export.FORMATS)),
+            _parameter('social_account', 'Only this social account', openapi.TYPE_INTEGER),
+            _parameter('brand', 'Only accounts of this brand', openapi.TYPE_INTEGER),
+            _parameter('start', 'First day, `YYYY-MM-DD`', format='date'),
+            _parameter('end', 'Last day, `YYYY-MM-DD`', format='date'),
+        ],
+        responses={
+            200: openapi.Response('Export file'),
+            400: openapi.Response('Invalid parameters'),
+            501: openapi.Response('Format unavailable on this server (pyarrow missing)'),
+        },
+    )
+    def get(self, request):
+        query = AnalyticsExportQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        params = query.validated_data
+        fmt = params['file_format']
+
+        queryset = export.export_queryset(
+            start=params.get('start'),
+            end=params.get('end'),
+            account_ids=[params['social_account']] if 'social_account' in params else None,
+            brand_ids=[params['brand']] if 'brand' in params else None,
+            user=None if request.user.is_staff else request.user,
+        )
+        try:
+            content = export.stream(queryset, fmt)
+        except export.ExportError as e:
+            return Response({'error': str(e)}, status=status.HTTP_501_NOT_IMPLEMENTED)
+        if isinstance(request._request, ASGIRequest):
+            content = export.aiterate(content)
+
+        response = StreamingHttpResponse(content, content_type=export.FORMATS[fmt][0])
+        response['Content-Disposition'] = f'attachment; filename="{export.filename(fmt)}"'
+        response['X-Accel-Buffering'] = 'no'
+        return response
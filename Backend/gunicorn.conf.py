@@ -0,0 +1,24 @@
+"""
+Gunicorn settings for the web process (``gunicorn -c gunicorn.conf.py``).
+
+``DJANGO_SERVER_MODE`` picks the deployment profile:
+
+* ``wsgi`` (default): sync workers, one request per worker at a time.
+* ``asgi``: uvicorn workers serving ``syncfloww.asgi``. Each worker holds
+  many concurrent requests on its event loop, which is what long-lived SSE
+  streams (``/api/ai/tasks/{id}/stream/``) and polling clients need.
+
+Worker count comes from ``WEB_CONCURRENCY`` as usual.
+"""
+import os
+
+bind = f"0.0.0.0:{os.getenv('PORT', '8000')}"
+
+if os.getenv('DJANGO_SERVER_MODE', 'wsgi') == 'asgi':
+    wsgi_app = 'syncfloww.asgi:application'
+    worker_class = 'uvicorn_worker.UvicornWorker'
+    # Idle keep-alive connections are cheap on an event loop; keep them
+    # longer than the typical load balancer idle timeout (60s).
+    keepalive = 75
+else:
+    wsgi_app = 'syncfloww.wsgi:application'
@@ -2,6 +2,8 @@
 ASGI config for Syncfloww project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+Serve through an ASGI server to hold long-lived streaming responses such as
+``GET /api/ai/tasks/{id}/stream/`` without pinning a worker thread each.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/6.0/howto/deployment/asgi/
@@ -0,0 +1,153 @@
+"""
+Bearer-token authentication for the API.
+
+A single layer verifies both kinds of access token the API accepts:
+
+* SimpleJWT tokens issued by ``/api/auth/`` (HS256, ``user_id`` claim), and
+* Supabase tokens (RS256/ES256 signed with a key from the JWKS store,
+  ``sub`` claim, audience ``authenticated``).
+
+Verified claims are kept in a bounded LRU keyed by the SHA-256 of the raw
+token and dropped at the token's ``exp``, so the burst of API calls a page
+view makes with one token pays for signature verification once per process.
+The user comes from ``users.cache`` rather than a per-request SELECT and is
+attached to the underlying ``HttpRequest`` so it is resolved at most once
+per request.
+"""
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+import jwt
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication as SimpleJWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken, TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from users import cache as user_cache
+
+from .jwks import get_key_store
+
+
+class VerifiedTokenCache:
+    """Thread-safe LRU of ``token hash → claims``; entries expire at ``exp``."""
+
+    def __init__(self, maxsize=10000):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            claims, expires_at = entry
+            if expires_at <= time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return claims
+
+    def set(self, key, claims):
+        expires_at = claims.get('exp')
+        if not isinstance(expires_at, (int, float)):
+            # Never cache a token that does not expire.
+            return
+        with self._lock:
+            self._entries[key] = (claims, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+token_cache = VerifiedTokenCache(getattr(settings, 'AUTH_TOKEN_CACHE_SIZE', 10000))
+
+
+def token_key(raw_token):
+    if isinstance(raw_token, str):
+        raw_token = raw_token.encode()
+    return hashlib.sha256(raw_token).hexdigest()
+
+
+def verify_token(raw_token):
+    """
+    Return the verified claims of an access token, from cache when possible.
+
+    Supabase claims carry the user id under ``USER_ID_CLAIM`` as well, so
+    callers can treat both kinds of token the same. Raises ``TokenError``.
+    """
+    key = token_key(raw_token)
+    claims = token_cache.get(key)
+    if claims is None:
+        claims = _verify(raw_token)
+        token_cache.set(key, claims)
+    return claims
+
+
+def _verify(raw_token):
+    token = raw_token.decode() if isinstance(raw_token, bytes) else raw_token
+    try:
+        header = jwt.get_unverified_header(token)
+    except jwt.InvalidTokenError as exc:
+        raise TokenError(_('Token is invalid')) from exc
+
+    algorithms = getattr(settings, 'SUPABASE_JWT_ALGORITHMS', ['RS256'])
+    store = get_key_store()
+    if store is None or header.get('alg') not in algorithms:
+        return dict(AccessToken(token).payload)
+
+    key = store.get_key(header.get('kid'))
+    if key is None:
+        raise TokenError(_('Token signed with an unknown key'))
+    try:
+        claims = jwt.decode(token, key.key, algorithms=algorithms, audience='authenticated')
+    except jwt.InvalidTokenError as exc:
+        raise TokenError(str(exc)) from exc
+    claims.setdefault(api_settings.USER_ID_CLAIM, claims.get('sub'))
+    return claims
+
+
+class JWTAuthentication(SimpleJWTAuthentication):
+    """SimpleJWT authentication backed by the verified-token cache."""
+
+    def authenticate(self, request):
+        django_request = getattr(request, '_request', request)
+        if hasattr(django_request, '_jwt_auth'):
+            return django_request._jwt_auth
+        result = super().authenticate(request)
+        django_request._jwt_auth = result
+        return result
+
+    def get_validated_token(self, raw_token):
+        try:
+            return verify_token(raw_token)
+        except TokenError as exc:
+            raise InvalidToken({
+                'detail': _('Given token not valid for any token type'),
+                'messages': [{'message': exc.args[0]}],
+            }) from exc
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError as exc:
+            raise InvalidToken(_('Token contained no recognizable user identification')) from exc
+        try:
+            user = user_cache.get_user(user_id)
+        except (self.user_model.DoesNotExist, ValueError, ValidationError) as exc:
+            raise AuthenticationFailed(_('User not found'), code='user_not_found') from exc
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_('User is inactive'), code='user_inactive')
+        if api_settings.CHECK_REVOKE_TOKEN:
+            # Needs the password hash, which the cache does not hold.
+            return super().get_user(validated_token)
+        return user
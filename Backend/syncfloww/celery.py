@@ -1,10 +1,7 @@
 import os
 from celery import Celery
 
-os.environ.setdefault(
-    'DJANGO_SETTINGS_MODULE',
-    'syncfloww.settings.production'
-)
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'Syncfloww.settings')
 
 app = Celery('syncfloww')
 app.config_from_object('django.conf:settings', namespace='CELERY')
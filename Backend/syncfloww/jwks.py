@@ -0,0 +1,163 @@
+"""
+JWKS key store for verifying Supabase-issued JWTs.
+
+Public keys are parsed once and indexed by ``kid``. The key set is kept for
+the ``Cache-Control: max-age`` the JWKS endpoint sends (clamped to sane
+bounds) and refreshed on a background thread shortly before it expires, so
+request threads never wait on the network while a usable key set exists.
+
+A token signed with an unknown ``kid`` (the provider rotated keys) triggers
+one synchronous refetch, at most once per ``min_refetch_interval``; failed
+fetches are retried on the same schedule. While the endpoint is down the
+last good key set keeps being served, and requests fail fast instead of
+each one paying for a timeout.
+"""
+import logging
+import re
+import threading
+import time
+
+import jwt
+import requests
+
+logger = logging.getLogger(__name__)
+
+_MAX_AGE_RE = re.compile(r'max-age=(\d+)')
+
+
+class JWKSKeyStore:
+    """Thread-safe, self-refreshing ``kid → PyJWK`` map for one JWKS URL."""
+
+    def __init__(
+        self,
+        url,
+        timeout=2.0,
+        default_max_age=600,
+        min_max_age=60,
+        max_max_age=24 * 60 * 60,
+        min_refetch_interval=30,
+        refresh_ahead=0.1,
+    ):
+        self.url = url
+        self.timeout = timeout
+        self.default_max_age = default_max_age
+        self.min_max_age = min_max_age
+        self.max_max_age = max_max_age
+        self.min_refetch_interval = min_refetch_interval
+        self.refresh_ahead = refresh_ahead
+
+        self._keys = {}
+        self._refresh_at = 0.0
+        self._last_attempt = float('-inf')
+        self._lock = threading.Lock()
+        self._fetch_lock = threading.Lock()
+        self._refreshing = False
+
+    # ─── Lookup ──────────────────────────────────────────────────────────────
+
+    def get_key(self, kid):
+        """
+        Return the ``PyJWK`` for ``kid`` or ``None``.
+
+        Only fetches synchronously when there is no key for ``kid`` and the
+        rate limit allows it, and then for at most one fetch timeout. A miss
+        while another thread is fetching waits for that fetch and uses it.
+        """
+        key = self._keys.get(kid)
+        if key is not None:
+            if time.monotonic() >= self._refresh_at:
+                self._refresh_in_background()
+            return key
+        self._fetch()
+        return self._keys.get(kid)
+
+    def get_signing_key_from_jwt(self, token):
+        """Return the key for ``token``'s ``kid`` header, or ``None``."""
+        try:
+            kid = jwt.get_unverified_header(token).get('kid')
+        except jwt.InvalidTokenError:
+            return None
+        return self.get_key(kid)
+
+    # ─── Fetching ────────────────────────────────────────────────────────────
+
+    def _may_fetch(self, now):
+        return now - self._last_attempt >= self.min_refetch_interval
+
+    def _refresh_in_background(self):
+        with self._lock:
+            if self._refreshing or not self._may_fetch(time.monotonic()):
+                return
+            self._refreshing = True
+        threading.Thread(target=self._background_fetch, name='jwks-refresh', daemon=True).start()
+
+    def _background_fetch(self):
+        try:
+            self._fetch()
+        finally:
+            self._refreshing = False
+
+    def _fetch(self):
+        # Single flight: threads that queued behind a fetch find the rate
+        # limit spent and reuse its result instead of fetching again.
+        with self._fetch_lock:
+            with self._lock:
+                now = time.monotonic()
+                if not self._may_fetch(now):
+                    return
+                self._last_attempt = now
+            try:
+                response = requests.get(self.url, timeout=self.timeout)
+                response.raise_for_status()
+                keys = self._parse(response.json())
+            except (requests.RequestException, ValueError) as exc:
+                logger.warning('JWKS fetch from %s failed: %s', self.url, exc)
+                return
+            if not keys:
+                logger.warning('JWKS from %s contained no usable keys', self.url)
+                return
+
+            max_age = self._max_age(response.headers.get('Cache-Control', ''))
+            # Replace the whole map at once so readers never see a partial set.
+            self._keys = keys
+            self._refresh_at = time.monotonic() + max_age * (1 - self.refresh_ahead)
+
+    def _max_age(self, cache_control):
+        match = _MAX_AGE_RE.search(cache_control)
+        max_age = int(match.group(1)) if match else self.default_max_age
+        return min(max(max_age, self.min_max_age), self.max_max_age)
+
+    @staticmethod
+    def _parse(jwks):
+        keys = {}
+        for data in jwks.get('keys', []):
+            try:
+                key = jwt.PyJWK(data)
+            except jwt.PyJWTError as exc:
+                logger.warning('Skipping unusable JWK %s: %s', data.get('kid'), exc)
+                continue
+            keys[key.key_id] = key
+        return keys
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_key_store():
+    """Process-wide key store for ``SUPABASE_URL``, or ``None`` when unset."""
+    from django.conf import settings
+
+    global _store
+    url = getattr(settings, 'SUPABASE_URL', '')
+    if not url:
+        return None
+    with _store_lock:
+        if _store is None:
+            _store = JWKSKeyStore(
+                f"{url.rstrip('/')}/auth/v1/certs",
+                timeout=getattr(settings, 'SUPABASE_JWKS_TIMEOUT', 2.0),
+                default_max_age=getattr(settings, 'SUPABASE_JWKS_DEFAULT_MAX_AGE', 600),
+                min_refetch_interval=getattr(settings, 'SUPABASE_JWKS_MIN_REFETCH_INTERVAL', 30),
+            )
+    return _store
@@ -0,0 +1,140 @@
+"""
+Local JWKS server standing in for Supabase's ``/auth/v1/certs``.
+
+Holds RSA signing keys, serves their public halves as a JWK set and signs
+tokens with them, so ``syncfloww.jwks`` and token verification can be
+exercised without a Supabase project. Set ``SUPABASE_URL`` to
+``MockJWKSServer().url`` or run ``python -m syncfloww.jwks_mock --port 8092``.
+
+``rotate()`` adds a key with a new ``kid`` (optionally retiring the old
+ones), ``max_age`` sets the ``Cache-Control`` header, and ``status`` /
+``delay`` make the endpoint fail or respond slowly. ``requests`` counts the
+key set fetches served.
+
+Request headers understood by the server:
+
+* ``X-Mock-Status`` — respond with this HTTP status instead of 200.
+* ``X-Mock-Delay`` — sleep this many seconds before responding.
+"""
+import argparse
+import json
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import jwt
+from cryptography.hazmat.primitives.asymmetric import rsa
+
+CERTS_PATH = '/auth/v1/certs'
+
+
+class MockJWKSHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        server = self.server.mock
+        delay = float(self.headers.get('X-Mock-Delay', server.delay))
+        if delay:
+            time.sleep(delay)
+        if self.path.split('?')[0] != CERTS_PATH:
+            return self._send(404, {'error': f'unknown path {self.path}'})
+        with server.lock:
+            server.requests += 1
+        status = int(self.headers.get('X-Mock-Status', server.status))
+        if status != 200:
+            return self._send(status, {'error': 'mock error'})
+        self._send(200, server.jwks(), {'Cache-Control': f'public, max-age={server.max_age}'})
+
+    def _send(self, status, payload, headers=None):
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+
+class MockJWKSServer:
+    """Threaded mock server with one signing key to start; usable as a context manager."""
+
+    def __init__(self, host='127.0.0.1', port=0, max_age=600):
+        self.httpd = ThreadingHTTPServer((host, port), MockJWKSHandler)
+        self.httpd.mock = self
+        self.thread = None
+        self.lock = threading.Lock()
+        self.keys = {}
+        self.max_age = max_age
+        self.status = 200
+        self.delay = 0.0
+        self.requests = 0
+        self.rotate()
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f'http://{host}:{port}'
+
+    @property
+    def jwks_url(self):
+        return self.url + CERTS_PATH
+
+    @property
+    def kid(self):
+        """The newest key id, used by ``sign`` by default."""
+        return next(reversed(self.keys))
+
+    def rotate(self, retire=False):
+        """Add a signing key and return its ``kid``; ``retire`` drops the others."""
+        kid = uuid.uuid4().hex[:16]
+        key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+        with self.lock:
+            if retire:
+                self.keys.clear()
+            self.keys[kid] = key
+        return kid
+
+    def jwks(self):
+        with self.lock:
+            keys = list(self.keys.items())
+        return {'keys': [
+            {**json.loads(jwt.algorithms.RSAAlgorithm.to_jwk(key.public_key())), 'kid': kid, 'alg': 'RS256', 'use': 'sig'}
+            for kid, key in keys
+        ]}
+
+    def sign(self, claims, kid=None):
+        kid = kid or self.kid
+        return jwt.encode(claims, self.keys[kid], algorithm='RS256', headers={'kid': kid})
+
+    def start(self):
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Run the mock Supabase JWKS server.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8092)
+    parser.add_argument('--max-age', type=int, default=600)
+    args = parser.parse_args()
+    server = MockJWKSServer(args.host, args.port, args.max_age)
+    token = server.sign({'sub': str(uuid.uuid4()), 'exp': int(time.time()) + 3600, 'aud': 'authenticated'})
+    print(f'Mock JWKS server listening on {server.url} (kid {server.kid})')
+    print(f'Sample token, valid for an hour:\n{token}')
+    server.httpd.serve_forever()
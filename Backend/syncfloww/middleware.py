@@ -1,48 +1,37 @@
-import jwt
-import requests
-from django.conf import settings
-from django.http import JsonResponse
-
-# Use a default value or handle the setting properly
-SUPABASE_URL = getattr(settings, 'SUPABASE_URL', '')
-SUPABASE_JWKS_URL = f"{SUPABASE_URL}/auth/v1/certs"
-
-_jwks_cache = None
-
-def get_jwks():
-    global _jwks_cache
-    if not _jwks_cache and SUPABASE_URL: # Only try if URL is set
-        try:
-            _jwks_cache = requests.get(SUPABASE_JWKS_URL).json()
-        except Exception:
-            pass # Handle gracefully if offline/not configured
-    return _jwks_cache
-
-
-class SupabaseJWTMiddleware:
-    def __init__(self, get_response):
-        self.get_response = get_response
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.utils.decorators import sync_and_async_middleware
+from whitenoise.middleware import WhiteNoiseMiddleware
+
+
+@sync_and_async_middleware
+class StaticFilesMiddleware(WhiteNoiseMiddleware):
+    """
+    ``WhiteNoiseMiddleware`` that is also async-capable.
+
+    WhiteNoise's own middleware is sync-only, and as the outermost entry it
+    would push every ASGI request through a thread: Django only inserts a
+    thread hop around sync-only middleware, so keeping every ``MIDDLEWARE``
+    entry async-capable lets an ASGI worker hold thousands of open requests
+    (SSE streams, polling clients) on one event loop. Static lookups are an
+    in-memory dict hit, so they are safe to do on the event loop.
+    """
+
+    def __init__(self, get_response=None):
+        super().__init__(get_response)
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
 
     def __call__(self, request):
-        auth = request.headers.get("Authorization")
-
-        if auth and auth.startswith("Bearer "):
-            token = auth.split(" ")[1]
-            try:
-                # In development/offline without keys, we might want to skip or mock
-                # For now, we attempt verification if we have keys
-                jwks = get_jwks()
-                if jwks:
-                    payload = jwt.decode(
-                        token,
-                        jwks,
-                        algorithms=["RS256"],
-                        audience="authenticated",
-                    )
-                    request.supabase_user = payload
-            except Exception:
-                # For strict auth endpoints, DRF permissions will handle the 401 later if user is not authenticated
-                # This middleware just attempts to attach info
-                pass
-
-        return self.get_response(request)
+        if self.async_mode:
+            return self.__acall__(request)
+        return super().__call__(request)
+
+    async def __acall__(self, request):
+        if self.autorefresh:
+            static_file = self.find_file(request.path_info)
+        else:
+            static_file = self.files.get(request.path_info)
+        if static_file is not None:
+            return self.serve(static_file, request)
+        return await self.get_response(request)
@@ -2,6 +2,7 @@ from pathlib import Path
 from datetime import timedelta
 import os
 from dotenv import load_dotenv
+from celery.schedules import crontab
 
 # Load environment variables
 load_dotenv()
@@ -48,9 +49,11 @@ INSTALLED_APPS = [
 ]
 
 # ─── Middleware ────────────────────────────────────────────────────────────────
+# Every entry must be async-capable: under ASGI a single sync-only middleware
+# puts each request back on a thread (see syncfloww.middleware).
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
-    'whitenoise.middleware.WhiteNoiseMiddleware',  # serve static files (admin CSS, Swagger)
+    'syncfloww.middleware.StaticFilesMiddleware',  # WhiteNoise: static files (admin CSS, Swagger)
     'corsheaders.middleware.CorsMiddleware',   # must be before CommonMiddleware
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -80,6 +83,9 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'Syncfloww.wsgi.application'
+# DJANGO_SERVER_MODE=asgi serves syncfloww.asgi through uvicorn workers
+# (gunicorn.conf.py); streaming and polling clients then share an event loop.
+ASGI_APPLICATION = 'Syncfloww.asgi.application'
 
 # ─── Database ─────────────────────────────────────────────────────────────────
 # Set USE_SQLITE=True in .env for local dev (no Docker needed).
@@ -93,6 +99,9 @@ if _use_sqlite:
             'NAME': BASE_DIR / 'db.sqlite3',
         }
     }
+    # Covering-index INCLUDE columns are PostgreSQL-only; SQLite builds the
+    # key columns alone, which is all local development needs.
+    SILENCED_SYSTEM_CHECKS = ['models.W040']
 else:
     DATABASES = {
         'default': {
@@ -115,6 +124,25 @@ AUTH_PASSWORD_VALIDATORS = [
     {'NAME': 'django.contrib.auth.password_validation.NumericPasswordValidator'},
 ]
 
+# Password hashing for login/registration runs on a bounded per-process pool
+# (users.hashing); when it is saturated the views answer 503 + Retry-After.
+AUTH_HASH_WORKERS = int(os.getenv('AUTH_HASH_WORKERS', 2))
+AUTH_HASH_MAX_PENDING = int(os.getenv('AUTH_HASH_MAX_PENDING', 8))
+AUTH_HASH_QUEUE_TIMEOUT = 0.5  # seconds a request may wait for a hashing slot
+
+# Sliding-window throttles on login/registration (users.throttling), shared
+# across workers through Redis when available.
+AUTH_THROTTLE_REDIS_URL = os.environ.get('REDIS_URL')
+AUTH_THROTTLE_RATES = {
+    'login_ip': os.getenv('AUTH_THROTTLE_LOGIN_IP', '30/min'),
+    'login_email': os.getenv('AUTH_THROTTLE_LOGIN_EMAIL', '5/min'),      # per email and client IP
+    'login_account': os.getenv('AUTH_THROTTLE_LOGIN_ACCOUNT', '20/min'),  # per email, all clients
+    'register_ip': os.getenv('AUTH_THROTTLE_REGISTER_IP', '10/hour'),
+    'register_email': '3/hour',
+    'password_reset_ip': os.getenv('AUTH_THROTTLE_PASSWORD_RESET_IP', '10/hour'),
+    'password_reset_email': '3/hour',
+}
+
 # ─── Internationalisation ─────────────────────────────────────────────────────
 LANGUAGE_CODE = 'en-us'
 TIME_ZONE = 'UTC'
@@ -133,7 +161,8 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 # ─── Django REST Framework ────────────────────────────────────────────────────
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        # SimpleJWT + Supabase tokens, with a cache of verified claims.
+        'syncfloww.authentication.JWTAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
@@ -155,7 +184,34 @@ SIMPLE_JWT = {
     'AUTH_HEADER_TYPES': ('Bearer',),
     'USER_ID_FIELD': 'id',
     'USER_ID_CLAIM': 'user_id',
+    'TOKEN_REFRESH_SERIALIZER': 'users.serializers.TokenRefreshSerializer',
 }
+# Revoked refresh tokens (users.token_blacklist): checked in the cache when it
+# is shared between workers, otherwise in the (pruned) revoked_tokens table.
+# Cache misses fall back to the table; "not revoked" answers are cached for
+# AUTH_TOKEN_BLACKLIST_NEGATIVE_TTL seconds.
+AUTH_TOKEN_BLACKLIST_USE_CACHE = bool(os.environ.get('REDIS_URL'))
+AUTH_TOKEN_BLACKLIST_NEGATIVE_TTL = 300
+AUTH_TOKEN_BLACKLIST_PRUNE_BATCH_SIZE = 1000
+# Verified access-token claims kept per process (LRU, each until its exp).
+AUTH_TOKEN_CACHE_SIZE = 10000
+# Authenticated users served from cache instead of a SELECT per request
+# (users.cache); invalidated on User save/delete. The shared level is only
+# used when the default cache is shared between workers (Redis); a LocMem
+# copy could not be invalidated in the other workers.
+AUTH_USER_CACHE_USE_SHARED = bool(os.environ.get('REDIS_URL'))
+AUTH_USER_CACHE_TTL = 60            # seconds, shared cache
+AUTH_USER_CACHE_LOCAL_TTL = 0.5     # seconds, per process
+AUTH_USER_CACHE_LOCAL_SIZE = 10000
+
+# ─── Supabase Auth ────────────────────────────────────────────────────────────
+# Tokens issued by Supabase are verified against its JWKS
+# (<SUPABASE_URL>/auth/v1/certs), cached per process by syncfloww.jwks.
+SUPABASE_URL = os.getenv('SUPABASE_URL', '')
+SUPABASE_JWT_ALGORITHMS = ['RS256', 'ES256']
+SUPABASE_JWKS_TIMEOUT = float(os.getenv('SUPABASE_JWKS_TIMEOUT', 2.0))
+SUPABASE_JWKS_DEFAULT_MAX_AGE = 600        # seconds, when the response has no max-age
+SUPABASE_JWKS_MIN_REFETCH_INTERVAL = 30    # seconds between fetches (unknown kid, failures)
 
 # ─── CORS ─────────────────────────────────────────────────────────────────────
 CORS_ALLOWED_ORIGINS = [
@@ -233,6 +289,33 @@ SOCIAL_AUTH_PIPELINE = (
     'social_core.pipeline.user.user_details',
 )
 
+# Token → profile lookups in GoogleOAuthView/FacebookOAuthView (users.oauth):
+# one pooled async client per process, on a background event loop, with
+# strict timeouts.
+OAUTH_HTTP_TIMEOUT = float(os.getenv('OAUTH_HTTP_TIMEOUT', 5.0))
+OAUTH_HTTP_CONNECT_TIMEOUT = 2.0
+OAUTH_HTTP_MAX_CONNECTIONS = 100
+
+# Bulk provisioning (POST /api/users/provision/, manage.py provision_users).
+USERS_PROVISION_CHUNK_SIZE = 500
+# Hashing pool per web process, started on first use (default: CPU count).
+USERS_PROVISION_HASH_WORKERS = int(os.getenv('USERS_PROVISION_HASH_WORKERS', 0)) or None
+USERS_PROVISION_MAX_ROWS = 5000  # per API request; the command has no limit
+
+# Account emails (users.emails): views push onto a Redis outbox, beat drains
+# it into batched send tasks that reuse one mail connection per worker.
+EMAIL_BACKEND = os.getenv('EMAIL_BACKEND', 'django.core.mail.backends.smtp.EmailBackend')
+EMAIL_HOST = os.getenv('EMAIL_HOST', 'localhost')
+EMAIL_PORT = int(os.getenv('EMAIL_PORT', 25))
+EMAIL_HOST_USER = os.getenv('EMAIL_HOST_USER', '')
+EMAIL_HOST_PASSWORD = os.getenv('EMAIL_HOST_PASSWORD', '')
+EMAIL_USE_TLS = os.getenv('EMAIL_USE_TLS', 'False') == 'True'
+EMAIL_TIMEOUT = 10
+DEFAULT_FROM_EMAIL = os.getenv('DEFAULT_FROM_EMAIL', 'webmaster@localhost')
+USERS_EMAIL_OUTBOX_REDIS_URL = os.environ.get('REDIS_URL')
+USERS_EMAIL_BATCH_SIZE = 100
+USERS_EMAIL_MAX_BATCHES_PER_FLUSH = 50
+
 LOGIN_URL = '/api/auth/login/'
 LOGIN_REDIRECT_URL = '/'
 LOGOUT_REDIRECT_URL = '/'
@@ -272,5 +355,159 @@ REDOC_SETTINGS = {
     'EXPAND_RESPONSES': '200,201',
 }
 
+# ─── Cache ────────────────────────────────────────────────────────────────────
+# Shared across web and worker processes when Redis is available (agent token
+# streams, registries); falls back to a per-process cache for local dev.
+# 'agent_responses' holds the agent response cache (ai_agents.response_cache).
+# Every entry has a TTL. Give it its own Redis instance through
+# AGENT_RESPONSE_CACHE_URL and set maxmemory-policy allkeys-lru there. When it
+# falls back to REDIS_URL it shares memory with the default cache, the Celery
+# broker and revoked tokens, so that instance must use volatile-lru: only keys
+# with a TTL are evicted, never queued tasks or revocations. (A separate
+# database number on the same instance does not help: maxmemory and the
+# eviction policy are per instance.)
+_agent_response_cache = {
+    'TIMEOUT': int(os.getenv('AI_AGENTS_RESPONSE_CACHE_TTL', 60 * 60 * 24)),
+    'KEY_PREFIX': 'agent_responses',
+}
+_agent_response_cache_url = os.environ.get('AGENT_RESPONSE_CACHE_URL') or os.environ.get('REDIS_URL')
+if os.environ.get('REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.environ['REDIS_URL'],
+        },
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        },
+    }
+if _agent_response_cache_url:
+    CACHES['agent_responses'] = {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': _agent_response_cache_url,
+        **_agent_response_cache,
+    }
+else:
+    CACHES['agent_responses'] = {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'agent_responses',
+        'OPTIONS': {'MAX_ENTRIES': int(os.getenv('AI_AGENTS_RESPONSE_CACHE_MAX_ENTRIES', 10000))},
+        **_agent_response_cache,
+    }
+
+# ─── LLM Providers ────────────────────────────────────────────────────────────
+# Per-provider connection pool and concurrency limits for ai_agents.providers.
+# Keys are LLMProvider.provider_class values; 'default' applies to all.
+AI_PROVIDER_LIMITS = {
+    'default': {
+        'max_concurrency': int(os.getenv('AI_PROVIDER_MAX_CONCURRENCY', 16)),
+        'max_connections': int(os.getenv('AI_PROVIDER_MAX_CONNECTIONS', 32)),
+        'timeout': int(os.getenv('AI_PROVIDER_TIMEOUT', 60)),
+    },
+}
+
+# ─── AI Agents ────────────────────────────────────────────────────────────────
+# Relay tokens over SSE (GET /api/ai/tasks/{id}/stream/) while tasks run.
+AI_AGENTS_STREAMING = os.getenv('AI_AGENTS_STREAMING', 'True') == 'True'
+# Serve identical executions (same config, model and input) from cache.
+AI_AGENTS_RESPONSE_CACHE_ENABLED = os.getenv('AI_AGENTS_RESPONSE_CACHE_ENABLED', 'True') == 'True'
+AI_AGENTS_BATCH_MAX_SIZE = int(os.getenv('AI_AGENTS_BATCH_MAX_SIZE', 1000))
+# Seconds a process trusts its local copy of active agents before re-checking
+# the shared registry version (ai_agents.agent_registry).
+AI_AGENTS_REGISTRY_LOCAL_TTL = 5
+# Rate limiting: token buckets from LLMProvider/AIModel requests_per_minute and
+# tokens_per_minute, shared across workers through Redis when available.
+AI_AGENTS_RATELIMIT_REDIS_URL = os.environ.get('REDIS_URL')
+AI_AGENTS_DEFAULT_COMPLETION_TOKENS = 1024
+AI_AGENTS_MAX_THROTTLE_RETRIES = 20
+# Retention: finished tasks older than this are moved to AIs_agenttaskarchive
+# (or JSONL.gz files under AI_AGENTS_ARCHIVE_DIR) by archive_agent_tasks.
+AI_AGENTS_RETENTION_DAYS = int(os.getenv('AI_AGENTS_RETENTION_DAYS', 30))
+AI_AGENTS_RETENTION_BATCH_SIZE = 1000
+AI_AGENTS_ARCHIVE_DIR = os.getenv('AI_AGENTS_ARCHIVE_DIR', '')
+# Scheduling: single executes run on agents.interactive.* queues; batch tasks
+# (standard/bulk) are released by the fair-share dispatcher, which keeps at most
+# AI_AGENTS_FAIR_SHARE_QUEUE_TARGET of them in the broker and splits free slots
+# across priority classes by weight, then evenly across users. Released tasks
+# still unclaimed after the visibility timeout (Celery's Redis default, 1h)
+# are released again.
+AI_AGENTS_PRIORITY_WEIGHTS = {'standard': 3, 'bulk': 1}
+AI_AGENTS_FAIR_SHARE_QUEUE_TARGET = int(os.getenv('AI_AGENTS_FAIR_SHARE_QUEUE_TARGET', 100))
+AI_AGENTS_FAIR_SHARE_VISIBILITY_TIMEOUT = int(os.getenv('AI_AGENTS_FAIR_SHARE_VISIBILITY_TIMEOUT', 60 * 60))
+AI_AGENTS_STREAM_TTL = 600             # seconds a finished stream stays replayable
+AI_AGENTS_STREAM_POLL_INTERVAL = 0.1   # seconds between cache reads per client
+AI_AGENTS_STREAM_TIMEOUT = 300         # max seconds a client stays connected
+AI_AGENTS_STREAM_WSGI_TIMEOUT = 25     # same under WSGI, below gunicorn's 30s worker timeout
+
+# ─── Analytics ────────────────────────────────────────────────────────────────
+# Nightly ingestion (analytics.ingestion): accounts are fanned out in chunks on
+# the 'analytics' queue and upserted in bulk. Set ANALYTICS_PLATFORM_BASE_URL to
+# point every platform adapter at one host (e.g. python -m analytics.platforms.mock).
+ANALYTICS_PLATFORM_BASE_URLS = {
+    'default': os.getenv('ANALYTICS_PLATFORM_BASE_URL', ''),
+}
+ANALYTICS_PLATFORM_TIMEOUT = 20
+ANALYTICS_PLATFORM_MAX_CONNECTIONS = 16
+ANALYTICS_INGEST_QUEUE = 'analytics'
+ANALYTICS_INGEST_LOOKBACK_DAYS = int(os.getenv('ANALYTICS_INGEST_LOOKBACK_DAYS', 3))
+ANALYTICS_INGEST_ACCOUNTS_PER_TASK = 200
+ANALYTICS_INGEST_FETCH_CONCURRENCY = 8
+ANALYTICS_INGEST_CHUNK_SIZE = 5000  # rows per INSERT ... ON CONFLICT
+# Weekly/monthly account and brand rollups (analytics.rollups); written days
+# mark their periods dirty and beat recomputes only those.
+ANALYTICS_ROLLUP_BATCH_SIZE = 1000
+# Rows per cursor fetch and per Parquet row group / Arrow batch (analytics.export).
+ANALYTICS_EXPORT_CHUNK_SIZE = 10000
+# Monthly partitions created ahead of time once the table has been converted
+# with `manage.py partition_analytics` (PostgreSQL only; see analytics.storage).
+ANALYTICS_PARTITION_MONTHS_AHEAD = 3
+
 # ─── Celery ───────────────────────────────────────────────────────────────────
-CELERY_BROKER_URL = os.environ.get('REDIS_URL')
+# Without REDIS_URL the broker falls back to an in-process transport. Eager
+# mode (tasks run inline in the web process) is opt-in for development and
+# tests only: a deployment that merely forgot REDIS_URL must not run agent
+# work inside request handlers.
+CELERY_BROKER_URL = os.environ.get('REDIS_URL') or 'memory://'
+CELERY_TASK_ALWAYS_EAGER = os.getenv('CELERY_TASK_ALWAYS_EAGER', 'False') == 'True'
+CELERY_TASK_EAGER_PROPAGATES = True
+CELERY_TASK_DEFAULT_QUEUE = 'default'
+CELERY_TASK_ACKS_LATE = True
+CELERY_TASK_REJECT_ON_WORKER_LOST = True
+CELERY_WORKER_PREFETCH_MULTIPLIER = 1
+CELERY_WORKER_CONCURRENCY = int(os.getenv('CELERY_WORKER_CONCURRENCY', 8))
+CELERY_TASK_SERIALIZER = 'json'
+CELERY_ACCEPT_CONTENT = ['json']
+CELERY_TIMEZONE = TIME_ZONE
+CELERY_BEAT_SCHEDULE = {
+    'archive-agent-tasks': {
+        'task': 'ai_agents.archive_agent_tasks',
+        'schedule': crontab(hour=3, minute=0),
+    },
+    'dispatch-agent-tasks': {
+        'task': 'ai_agents.dispatch_agent_tasks',
+        'schedule': 2.0,
+    },
+    'flush-email-outbox': {
+        'task': 'users.flush_email_outbox',
+        'schedule': 5.0,
+    },
+    'sync-analytics': {
+        'task': 'analytics.sync_all_accounts',
+        'schedule': crontab(hour=2, minute=0),
+    },
+    'refresh-analytics-rollups': {
+        'task': 'analytics.refresh_rollups',
+        'schedule': 60.0,
+    },
+    'ensure-analytics-partitions': {
+        'task': 'analytics.ensure_partitions',
+        'schedule': crontab(hour=1, minute=30),
+    },
+    'prune-revoked-tokens': {
+        'task': 'users.prune_revoked_tokens',
+        'schedule': crontab(minute=15),
+    },
+}
@@ -0,0 +1,39 @@
+from unittest import mock
+
+from django.test import RequestFactory, TestCase
+from rest_framework.request import Request
+from rest_framework_simplejwt.tokens import AccessToken
+
+from syncfloww import authentication
+from users.models import User
+
+
+class VerifyOnceTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(email='reader@example.com', password='s3cret-pass!')
+
+    def setUp(self):
+        patcher = mock.patch.object(authentication, 'token_cache', authentication.VerifiedTokenCache())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.token = str(AccessToken.for_user(self.user))
+
+    def test_signature_is_checked_once_per_token(self):
+        with mock.patch.object(authentication, '_verify', wraps=authentication._verify) as verify:
+            first = authentication.verify_token(self.token)
+            second = authentication.verify_token(self.token)
+        self.assertEqual(first, second)
+        verify.assert_called_once()
+
+    def test_request_is_authenticated_once(self):
+        django_request = RequestFactory().get('/', HTTP_AUTHORIZATION=f'Bearer {self.token}')
+        backend = authentication.JWTAuthentication()
+        with mock.patch.object(authentication, 'verify_token', wraps=authentication.verify_token) as verify:
+            # Two DRF Request wrappers around one HttpRequest, as when a view
+            # calls another view.
+            user, _ = backend.authenticate(Request(django_request))
+            again, _ = backend.authenticate(Request(django_request))
+        self.assertEqual(user.pk, self.user.pk)
+        self.assertIs(again, user)
+        verify.assert_called_once()
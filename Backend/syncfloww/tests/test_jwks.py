@@ -0,0 +1,107 @@
+import threading
+import time
+from unittest import mock
+
+import jwt
+from django.test import SimpleTestCase, override_settings
+from rest_framework_simplejwt.exceptions import TokenError
+
+from syncfloww import authentication, jwks
+from syncfloww.jwks_mock import MockJWKSServer
+
+
+class JWKSKeyStoreTests(SimpleTestCase):
+    def setUp(self):
+        self.server = MockJWKSServer().start()
+        self.addCleanup(self.server.stop)
+
+    def store(self, **options):
+        return jwks.JWKSKeyStore(self.server.jwks_url, **options)
+
+    def test_fetches_once_and_serves_from_memory(self):
+        store = self.store()
+        kid = self.server.kid
+        self.assertEqual(store.get_key(kid).key_id, kid)
+        self.assertEqual(store.get_key(kid).key_id, kid)
+        self.assertEqual(self.server.requests, 1)
+
+    def test_picks_up_a_rotated_kid(self):
+        store = self.store(min_refetch_interval=0)
+        old = self.server.kid
+        store.get_key(old)
+        new = self.server.rotate(retire=True)
+        self.assertEqual(store.get_key(new).key_id, new)
+        self.assertEqual(self.server.requests, 2)
+        # The retired key is gone with the refreshed set.
+        self.assertIsNone(store.get_key(old))
+
+    def test_unknown_kids_refetch_at_most_once_per_interval(self):
+        store = self.store(min_refetch_interval=30)
+        store.get_key(self.server.kid)
+        for _ in range(5):
+            self.assertIsNone(store.get_key('forged'))
+        self.assertEqual(self.server.requests, 1)
+
+        new = self.server.rotate()
+        self.assertIsNone(store.get_key(new))
+        with mock.patch('syncfloww.jwks.time.monotonic', return_value=time.monotonic() + 31):
+            self.assertEqual(store.get_key(new).key_id, new)
+        self.assertEqual(self.server.requests, 2)
+
+    def test_concurrent_misses_share_one_fetch(self):
+        store = self.store()
+        self.server.delay = 0.3
+        kid = self.server.kid
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(store.get_key(kid))) for _ in range(10)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(self.server.requests, 1)
+        self.assertEqual([key.key_id for key in results], [kid] * 10)
+
+    def test_keeps_the_last_good_set_while_the_endpoint_fails(self):
+        store = self.store(min_refetch_interval=0)
+        kid = self.server.kid
+        store.get_key(kid)
+        self.server.status = 503
+        with self.assertLogs('syncfloww.jwks', 'WARNING'):
+            self.assertIsNone(store.get_key('unknown'))
+        self.assertEqual(store.get_key(kid).key_id, kid)
+
+    def test_honours_max_age_within_bounds(self):
+        store = self.store(min_max_age=60)
+        self.assertEqual(store._max_age('public, max-age=5'), 60)
+        self.assertEqual(store._max_age('max-age=3600'), 3600)
+        self.assertEqual(store._max_age(''), store.default_max_age)
+
+
+class SupabaseTokenTests(SimpleTestCase):
+    def setUp(self):
+        self.server = MockJWKSServer().start()
+        self.addCleanup(self.server.stop)
+        settings = override_settings(SUPABASE_URL=self.server.url)
+        settings.enable()
+        self.addCleanup(settings.disable)
+        for patcher in (
+            mock.patch.object(jwks, '_store', None),
+            mock.patch.object(authentication, 'token_cache', authentication.VerifiedTokenCache()),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def claims(self):
+        return {'sub': 'c5b1c1c6-0d7e-4d0c-9a7e-0a4d7f0b9a11', 'aud': 'authenticated', 'exp': int(time.time()) + 60}
+
+    def test_verifies_tokens_signed_by_the_current_key(self):
+        claims = authentication.verify_token(self.server.sign(self.claims()))
+        self.assertEqual(claims['user_id'], claims['sub'])
+
+    def test_rejects_tokens_signed_with_another_key(self):
+        other = MockJWKSServer()
+        self.addCleanup(other.httpd.server_close)
+        forged = jwt.encode(self.claims(), other.keys[other.kid], algorithm='RS256', headers={'kid': self.server.kid})
+        for token in (forged, other.sign(self.claims())):
+            with self.assertRaises(TokenError):
+                authentication.verify_token(token)
@@ -0,0 +1,77 @@
+import os
+import runpy
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+from asgiref.sync import async_to_sync, iscoroutinefunction
+from django.conf import settings
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+from django.utils.module_loading import import_string
+
+from syncfloww.middleware import StaticFilesMiddleware
+
+BACKEND_DIR = Path(__file__).resolve().parents[2]
+
+
+class StaticFilesMiddlewareTests(SimpleTestCase):
+    def setUp(self):
+        root = tempfile.TemporaryDirectory()
+        self.addCleanup(root.cleanup)
+        Path(root.name, 'app.css').write_text('body {}')
+        patcher = override_settings(STATIC_ROOT=root.name, STATIC_URL='/static/', WHITENOISE_USE_FINDERS=False)
+        patcher.enable()
+        self.addCleanup(patcher.disable)
+        self.calls = []
+
+    def get_response(self, request):
+        self.calls.append(request.path)
+        return HttpResponse('view')
+
+    async def aget_response(self, request):
+        self.calls.append(request.path)
+        return HttpResponse('view')
+
+    def test_sync_chain_serves_static_files(self):
+        middleware = StaticFilesMiddleware(self.get_response)
+        self.assertFalse(iscoroutinefunction(middleware))
+
+        response = middleware(RequestFactory().get('/static/app.css'))
+        self.assertEqual(b''.join(response), b'body {}')
+        self.assertEqual(middleware(RequestFactory().get('/api/')).content, b'view')
+        self.assertEqual(self.calls, ['/api/'])
+
+    def test_async_chain_stays_async(self):
+        middleware = StaticFilesMiddleware(self.aget_response)
+        self.assertTrue(iscoroutinefunction(middleware))
+
+        response = async_to_sync(middleware)(RequestFactory().get('/static/app.css'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b''.join(response), b'body {}')
+        self.assertEqual(async_to_sync(middleware)(RequestFactory().get('/static/missing.css')).content, b'view')
+        self.assertEqual(self.calls, ['/static/missing.css'])
+
+    def test_every_configured_middleware_is_async_capable(self):
+        for path in settings.MIDDLEWARE:
+            with self.subTest(middleware=path):
+                self.assertTrue(getattr(import_string(path), 'async_capable', False))
+
+
+class GunicornConfigTests(SimpleTestCase):
+    def load(self, **env):
+        with mock.patch.dict(os.environ, env):
+            if 'DJANGO_SERVER_MODE' not in env:
+                os.environ.pop('DJANGO_SERVER_MODE', None)
+            return runpy.run_path(str(BACKEND_DIR / 'gunicorn.conf.py'))
+
+    def test_wsgi_is_the_default(self):
+        config = self.load(PORT='9000')
+        self.assertEqual(config['wsgi_app'], 'syncfloww.wsgi:application')
+        self.assertNotIn('worker_class', config)
+        self.assertEqual(config['bind'], '0.0.0.0:9000')
+
+    def test_asgi_mode_uses_uvicorn_workers(self):
+        config = self.load(DJANGO_SERVER_MODE='asgi')
+        self.assertEqual(config['wsgi_app'], 'syncfloww.asgi:application')
+        self.assertEqual(config['worker_class'], 'uvicorn_worker.UvicornWorker')
@@ -78,4 +78,7 @@ urlpatterns = [
 
     # ── AI Agents ─────────────────────────────────────────────────────────────
     path('api/ai/', include('ai_agents.urls')),
+
+    # ── Analytics ─────────────────────────────────────────────────────────────
+    path('api/analytics/', include('analytics.urls')),
 ]
@@ -0,0 +1,91 @@
+"""
+Cache of authenticated users, so bearer-token requests skip the
+``auth_users`` SELECT.
+
+Users are cached as their concrete field values (minus the password hash)
+at two levels:
+
+* the shared ``default`` cache for ``AUTH_USER_CACHE_TTL`` seconds, only
+  when ``AUTH_USER_CACHE_USE_SHARED`` says that cache really is shared
+  between workers (Redis), and
+* a process-local copy for ``AUTH_USER_CACHE_LOCAL_TTL`` seconds.
+
+``get_user`` rebuilds a ``User`` instance from those values with
+``Model.from_db``, so it behaves like a loaded row (foreign keys, ``is_staff``
+checks) without touching the database; ``password`` is deferred and loaded
+on access.
+
+``post_save``/``post_delete`` on ``User`` (see ``signals``) call
+``invalidate``, which drops both levels in the saving process and the shared
+entry everywhere. Other processes still hold their local copy, so a
+deactivated user is rejected everywhere within the (sub-second by default)
+local TTL. A per-process ``default`` cache (LocMem, no Redis) cannot be
+invalidated across workers, so it is not used as the shared level.
+"""
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .models import User
+
+_FIELDS = [field.attname for field in User._meta.concrete_fields if field.attname != 'password']
+
+_local = {}
+_lock = threading.Lock()
+
+
+def _key(user_id):
+    return f'users:auth:{user_id}'
+
+
+def _use_shared():
+    return getattr(settings, 'AUTH_USER_CACHE_USE_SHARED', False)
+
+
+def _build(values):
+    return User.from_db('default', _FIELDS, [values[name] for name in _FIELDS])
+
+
+def get_user(user_id):
+    """Return the ``User`` with ``user_id`` (cached), or raise ``User.DoesNotExist``."""
+    key = _key(user_id)
+    now = time.monotonic()
+    entry = _local.get(key)
+    if entry is not None and entry[1] > now:
+        return _build(entry[0])
+
+    shared = _use_shared()
+    values = cache.get(key) if shared else None
+    if values is None:
+        values = User.objects.filter(pk=user_id).values(*_FIELDS).first()
+        if values is None:
+            raise User.DoesNotExist
+        if shared:
+            cache.set(key, values, getattr(settings, 'AUTH_USER_CACHE_TTL', 60))
+
+    local_ttl = getattr(settings, 'AUTH_USER_CACHE_LOCAL_TTL', 0.5)
+    if local_ttl:
+        with _lock:
+            _local[key] = (values, now + local_ttl)
+            if len(_local) > getattr(settings, 'AUTH_USER_CACHE_LOCAL_SIZE', 10000):
+                _evict(now)
+    return _build(values)
+
+
+def _evict(now):
+    for key in [key for key, (_, expires_at) in _local.items() if expires_at <= now]:
+        del _local[key]
+    # Still full of live entries: drop the oldest insertions.
+    overflow = len(_local) - getattr(settings, 'AUTH_USER_CACHE_LOCAL_SIZE', 10000)
+    for key in list(_local)[:max(overflow, 0)]:
+        del _local[key]
+
+
+def invalidate(user_id):
+    key = _key(user_id)
+    with _lock:
+        _local.pop(key, None)
+    if _use_shared():
+        cache.delete(key)
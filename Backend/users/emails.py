@@ -0,0 +1,167 @@
+"""
+Account emails (password reset, email verification), sent off the request path.
+
+Views only ``enqueue`` a ``(kind, address)`` pair. With
+``USERS_EMAIL_OUTBOX_REDIS_URL`` set that is one RPUSH onto a Redis list: no
+user lookup and no SMTP, so the response takes the same time whether or not
+the address belongs to an account. ``users.flush_email_outbox`` (beat) drains
+the list into ``users.send_account_emails`` tasks of up to
+``USERS_EMAIL_BATCH_SIZE`` entries. Each task resolves its addresses with one
+query, drops unknown ones, and sends the rest in order on a per-process
+connection that stays open between batches. If the server fails part-way,
+the task is retried with the entries that were not sent yet.
+
+Without Redis each enqueue becomes a task with a batch of one (run inline
+when ``CELERY_TASK_ALWAYS_EAGER`` is set for local dev, like the other tasks).
+"""
+import json
+import logging
+import smtplib
+import threading
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core import mail
+
+logger = logging.getLogger(__name__)
+
+OUTBOX_KEY = 'users:email_outbox'
+
+PASSWORD_RESET = 'password_reset'
+EMAIL_VERIFICATION = 'email_verification'
+
+_MESSAGES = {
+    PASSWORD_RESET: (
+        'Password Reset Request',
+        'Hello {name},\n\n'
+        'We received a request to reset your password. '
+        'Please use the link below to reset your password:\n\n'
+        '[Password reset link would go here]\n\n'
+        'If you did not request this, please ignore this email.',
+    ),
+    EMAIL_VERIFICATION: (
+        'Confirm your email address',
+        'Hello {name},\n\n'
+        'Please confirm your email address using the link below:\n\n'
+        '[Email verification link would go here]\n\n'
+        'If you did not create an account, please ignore this email.',
+    ),
+}
+
+
+class SendError(Exception):
+    """Sending stopped part-way; the first ``sent`` messages went out."""
+
+    def __init__(self, sent):
+        super().__init__(f'Sending stopped after {sent} messages')
+        self.sent = sent
+
+
+# ─── Outbox ──────────────────────────────────────────────────────────────────
+
+_redis = None
+_redis_lock = threading.Lock()
+
+
+def _outbox():
+    global _redis
+    url = getattr(settings, 'USERS_EMAIL_OUTBOX_REDIS_URL', None)
+    if not url:
+        return None
+    with _redis_lock:
+        if _redis is None:
+            import redis
+
+            _redis = redis.Redis.from_url(url)
+    return _redis
+
+
+def enqueue(kind, email):
+    """Queue a ``kind`` email for ``email``; does not check that an account exists."""
+    if kind not in _MESSAGES:
+        raise ValueError(f'Unknown email kind: {kind}')
+    outbox = _outbox()
+    if outbox is None:
+        from .tasks import send_account_emails
+
+        send_account_emails.delay([[kind, email]])
+        return
+    outbox.rpush(OUTBOX_KEY, json.dumps([kind, email]))
+
+
+def drain(batch_size):
+    """Pop up to ``batch_size`` queued ``[kind, email]`` entries."""
+    outbox = _outbox()
+    if outbox is None:
+        return []
+    with outbox.pipeline(transaction=True) as pipe:
+        pipe.lrange(OUTBOX_KEY, 0, batch_size - 1)
+        pipe.ltrim(OUTBOX_KEY, batch_size, -1)
+        entries, _ = pipe.execute()
+    return [json.loads(entry) for entry in entries]
+
+
+# ─── Sending ─────────────────────────────────────────────────────────────────
+
+_connection = None
+_connection_lock = threading.Lock()
+
+
+def build_messages(entries):
+    """
+    ``(entry, EmailMessage)`` pairs for the entries whose address has an
+    account (and, for verification, an unconfirmed one), resolved in one query.
+    """
+    User = get_user_model()
+    emails = {email for _, email in entries}
+    users = {
+        user['email']: user
+        for user in User.objects.filter(email__in=emails, is_active=True)
+        .values('email', 'full_name', 'email_confirmed')
+    }
+    messages, seen = [], set()
+    for kind, email in entries:
+        user = users.get(email)
+        if user is None or (kind, email) in seen:
+            continue
+        if kind == EMAIL_VERIFICATION and user['email_confirmed']:
+            continue
+        seen.add((kind, email))
+        subject, body = _MESSAGES[kind]
+        messages.append(([kind, email], mail.EmailMessage(
+            subject,
+            body.format(name=user['full_name'] or email),
+            settings.DEFAULT_FROM_EMAIL,
+            [email],
+        )))
+    return messages
+
+
+def send_batch(messages):
+    """
+    Send ``messages`` in order over this process's open connection to the
+    mail backend, reconnecting once if the server dropped it while idle.
+
+    Returns the number sent. A failure raises ``SendError`` (chained to the
+    mail error) telling how many messages went out before it.
+    """
+    global _connection
+    sent = 0
+    if not messages:
+        return sent
+    with _connection_lock:
+        if _connection is None:
+            _connection = mail.get_connection(fail_silently=False)
+        try:
+            _connection.open()
+            for message in messages:
+                try:
+                    sent += _connection.send_messages([message])
+                except smtplib.SMTPServerDisconnected:
+                    logger.info('Mail connection dropped; reconnecting')
+                    _connection.close()
+                    _connection.open()
+                    sent += _connection.send_messages([message])
+        except (smtplib.SMTPException, OSError) as exc:
+            raise SendError(sent) from exc
+    return sent
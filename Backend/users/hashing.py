@@ -0,0 +1,75 @@
+"""
+Password hashing off the request path, with backpressure.
+
+PBKDF2 is deliberately expensive, so a burst of logins or sign-ups can pin
+every worker's CPU. ``LoginView`` runs ``django.contrib.auth.authenticate``
+(every backend, the ``user_login_failed`` signal, hash upgrades) and
+``RegisterView`` creates the user on one bounded thread pool per process
+(``hashlib`` releases the GIL while hashing):
+
+* at most ``AUTH_HASH_WORKERS`` hashes run at once, and
+* at most ``AUTH_HASH_MAX_PENDING`` may wait for a slot, for no longer than
+  ``AUTH_HASH_QUEUE_TIMEOUT`` seconds.
+
+When the pool is saturated callers get ``HashingBusy`` immediately (the
+views answer 503 with ``Retry-After``) instead of queueing without bound, so
+auth traffic cannot starve the rest of the API. Only the HTTP views use the
+pool: ``UserManager.create_user`` hashes inline, so management commands and
+the admin never see ``HashingBusy``.
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib import auth
+from django.db import close_old_connections
+
+
+class HashingBusy(Exception):
+    """The hashing pool is saturated; retry after ``retry_after`` seconds."""
+
+    def __init__(self, retry_after=1):
+        super().__init__('Too many authentication requests in progress')
+        self.retry_after = retry_after
+
+
+_executor = None
+_slots = None
+_lock = threading.Lock()
+
+
+def _pool():
+    global _executor, _slots
+    with _lock:
+        if _executor is None:
+            workers = getattr(settings, 'AUTH_HASH_WORKERS', 2)
+            _executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='password-hash')
+            _slots = threading.BoundedSemaphore(
+                workers + getattr(settings, 'AUTH_HASH_MAX_PENDING', 8)
+            )
+    return _executor, _slots
+
+
+def _call(func, args, kwargs):
+    try:
+        return func(*args, **kwargs)
+    finally:
+        # Pool threads live outside the request cycle, which is what
+        # normally closes a thread's database connection.
+        close_old_connections()
+
+
+def run(func, *args, **kwargs):
+    """Run ``func(*args, **kwargs)`` on the hashing pool and return its result, or raise ``HashingBusy``."""
+    executor, slots = _pool()
+    if not slots.acquire(timeout=getattr(settings, 'AUTH_HASH_QUEUE_TIMEOUT', 0.5)):
+        raise HashingBusy()
+    try:
+        return executor.submit(_call, func, args, kwargs).result()
+    finally:
+        slots.release()
+
+
+def authenticate(request, email, password):
+    """``django.contrib.auth.authenticate`` on the pool. Returns the ``User`` or ``None``."""
+    return run(auth.authenticate, request, email=email, password=password)
@@ -0,0 +1,90 @@
+import statistics
+import threading
+import time
+import uuid
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = (
+        'Load-test the login endpoint of a running server and measure how a '
+        'cheap endpoint (the health check) responds meanwhile.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', default='http://127.0.0.1:8000', help='Base URL of the server under test.')
+        parser.add_argument('--requests', type=int, default=500, help='Total login attempts.')
+        parser.add_argument('--concurrency', type=int, default=32, help='Concurrent login clients.')
+        parser.add_argument(
+            '--email',
+            help='Log in as this user (with --password); by default every attempt uses '
+                 'a new unknown email, which still costs one hash.',
+        )
+        parser.add_argument('--password', default='not-the-password')
+        parser.add_argument(
+            '--probe-interval',
+            type=float,
+            default=0.1,
+            help='Seconds between health-check probes during the run.',
+        )
+
+    def handle(self, *args, **options):
+        base = options['url'].rstrip('/')
+        login_url = f'{base}/api/users/auth/login/'
+        probe_url = f'{base}/api/users/auth/health/'
+        statuses = Counter()
+        latencies, probe_latencies = [], []
+        done = threading.Event()
+
+        limits = httpx.Limits(max_connections=options['concurrency'] + 1)
+        with httpx.Client(timeout=30, limits=limits) as client:
+            def attempt(_):
+                email = options['email'] or f'bench-{uuid.uuid4().hex[:12]}@example.com'
+                started = time.perf_counter()
+                try:
+                    response = client.post(login_url, json={'email': email, 'password': options['password']})
+                    statuses[response.status_code] += 1
+                except httpx.HTTPError as exc:
+                    statuses[type(exc).__name__] += 1
+                latencies.append(time.perf_counter() - started)
+
+            def probe():
+                while not done.is_set():
+                    started = time.perf_counter()
+                    try:
+                        client.get(probe_url)
+                        probe_latencies.append(time.perf_counter() - started)
+                    except httpx.HTTPError:
+                        statuses['probe_error'] += 1
+                    done.wait(options['probe_interval'])
+
+            prober = threading.Thread(target=probe, daemon=True)
+            prober.start()
+            started = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=options['concurrency']) as pool:
+                list(pool.map(attempt, range(options['requests'])))
+            elapsed = time.perf_counter() - started
+            done.set()
+            prober.join()
+
+        self.stdout.write(f"{options['requests']} login attempts in {elapsed:.2f}s "
+                          f"({options['requests'] / elapsed:.1f} req/s, concurrency {options['concurrency']})")
+        self.stdout.write('Status codes: ' + ', '.join(f'{code}: {n}' for code, n in sorted(statuses.items(), key=str)))
+        self.stdout.write('Login latency:  ' + self._summary(latencies))
+        self.stdout.write('Health latency: ' + self._summary(probe_latencies))
+
+    @staticmethod
+    def _summary(samples):
+        if not samples:
+            return 'no samples'
+        samples = sorted(samples)
+
+        def pct(p):
+            return samples[min(len(samples) - 1, int(p * len(samples)))] * 1000
+
+        return (f'p50 {pct(0.50):.1f}ms  p95 {pct(0.95):.1f}ms  p99 {pct(0.99):.1f}ms  '
+                f'max {samples[-1] * 1000:.1f}ms  mean {statistics.mean(samples) * 1000:.1f}ms  (n={len(samples)})')
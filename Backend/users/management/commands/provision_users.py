@@ -0,0 +1,63 @@
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from users import provisioning
+
+
+class Command(BaseCommand):
+    help = 'Create users (and profiles) in bulk from a CSV or JSONL file.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='CSV (with an "email" header) or JSONL file; "-" reads stdin.')
+        parser.add_argument(
+            '--format',
+            choices=provisioning.FORMATS,
+            help='Input format; detected from the file extension when omitted.',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=getattr(settings, 'USERS_PROVISION_CHUNK_SIZE', 500),
+            help='Users hashed and inserted per batch.',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            help='Password-hashing processes (default: USERS_PROVISION_HASH_WORKERS or CPU count).',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Validate rows and report errors without creating users.',
+        )
+
+    def handle(self, *args, **options):
+        fmt = options['format'] or provisioning.detect_format(options['path'])
+        if fmt is None:
+            raise CommandError('Cannot detect the format; pass --format csv|jsonl.')
+        try:
+            if options['path'] == '-':
+                result = self._provision(sys.stdin.buffer, fmt, options)
+            else:
+                with open(options['path'], 'rb') as stream:
+                    result = self._provision(stream, fmt, options)
+        except (OSError, provisioning.ProvisioningError) as exc:
+            raise CommandError(str(exc))
+
+        for error in result['errors']:
+            self.stderr.write(f"line {error['line']} ({error['email'] or '-'}): {error['error']}")
+        verb = 'would be created' if options['dry_run'] else 'created'
+        self.stdout.write(self.style.SUCCESS(
+            f"{result['created']} users {verb}, {result['failed']} rows failed."
+        ))
+
+    def _provision(self, stream, fmt, options):
+        return provisioning.provision_users(
+            provisioning.iter_rows(stream, fmt),
+            chunk_size=options['chunk_size'],
+            workers=options['workers'],
+            dry_run=options['dry_run'],
+        )
+
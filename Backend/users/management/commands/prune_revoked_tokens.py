@@ -0,0 +1,28 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from users import token_blacklist
+
+
+class Command(BaseCommand):
+    help = 'Delete expired revoked-token records in batches and optionally re-warm the cache.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=getattr(settings, 'AUTH_TOKEN_BLACKLIST_PRUNE_BATCH_SIZE', 1000),
+            help='Rows deleted per statement.',
+        )
+        parser.add_argument(
+            '--warm',
+            action='store_true',
+            help='Afterwards, load all unexpired revocations into the cache.',
+        )
+
+    def handle(self, *args, **options):
+        pruned = token_blacklist.prune_expired(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Pruned {pruned} expired token records.'))
+        if options['warm']:
+            loaded = token_blacklist.warm()
+            self.stdout.write(f'Loaded {loaded} revoked tokens into the cache.')
@@ -1,4 +1,4 @@
-from django.db import models
+from django.db import models, transaction
 from django.contrib.auth.models import AbstractBaseUser, PermissionsMixin, BaseUserManager
 import uuid
 
@@ -18,9 +18,28 @@ class UserManager(BaseUserManager):
             user.set_password(password)
         else:
             user.set_unusable_password()
-            
-        user.save(using=self._db)
+
+        # The profile is created by a post_save receiver; keep both in one transaction.
+        with transaction.atomic(using=self._db):
+            user.save(using=self._db)
         return user
+
+    def bulk_create_with_profiles(self, users, batch_size=500):
+        """
+        Insert ``users`` and their profiles with two bulk INSERTs per chunk, in
+        one transaction. ``bulk_create`` sends no signals, so profiles are
+        built here from the mirrored fields.
+        """
+        with transaction.atomic(using=self._db):
+            created = self.bulk_create(users, batch_size=batch_size)
+            Profile.objects.using(self._db).bulk_create(
+                [
+                    Profile(user=user, **{name: getattr(user, name) for name in User.PROFILE_FIELDS})
+                    for user in created
+                ],
+                batch_size=batch_size,
+            )
+        return created
     
     def create_superuser(self, email, password=None, **extra_fields):
         """Create and save a superuser with the given email and password"""
@@ -78,6 +97,9 @@ class User(AbstractBaseUser, PermissionsMixin):
     
     USERNAME_FIELD = 'email'
     REQUIRED_FIELDS = []
+
+    # Mirrored onto Profile by users.signals.sync_user_profile.
+    PROFILE_FIELDS = ('full_name', 'avatar_url')
     
     class Meta:
         db_table = 'auth_users'
@@ -87,6 +109,24 @@ class User(AbstractBaseUser, PermissionsMixin):
     def __str__(self):
         return self.email
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_profile_values = instance.profile_values()
+        return instance
+
+    def profile_values(self):
+        """Loaded values of ``PROFILE_FIELDS`` (deferred fields are left out, not fetched)."""
+        return {name: self.__dict__[name] for name in self.PROFILE_FIELDS if name in self.__dict__}
+
+    def changed_profile_values(self):
+        """``PROFILE_FIELDS`` that differ from when the row was loaded (all of them if never loaded)."""
+        loaded = getattr(self, '_loaded_profile_values', {})
+        return {
+            name: value for name, value in self.profile_values().items()
+            if name not in loaded or loaded[name] != value
+        }
+
 
 class Profile(models.Model):
     """Extended user profile data"""
@@ -106,3 +146,19 @@ class Profile(models.Model):
     
     def __str__(self):
         return f"Profile for {self.user.email}"
+
+
+class RevokedToken(models.Model):
+    """
+    Durable record of a revoked refresh token (logout or rotation). Lookups go
+    to the cache (users.token_blacklist); rows past ``expires_at`` are pruned.
+    """
+    jti = models.CharField(max_length=255, primary_key=True)
+    expires_at = models.DateTimeField(db_index=True)
+    revoked_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'revoked_tokens'
+
+    def __str__(self):
+        return self.jti
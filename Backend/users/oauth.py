@@ -0,0 +1,126 @@
+"""
+Async user-info lookups for social sign-in.
+
+Google and Facebook access tokens are exchanged for the user's profile over
+one pooled ``httpx.AsyncClient`` per process. The client lives on a
+background event loop (like the LLM provider clients in
+``ai_agents.providers``): under WSGI adrf runs every request on a fresh loop,
+so a client per request loop would never be reused or closed. Views await the
+lookup through ``asyncio.wrap_future`` and so never block on it. Timeouts are
+strict, so a slow provider fails fast instead of holding the request.
+``close`` (also run at exit) closes the pool.
+"""
+import asyncio
+import atexit
+import threading
+
+import httpx
+from django.conf import settings
+
+GOOGLE_USERINFO_URL = 'https://www.googleapis.com/oauth2/v3/userinfo'
+FACEBOOK_ME_URL = 'https://graph.facebook.com/me'
+
+
+class OAuthError(Exception):
+    """The provider rejected the token (``status_code`` 400) or failed (502/504)."""
+
+    def __init__(self, message, status_code=400):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+_client = None
+_loop = None
+_loop_lock = threading.Lock()
+
+
+def get_loop():
+    """Return the process-wide OAuth event loop, starting it on first use."""
+    global _loop
+    with _loop_lock:
+        if _loop is None or _loop.is_closed():
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, name='oauth-http-loop', daemon=True).start()
+    return _loop
+
+
+def _build_client():
+    timeout = getattr(settings, 'OAUTH_HTTP_TIMEOUT', 5.0)
+    return httpx.AsyncClient(
+        timeout=httpx.Timeout(
+            timeout, connect=getattr(settings, 'OAUTH_HTTP_CONNECT_TIMEOUT', 2.0)
+        ),
+        limits=httpx.Limits(
+            max_connections=getattr(settings, 'OAUTH_HTTP_MAX_CONNECTIONS', 100),
+            max_keepalive_connections=20,
+        ),
+    )
+
+
+def get_client():
+    """The pooled client; only call it on ``get_loop()``."""
+    global _client
+    if _client is None:
+        _client = _build_client()
+    return _client
+
+
+def close():
+    """Close the pooled client (process exit, tests)."""
+    global _client
+    if _client is None or _loop is None or _loop.is_closed():
+        _client = None
+        return
+
+    async def aclose():
+        global _client
+        client, _client = _client, None
+        if client is not None:
+            await client.aclose()
+
+    asyncio.run_coroutine_threadsafe(aclose(), _loop).result(5)
+
+
+atexit.register(close)
+
+
+async def _get(url, kwargs):
+    return await get_client().get(url, **kwargs)
+
+
+async def _get_json(provider, url, **kwargs):
+    try:
+        response = await asyncio.wrap_future(
+            asyncio.run_coroutine_threadsafe(_get(url, kwargs), get_loop())
+        )
+    except httpx.TimeoutException as exc:
+        raise OAuthError(f'{provider} did not respond in time', 504) from exc
+    except httpx.HTTPError as exc:
+        raise OAuthError(f'Could not reach {provider}', 502) from exc
+    if response.status_code != 200:
+        raise OAuthError(f'Invalid {provider} token')
+    try:
+        data = response.json()
+    except ValueError as exc:
+        raise OAuthError(f'Unexpected response from {provider}', 502) from exc
+    if not isinstance(data, dict):
+        raise OAuthError(f'Unexpected response from {provider}', 502)
+    return data
+
+
+async def google_user_info(access_token):
+    """Profile for a Google OAuth2 access token (``email``, ``name``, ``picture``, ``sub``)."""
+    return await _get_json(
+        'Google',
+        GOOGLE_USERINFO_URL,
+        headers={'Authorization': f'Bearer {access_token}'},
+    )
+
+
+async def facebook_user_info(access_token):
+    """Profile for a Facebook access token (``email``, ``name``, ``picture``, ``id``)."""
+    return await _get_json(
+        'Facebook',
+        FACEBOOK_ME_URL,
+        params={'fields': 'id,name,email,picture', 'access_token': access_token},
+    )
@@ -0,0 +1,226 @@
+"""
+Bulk user provisioning from CSV or JSONL.
+
+Input is parsed as a stream (one row in memory at a time) and handled in
+chunks: each chunk is validated, checked against existing emails with one
+query, has its passwords hashed in parallel on a process pool, and is
+inserted with ``UserManager.bulk_create_with_profiles``. The pool is started
+once per process on first use and shared by later calls, so API requests do
+not pay for spawning workers and setting Django up each time. Rows that
+cannot be created are reported with their line number instead of aborting
+the import.
+
+Recognised columns: ``email`` (required), ``full_name``, ``avatar_url`` and
+``password`` (users without one get an unusable password and sign in via
+password reset or social login). Other columns are ignored.
+"""
+import csv
+import io
+import json
+import logging
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.password_validation import validate_password
+from django.core.exceptions import ValidationError
+from django.core.validators import URLValidator, validate_email
+from django.db import IntegrityError
+
+from .models import User
+
+logger = logging.getLogger(__name__)
+
+FORMATS = ('csv', 'jsonl')
+COLUMNS = ('email', 'full_name', 'avatar_url', 'password')
+
+
+class ProvisioningError(Exception):
+    """The input as a whole cannot be read (unknown format, bad header)."""
+
+
+# ─── Parsing ─────────────────────────────────────────────────────────────────
+
+def detect_format(filename):
+    extension = os.path.splitext(filename or '')[1].lower().lstrip('.')
+    return {'csv': 'csv', 'jsonl': 'jsonl', 'ndjson': 'jsonl'}.get(extension)
+
+
+def iter_rows(stream, fmt):
+    """
+    Yield ``(line_number, row_or_error)`` from a binary or text stream; a
+    row that cannot be parsed yields its error message instead of a dict.
+    """
+    if fmt not in FORMATS:
+        raise ProvisioningError(f'Unsupported format "{fmt}"; use one of {", ".join(FORMATS)}')
+    if not isinstance(stream, io.TextIOBase):
+        stream = io.TextIOWrapper(stream, encoding='utf-8-sig', newline='')
+
+    if fmt == 'csv':
+        reader = csv.DictReader(stream)
+        if not reader.fieldnames or 'email' not in reader.fieldnames:
+            raise ProvisioningError('CSV header must include an "email" column')
+        for row in reader:
+            yield reader.line_num, row
+        return
+
+    for line_number, line in enumerate(stream, start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError as exc:
+            yield line_number, f'Invalid JSON: {exc}'
+            continue
+        yield line_number, row if isinstance(row, dict) else 'Each line must be a JSON object'
+
+
+# ─── Provisioning ────────────────────────────────────────────────────────────
+
+def _init_worker():
+    # Spawned (non-forked) workers start without Django configured.
+    import django
+
+    django.setup()
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    """
+    The process-wide hashing pool (``USERS_PROVISION_HASH_WORKERS`` processes,
+    default CPU count), started on first use; its workers stay up between calls.
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            workers = getattr(settings, 'USERS_PROVISION_HASH_WORKERS', None) or os.cpu_count()
+            _executor = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker)
+    return _executor
+
+
+def shutdown_executor():
+    """Stop the shared pool; the next provisioning call starts a new one."""
+    global _executor
+    with _executor_lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown()
+
+
+def _clean(row):
+    """Return a ``User`` (password still in clear text) or raise ``ValidationError``."""
+    values = {name: str(row.get(name) or '').strip() for name in COLUMNS}
+    email = User.objects.normalize_email(values['email'])
+    if not email:
+        raise ValidationError('email is required')
+    validate_email(email)
+    if values['avatar_url']:
+        URLValidator()(values['avatar_url'])
+    user = User(
+        email=email,
+        full_name=values['full_name'],
+        avatar_url=values['avatar_url'] or None,
+    )
+    if values['password']:
+        validate_password(values['password'], user)
+    user.password = values['password'] or None
+    return user
+
+
+def provision_users(rows, chunk_size=None, workers=None, dry_run=False, max_rows=None):
+    """
+    Create users from ``iter_rows`` output.
+
+    Returns ``{'created': n, 'failed': n, 'errors': [{'line', 'email', 'error'}]}``.
+    With ``dry_run`` rows are validated (including against existing users)
+    and counted, but nothing is hashed or written. ``workers`` gives this call
+    a pool of its own (the management command); otherwise the shared pool
+    from ``get_executor`` is used.
+    """
+    chunk_size = chunk_size or getattr(settings, 'USERS_PROVISION_CHUNK_SIZE', 500)
+    result = {'created': 0, 'failed': 0, 'errors': []}
+    seen = set()
+
+    def error(line, email, message):
+        result['failed'] += 1
+        result['errors'].append({'line': line, 'email': email, 'error': message})
+
+    own_executor = workers is not None and not dry_run
+    if own_executor:
+        executor = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker)
+    else:
+        executor = None if dry_run else get_executor()
+    try:
+        chunk = []
+        for count, (line, row) in enumerate(rows, start=1):
+            if max_rows and count > max_rows:
+                error(line, None, f'Row limit of {max_rows} exceeded; remaining rows were not read')
+                break
+            if isinstance(row, str):
+                error(line, None, row)
+                continue
+            try:
+                user = _clean(row)
+            except ValidationError as exc:
+                error(line, row.get('email'), '; '.join(exc.messages))
+                continue
+            if user.email in seen:
+                error(line, user.email, 'Duplicate email in input')
+                continue
+            seen.add(user.email)
+            chunk.append((line, user))
+            if len(chunk) >= chunk_size:
+                _create_chunk(chunk, executor, result, error, dry_run)
+                chunk = []
+        if chunk:
+            _create_chunk(chunk, executor, result, error, dry_run)
+    except BrokenProcessPool:
+        # A hashing worker died; start a fresh shared pool next time.
+        if not own_executor:
+            shutdown_executor()
+        raise
+    finally:
+        if own_executor:
+            executor.shutdown()
+    result['errors'].sort(key=lambda error: error['line'])
+    return result
+
+
+def _create_chunk(chunk, executor, result, error, dry_run):
+    existing = set(
+        User.objects.filter(email__in=[user.email for _, user in chunk])
+        .values_list('email', flat=True)
+    )
+    pending = []
+    for line, user in chunk:
+        if user.email in existing:
+            error(line, user.email, 'A user with this email already exists')
+        else:
+            pending.append((line, user))
+    if dry_run:
+        # Counted as if created, so a dry run reports what a real run would do.
+        result['created'] += len(pending)
+        return
+    if not pending:
+        return
+
+    # PBKDF2 is the bulk of the cost; hash the chunk in parallel.
+    passwords = [user.password for _, user in pending]
+    for (_, user), hashed in zip(pending, executor.map(make_password, passwords, chunksize=16)):
+        user.password = hashed
+    try:
+        User.objects.bulk_create_with_profiles([user for _, user in pending])
+    except IntegrityError as exc:
+        # Typically an email registered concurrently; report the whole chunk.
+        logger.warning('Provisioning chunk failed: %s', exc)
+        for line, user in pending:
+            error(line, user.email, f'Could not be created: {exc}')
+        return
+    result['created'] += len(pending)
+    logger.info('Provisioned %s users', result['created'])
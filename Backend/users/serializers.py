@@ -1,7 +1,9 @@
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
 from django.contrib.auth.password_validation import validate_password
+from rest_framework_simplejwt.serializers import TokenRefreshSerializer as BaseTokenRefreshSerializer
 from .models import Profile
+from .token_blacklist import BlacklistRefreshToken
 
 User = get_user_model()
 
@@ -65,3 +67,8 @@ class SocialAuthSerializer(serializers.Serializer):
 class PasswordResetSerializer(serializers.Serializer):
     """Serializer for password reset request"""
     email = serializers.EmailField(required=True)
+
+
+class TokenRefreshSerializer(BaseTokenRefreshSerializer):
+    """Refresh/rotate against the revoked-token store (users.token_blacklist)"""
+    token_class = BlacklistRefreshToken
@@ -1,23 +1,39 @@
-from django.db.models.signals import post_save
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
+from django.utils import timezone
+from . import cache
 from .models import User, Profile
 
 
 @receiver(post_save, sender=User)
-def create_user_profile(sender, instance, created, **kwargs):
-    """Automatically create a profile when a new user is created"""
+def sync_user_profile(sender, instance, created, update_fields=None, raw=False, **kwargs):
+    """Create the profile with a new user, then mirror only changed fields onto it"""
+    if raw:
+        return
     if created:
-        Profile.objects.create(
-            user=instance,
-            full_name=instance.full_name,
-            avatar_url=instance.avatar_url
-        )
+        Profile.objects.create(user=instance, **instance.profile_values())
+    else:
+        changed = instance.changed_profile_values()
+        if update_fields is not None:
+            changed = {name: value for name, value in changed.items() if name in update_fields}
+        if changed:
+            # One UPDATE, no SELECT; users created before profiles existed get one now.
+            updated = Profile.objects.filter(user=instance).update(
+                **changed, updated_at=timezone.now()
+            )
+            if not updated:
+                Profile.objects.create(user=instance, **instance.profile_values())
+    saved = instance.profile_values()
+    if update_fields is not None:
+        saved = {name: value for name, value in saved.items() if name in update_fields}
+    instance._loaded_profile_values = {**getattr(instance, '_loaded_profile_values', {}), **saved}
 
 
 @receiver(post_save, sender=User)
-def save_user_profile(sender, instance, **kwargs):
-    """Save the profile when user is saved"""
-    if hasattr(instance, 'profile'):
-        instance.profile.full_name = instance.full_name
-        instance.profile.avatar_url = instance.avatar_url
-        instance.profile.save()
+@receiver(post_delete, sender=User)
+def invalidate_cached_user(sender, instance, **kwargs):
+    """Drop the cached auth copy so changes (e.g. is_active) apply on the next request"""
+    cache.invalidate(instance.pk)
+    # Again after commit, in case a request re-cached the old row meanwhile.
+    transaction.on_commit(lambda: cache.invalidate(instance.pk))
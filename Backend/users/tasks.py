@@ -0,0 +1,34 @@
+from celery import shared_task
+from django.conf import settings
+
+from . import emails, token_blacklist
+
+
+@shared_task(name='users.prune_revoked_tokens', ignore_result=True)
+def prune_revoked_tokens():
+    """Periodic pruning of expired revocations; see ``CELERY_BEAT_SCHEDULE``."""
+    token_blacklist.prune_expired()
+
+
+@shared_task(bind=True, name='users.send_account_emails', ignore_result=True, max_retries=5)
+def send_account_emails(self, entries):
+    """Send one batch of queued ``[kind, email]`` entries; retries only the unsent ones."""
+    pending = emails.build_messages(entries)
+    try:
+        emails.send_batch([message for _, message in pending])
+    except emails.SendError as exc:
+        unsent = [entry for entry, _ in pending[exc.sent:]]
+        raise self.retry(args=[unsent], exc=exc.__cause__, countdown=2 ** self.request.retries)
+
+
+@shared_task(name='users.flush_email_outbox', ignore_result=True)
+def flush_email_outbox():
+    """Drain the Redis outbox into ``send_account_emails`` batches."""
+    batch_size = getattr(settings, 'USERS_EMAIL_BATCH_SIZE', 100)
+    max_batches = getattr(settings, 'USERS_EMAIL_MAX_BATCHES_PER_FLUSH', 50)
+    for _ in range(max_batches):
+        entries = emails.drain(batch_size)
+        if entries:
+            send_account_emails.delay(entries)
+        if len(entries) < batch_size:
+            break
@@ -0,0 +1,105 @@
+from unittest import mock
+
+from django.contrib.auth.signals import user_login_failed
+from django.test import TestCase, TransactionTestCase, override_settings
+from rest_framework.test import APIClient
+
+from users import hashing, throttling
+from users.models import User
+
+LOGIN_URL = '/api/users/auth/login/'
+REGISTER_URL = '/api/users/auth/register/'
+
+
+def fresh_throttles(test):
+    patcher = mock.patch.object(throttling, '_backend', throttling.LocalBackend())
+    patcher.start()
+    test.addCleanup(patcher.stop)
+
+
+# The hashing pool runs authenticate() on its own threads, which only see
+# committed rows.
+class PasswordAuthTests(TransactionTestCase):
+    def setUp(self):
+        fresh_throttles(self)
+        self.user = User.objects.create_user(email='jane@example.com', password='s3cret-pass!')
+        self.client = APIClient()
+
+    def test_valid_credentials_return_tokens(self):
+        response = self.client.post(LOGIN_URL, {'email': 'jane@example.com', 'password': 's3cret-pass!'})
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertEqual(response.data['user']['email'], 'jane@example.com')
+        self.assertIn('access', response.data['tokens'])
+
+    def test_failures_go_through_the_auth_backends(self):
+        failures = []
+
+        def receiver(sender, credentials, request, **kwargs):
+            failures.append((credentials, request))
+
+        user_login_failed.connect(receiver)
+        self.addCleanup(user_login_failed.disconnect, receiver)
+        response = self.client.post(LOGIN_URL, {'email': 'jane@example.com', 'password': 'wrong'})
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(len(failures), 1)
+        self.assertEqual(failures[0][0]['email'], 'jane@example.com')
+        self.assertIsNotNone(failures[0][1])
+
+    def test_registration_hashes_on_the_pool(self):
+        with mock.patch.object(hashing, 'run', wraps=hashing.run) as run:
+            response = self.client.post(REGISTER_URL, {
+                'email': 'new@example.com', 'password': 'An0ther-pass!', 'password_confirm': 'An0ther-pass!',
+            })
+        self.assertEqual(response.status_code, 201, response.content)
+        run.assert_called_once()
+        self.assertTrue(User.objects.get(email='new@example.com').check_password('An0ther-pass!'))
+
+    def test_inactive_users_cannot_log_in(self):
+        User.objects.filter(pk=self.user.pk).update(is_active=False)
+        response = self.client.post(LOGIN_URL, {'email': 'jane@example.com', 'password': 's3cret-pass!'})
+        self.assertEqual(response.status_code, 401)
+
+
+class HashingBackpressureTests(TestCase):
+    def setUp(self):
+        fresh_throttles(self)
+
+    def test_saturated_pool_answers_503(self):
+        with mock.patch.object(hashing, 'run', side_effect=hashing.HashingBusy(retry_after=3)):
+            response = APIClient().post(LOGIN_URL, {'email': 'jane@example.com', 'password': 'x'})
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response['Retry-After'], '3')
+
+    def test_create_user_never_waits_for_the_pool(self):
+        with mock.patch.object(hashing, 'run', side_effect=hashing.HashingBusy()):
+            user = User.objects.create_user(email='admin@example.com', password='s3cret-pass!')
+        self.assertTrue(user.check_password('s3cret-pass!'))
+
+
+@override_settings(AUTH_THROTTLE_RATES={'login_ip': '100/min', 'login_email': '2/min'})
+class LoginThrottleTests(TestCase):
+    def setUp(self):
+        fresh_throttles(self)
+
+    def attempt(self, address):
+        with mock.patch.object(hashing, 'authenticate', return_value=None):
+            return APIClient().post(
+                LOGIN_URL, {'email': 'Victim@example.com', 'password': 'guess'}, REMOTE_ADDR=address,
+            )
+
+    def test_email_limit_applies_per_client(self):
+        self.assertEqual(self.attempt('203.0.113.5').status_code, 401)
+        self.assertEqual(self.attempt('203.0.113.5').status_code, 401)
+        limited = self.attempt('203.0.113.5')
+        self.assertEqual(limited.status_code, 429)
+        self.assertIn('Retry-After', limited)
+        # Someone else's guesses do not lock the owner out.
+        self.assertEqual(self.attempt('198.51.100.7').status_code, 401)
+
+    @override_settings(AUTH_THROTTLE_RATES={'login_ip': '100/min', 'login_email': '2/min', 'login_account': '4/min'})
+    def test_account_limit_applies_across_clients(self):
+        for address in ('203.0.113.1', '203.0.113.2', '203.0.113.3', '203.0.113.4'):
+            self.assertEqual(self.attempt(address).status_code, 401)
+        limited = self.attempt('203.0.113.5')
+        self.assertEqual(limited.status_code, 429)
+        self.assertIn('Retry-After', limited)
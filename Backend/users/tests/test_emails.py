@@ -0,0 +1,189 @@
+import json
+import smtplib
+from unittest import mock
+
+from celery.exceptions import Retry
+from django.core import mail
+from django.core.mail.backends.locmem import EmailBackend
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from users import emails, tasks, throttling
+from users.models import User
+
+
+class FakeOutbox:
+    """The list commands ``users.emails`` uses, over a dict of Python lists."""
+
+    def __init__(self):
+        self.lists = {}
+
+    def rpush(self, key, value):
+        self.lists.setdefault(key, []).append(value)
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+
+class FakePipeline:
+    def __init__(self, outbox):
+        self.outbox = outbox
+        self.commands = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def lrange(self, key, start, end):
+        self.commands.append(lambda: self.outbox.lists.get(key, [])[start:end + 1])
+
+    def ltrim(self, key, start, end):
+        def trim():
+            self.outbox.lists[key] = self.outbox.lists.get(key, [])[start:]
+            return True
+        self.commands.append(trim)
+
+    def execute(self):
+        return [command() for command in self.commands]
+
+
+class FlakyBackend(EmailBackend):
+    """Locmem backend that refuses messages to ``fail_for`` addresses."""
+    fail_for = set()
+
+    def send_messages(self, messages):
+        for message in messages:
+            if message.to[0] in self.fail_for:
+                raise smtplib.SMTPDataError(451, b'try again later')
+        return super().send_messages(messages)
+
+
+def fresh_connection(test):
+    patcher = mock.patch.object(emails, '_connection', None)
+    patcher.start()
+    test.addCleanup(patcher.stop)
+
+
+class OutboxTests(TestCase):
+    def test_without_redis_each_email_is_its_own_task(self):
+        with mock.patch.object(tasks.send_account_emails, 'delay') as delay:
+            emails.enqueue(emails.PASSWORD_RESET, 'jane@example.com')
+        delay.assert_called_once_with([[emails.PASSWORD_RESET, 'jane@example.com']])
+
+    def test_unknown_kind(self):
+        with self.assertRaises(ValueError):
+            emails.enqueue('newsletter', 'jane@example.com')
+
+    def test_drain_pops_in_order(self):
+        outbox = FakeOutbox()
+        with mock.patch.object(emails, '_outbox', return_value=outbox):
+            for number in range(5):
+                emails.enqueue(emails.PASSWORD_RESET, f'user{number}@example.com')
+            self.assertEqual(
+                emails.drain(3),
+                [[emails.PASSWORD_RESET, f'user{number}@example.com'] for number in range(3)],
+            )
+            self.assertEqual([json.loads(entry)[1] for entry in outbox.lists[emails.OUTBOX_KEY]],
+                             ['user3@example.com', 'user4@example.com'])
+
+    def test_flush_splits_the_outbox_into_batches(self):
+        outbox = FakeOutbox()
+        with mock.patch.object(emails, '_outbox', return_value=outbox), \
+                mock.patch.object(tasks.send_account_emails, 'delay') as delay, \
+                self.settings(USERS_EMAIL_BATCH_SIZE=2):
+            for number in range(5):
+                emails.enqueue(emails.PASSWORD_RESET, f'user{number}@example.com')
+            tasks.flush_email_outbox()
+        self.assertEqual([len(call.args[0]) for call in delay.call_args_list], [2, 2, 1])
+        self.assertEqual(outbox.lists[emails.OUTBOX_KEY], [])
+
+
+@override_settings(EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend')
+class SendTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.jane = User.objects.create_user(email='jane@example.com', password='x', full_name='Jane')
+        cls.confirmed = User.objects.create_user(email='done@example.com', password='x', email_confirmed=True)
+        User.objects.create_user(email='gone@example.com', password='x', is_active=False)
+
+    def setUp(self):
+        fresh_connection(self)
+
+    def test_only_known_unconfirmed_addresses_get_mail(self):
+        tasks.send_account_emails([
+            [emails.PASSWORD_RESET, 'jane@example.com'],
+            [emails.PASSWORD_RESET, 'jane@example.com'],
+            [emails.EMAIL_VERIFICATION, 'jane@example.com'],
+            [emails.EMAIL_VERIFICATION, 'done@example.com'],
+            [emails.PASSWORD_RESET, 'gone@example.com'],
+            [emails.PASSWORD_RESET, 'nobody@example.com'],
+        ])
+        self.assertEqual(
+            [(message.subject, message.to) for message in mail.outbox],
+            [('Password Reset Request', ['jane@example.com']), ('Confirm your email address', ['jane@example.com'])],
+        )
+        self.assertIn('Hello Jane', mail.outbox[0].body)
+
+    def test_connection_is_kept_between_batches(self):
+        tasks.send_account_emails([[emails.PASSWORD_RESET, 'jane@example.com']])
+        connection = emails._connection
+        tasks.send_account_emails([[emails.PASSWORD_RESET, 'done@example.com']])
+        self.assertIs(emails._connection, connection)
+        self.assertEqual(len(mail.outbox), 2)
+
+    @override_settings(EMAIL_BACKEND='users.tests.test_emails.FlakyBackend')
+    def test_partial_failure_retries_only_unsent_entries(self):
+        User.objects.create_user(email='third@example.com', password='x')
+        entries = [
+            [emails.PASSWORD_RESET, 'jane@example.com'],
+            [emails.PASSWORD_RESET, 'done@example.com'],
+            [emails.PASSWORD_RESET, 'third@example.com'],
+        ]
+        with mock.patch.object(FlakyBackend, 'fail_for', {'done@example.com'}), \
+                mock.patch.object(tasks.send_account_emails, 'retry', side_effect=Retry) as retry:
+            with self.assertRaises(Retry):
+                tasks.send_account_emails(entries)
+        self.assertEqual([message.to for message in mail.outbox], [['jane@example.com']])
+        self.assertEqual(retry.call_args.kwargs['args'], [entries[1:]])
+        self.assertIsInstance(retry.call_args.kwargs['exc'], smtplib.SMTPDataError)
+
+        # The retry sends the rest once the server recovers.
+        tasks.send_account_emails(*retry.call_args.kwargs['args'])
+        self.assertEqual([message.to[0] for message in mail.outbox],
+                         ['jane@example.com', 'done@example.com', 'third@example.com'])
+
+    def test_dropped_connection_is_reopened(self):
+        real_send = EmailBackend.send_messages
+        calls = []
+
+        def send_messages(backend, messages):
+            calls.append(messages)
+            if len(calls) == 1:
+                raise smtplib.SMTPServerDisconnected()
+            return real_send(backend, messages)
+
+        with mock.patch.object(EmailBackend, 'send_messages', send_messages):
+            sent = emails.send_batch([message for _, message in emails.build_messages(
+                [[emails.PASSWORD_RESET, 'jane@example.com']],
+            )])
+        self.assertEqual(sent, 1)
+        self.assertEqual(len(mail.outbox), 1)
+
+
+@override_settings(EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend')
+class RegistrationEmailTests(TestCase):
+    def setUp(self):
+        patcher = mock.patch.object(throttling, '_backend', throttling.LocalBackend())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_registration_queues_a_verification_email(self):
+        with mock.patch.object(emails, 'enqueue') as enqueue, \
+                mock.patch('users.hashing.run', side_effect=lambda fn: fn()):
+            response = APIClient().post('/api/users/auth/register/', {
+                'email': 'new@example.com', 'password': 'An0ther-pass!', 'password_confirm': 'An0ther-pass!',
+            })
+        self.assertEqual(response.status_code, 201, response.content)
+        enqueue.assert_called_once_with(emails.EMAIL_VERIFICATION, 'new@example.com')
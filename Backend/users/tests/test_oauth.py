@@ -0,0 +1,92 @@
+import json
+from unittest import mock
+
+import httpx
+from asgiref.sync import async_to_sync
+from django.test import SimpleTestCase, TestCase
+from rest_framework.test import APIClient
+
+from users import oauth
+from users.models import User
+
+
+class MockProviderMixin:
+    def setUp(self):
+        super().setUp()
+        oauth.close()
+        self.addCleanup(oauth.close)
+        self.requests = []
+        self.respond = lambda request: httpx.Response(200, json={'email': 'jane@example.com', 'name': 'Jane'})
+        self.builds = 0
+
+        def build():
+            self.builds += 1
+            return httpx.AsyncClient(transport=httpx.MockTransport(self.handle))
+
+        patcher = mock.patch.object(oauth, '_build_client', build)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def handle(self, request):
+        self.requests.append(request)
+        return self.respond(request)
+
+
+class UserInfoTests(MockProviderMixin, SimpleTestCase):
+    def test_google_and_facebook_requests(self):
+        self.assertEqual(async_to_sync(oauth.google_user_info)('g-token')['email'], 'jane@example.com')
+        async_to_sync(oauth.facebook_user_info)('f-token')
+
+        google, facebook = self.requests
+        self.assertEqual(str(google.url), oauth.GOOGLE_USERINFO_URL)
+        self.assertEqual(google.headers['Authorization'], 'Bearer g-token')
+        self.assertEqual(facebook.url.params['access_token'], 'f-token')
+
+    def test_one_client_serves_every_request_loop(self):
+        # async_to_sync runs each call on a new event loop, like adrf under WSGI.
+        for _ in range(3):
+            async_to_sync(oauth.google_user_info)('token')
+        self.assertEqual(self.builds, 1)
+        client = oauth._client
+
+        oauth.close()
+        self.assertTrue(client.is_closed)
+        async_to_sync(oauth.google_user_info)('token')
+        self.assertEqual(self.builds, 2)
+
+    def test_errors_are_mapped(self):
+        def raise_(exc):
+            def respond(request):
+                raise exc
+            return respond
+
+        cases = [
+            (lambda request: httpx.Response(401, json={'error': 'invalid_token'}), 400),
+            (lambda request: httpx.Response(200, text='<html>maintenance</html>'), 502),
+            (lambda request: httpx.Response(200, json=['not', 'a', 'profile']), 502),
+            (raise_(httpx.ReadTimeout('slow')), 504),
+            (raise_(httpx.ConnectError('refused')), 502),
+        ]
+        for respond, status_code in cases:
+            with self.subTest(status_code=status_code):
+                self.respond = respond
+                with self.assertRaises(oauth.OAuthError) as raised:
+                    async_to_sync(oauth.google_user_info)('token')
+                self.assertEqual(raised.exception.status_code, status_code)
+
+
+class OAuthViewTests(MockProviderMixin, TestCase):
+    def test_google_sign_in(self):
+        self.respond = lambda request: httpx.Response(200, content=json.dumps({
+            'email': 'jane@example.com', 'name': 'Jane', 'sub': 'g-1', 'picture': 'https://example.com/j.png',
+        }))
+        response = APIClient().post('/api/users/auth/google/', {'access_token': 'token'}, format='json')
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertIn('access', response.data['tokens'])
+        self.assertEqual(User.objects.get(email='jane@example.com').provider_id, 'g-1')
+
+    def test_provider_returning_html_is_a_bad_gateway(self):
+        self.respond = lambda request: httpx.Response(200, text='<html>oops</html>')
+        response = APIClient().post('/api/users/auth/facebook/', {'access_token': 'token'}, format='json')
+        self.assertEqual(response.status_code, 502)
+        self.assertFalse(User.objects.exists())
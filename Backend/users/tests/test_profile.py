@@ -0,0 +1,30 @@
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from users.models import Profile, User
+
+
+class ProfileMeTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email='jane@example.com', password='s3cret-pass!', full_name='Jane')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_update_mirrors_validated_fields_onto_the_user(self):
+        response = self.client.patch(
+            '/api/users/profile/me/',
+            {'full_name': '  Jane Doe  ', 'email': 'attacker@example.com', 'is_staff': True},
+            format='json',
+        )
+        self.assertEqual(response.status_code, 200, response.content)
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.full_name, 'Jane Doe')
+        self.assertEqual(self.user.email, 'jane@example.com')
+        self.assertFalse(self.user.is_staff)
+        self.assertEqual(Profile.objects.get(user=self.user).full_name, 'Jane Doe')
+
+    def test_invalid_values_are_rejected_before_touching_the_user(self):
+        response = self.client.patch('/api/users/profile/me/', {'avatar_url': 'not a url'}, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.user.refresh_from_db()
+        self.assertIsNone(self.user.avatar_url)
@@ -0,0 +1,154 @@
+import io
+from concurrent.futures.process import BrokenProcessPool
+from unittest import mock
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from users import provisioning
+from users.models import Profile, User
+
+
+class InlineExecutor:
+    """Stands in for ``ProcessPoolExecutor``: hashes in this process and counts instances."""
+    created = 0
+
+    def __init__(self, max_workers=None, initializer=None):
+        type(self).created += 1
+        self.max_workers = max_workers
+        self.shut_down = False
+
+    def map(self, fn, *iterables, chunksize=1):
+        return map(fn, *iterables)
+
+    def shutdown(self, wait=True):
+        self.shut_down = True
+
+
+def rows(text, fmt='csv'):
+    return provisioning.iter_rows(io.BytesIO(text.encode()), fmt)
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class ProvisionUsersTests(TestCase):
+    def setUp(self):
+        InlineExecutor.created = 0
+        patcher = mock.patch.object(provisioning, 'ProcessPoolExecutor', InlineExecutor)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        provisioning.shutdown_executor()
+        self.addCleanup(provisioning.shutdown_executor)
+
+    def test_creates_users_and_profiles_and_reports_bad_rows(self):
+        User.objects.create_user(email='taken@example.com', password='x')
+        result = provisioning.provision_users(rows(
+            'email,full_name,password\n'
+            'ann@example.com,Ann,Str0ng-pass-1\n'
+            'not-an-email,Bad,\n'
+            'ann@example.com,Ann again,\n'
+            'taken@example.com,Taken,\n'
+            'bob@example.com,Bob,\n'
+        ), chunk_size=2)
+
+        self.assertEqual(result['created'], 2)
+        self.assertEqual(result['failed'], 3)
+        self.assertEqual([error['line'] for error in result['errors']], [3, 4, 5])
+        ann = User.objects.get(email='ann@example.com')
+        self.assertTrue(ann.check_password('Str0ng-pass-1'))
+        self.assertFalse(User.objects.get(email='bob@example.com').has_usable_password())
+        self.assertTrue(Profile.objects.filter(user=ann, full_name='Ann').exists())
+
+    def test_jsonl_reports_unparseable_lines(self):
+        result = provisioning.provision_users(rows(
+            '{"email": "ann@example.com"}\n'
+            '{not json\n'
+            '[1, 2]\n',
+            fmt='jsonl',
+        ))
+        self.assertEqual(result['created'], 1)
+        self.assertEqual([error['line'] for error in result['errors']], [2, 3])
+
+    def test_csv_without_email_column_is_rejected(self):
+        with self.assertRaises(provisioning.ProvisioningError):
+            provisioning.provision_users(rows('name\nAnn\n'))
+
+    def test_dry_run_writes_nothing_and_starts_no_pool(self):
+        result = provisioning.provision_users(rows('email\nann@example.com\n'), dry_run=True)
+        self.assertEqual(result['created'], 1)
+        self.assertFalse(User.objects.exists())
+        self.assertEqual(InlineExecutor.created, 0)
+
+    def test_max_rows_stops_reading(self):
+        result = provisioning.provision_users(
+            rows('email\na@example.com\nb@example.com\nc@example.com\n'), max_rows=2,
+        )
+        self.assertEqual(result['created'], 2)
+        self.assertEqual(result['failed'], 1)
+        self.assertIn('Row limit of 2', result['errors'][0]['error'])
+
+    @override_settings(USERS_PROVISION_HASH_WORKERS=3)
+    def test_calls_share_one_pool(self):
+        provisioning.provision_users(rows('email,password\na@example.com,Str0ng-pass-1\n'))
+        provisioning.provision_users(rows('email,password\nb@example.com,Str0ng-pass-1\n'))
+
+        self.assertEqual(InlineExecutor.created, 1)
+        pool = provisioning.get_executor()
+        self.assertEqual(pool.max_workers, 3)
+        self.assertFalse(pool.shut_down)
+        self.assertEqual(User.objects.count(), 2)
+
+    def test_explicit_workers_use_a_private_pool(self):
+        shared = provisioning.get_executor()
+        provisioning.provision_users(rows('email\na@example.com\n'), workers=2)
+
+        self.assertEqual(InlineExecutor.created, 2)
+        self.assertIs(provisioning.get_executor(), shared)
+        self.assertFalse(shared.shut_down)
+
+    def test_broken_pool_is_replaced_on_next_call(self):
+        broken = provisioning.get_executor()
+        with mock.patch.object(broken, 'map', side_effect=BrokenProcessPool):
+            with self.assertRaises(BrokenProcessPool):
+                provisioning.provision_users(rows('email\na@example.com\n'))
+        self.assertTrue(broken.shut_down)
+
+        result = provisioning.provision_users(rows('email\na@example.com\n'))
+        self.assertEqual(result['created'], 1)
+        self.assertIsNot(provisioning.get_executor(), broken)
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class ProvisioningViewTests(TestCase):
+    def setUp(self):
+        patcher = mock.patch.object(provisioning, 'ProcessPoolExecutor', InlineExecutor)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        provisioning.shutdown_executor()
+        self.addCleanup(provisioning.shutdown_executor)
+        self.client = APIClient()
+
+    def upload(self, name, content):
+        return self.client.post(
+            '/api/users/provision/',
+            {'file': SimpleUploadedFile(name, content.encode())},
+            format='multipart',
+        )
+
+    def test_staff_can_provision(self):
+        self.client.force_authenticate(User.objects.create_user(email='admin@example.com', password='x', is_staff=True))
+        response = self.upload('users.csv', 'email\nann@example.com\n')
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertEqual(response.data['created'], 1)
+        self.assertTrue(User.objects.filter(email='ann@example.com').exists())
+
+    def test_unknown_format_is_a_400(self):
+        self.client.force_authenticate(User.objects.create_user(email='admin@example.com', password='x', is_staff=True))
+        response = self.upload('users.txt', 'email\nann@example.com\n')
+        self.assertEqual(response.status_code, 400)
+
+    def test_non_staff_is_forbidden(self):
+        self.client.force_authenticate(User.objects.create_user(email='user@example.com', password='x'))
+        response = self.upload('users.csv', 'email\nann@example.com\n')
+        self.assertEqual(response.status_code, 403)
+        self.assertFalse(User.objects.filter(email='ann@example.com').exists())
@@ -0,0 +1,61 @@
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework_simplejwt.exceptions import TokenError
+
+from users import token_blacklist
+from users.models import RevokedToken, User
+from users.token_blacklist import BlacklistRefreshToken
+
+
+@override_settings(AUTH_TOKEN_BLACKLIST_USE_CACHE=True)
+class TokenRevocationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(email='jane@example.com', password='s3cret-pass!')
+
+    def setUp(self):
+        cache.clear()
+        self.token = BlacklistRefreshToken.for_user(self.user)
+        self.jti = self.token['jti']
+        self.key = token_blacklist.KEY_PREFIX + self.jti
+
+    def revoke(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.token.blacklist()
+
+    def test_revoked_token_is_rejected(self):
+        self.revoke()
+        self.assertTrue(RevokedToken.objects.filter(jti=self.jti).exists())
+        with self.assertRaises(TokenError):
+            BlacklistRefreshToken(str(self.token))
+
+    def test_revoked_token_stays_rejected_after_its_key_is_evicted(self):
+        self.revoke()
+        cache.delete(self.key)
+        with self.assertRaises(TokenError):
+            BlacklistRefreshToken(str(self.token))
+        # The answer from the table is cached again.
+        self.assertEqual(cache.get(self.key), token_blacklist.REVOKED)
+
+    def test_live_tokens_are_cached_as_not_revoked(self):
+        self.assertFalse(token_blacklist.is_revoked(self.jti))
+        self.assertEqual(cache.get(self.key), token_blacklist.NOT_REVOKED)
+        with self.assertNumQueries(0):
+            self.assertFalse(token_blacklist.is_revoked(self.jti))
+
+    def test_revocation_replaces_a_negative_entry(self):
+        self.assertFalse(token_blacklist.is_revoked(self.jti))
+        self.revoke()
+        with self.assertNumQueries(0):
+            self.assertTrue(token_blacklist.is_revoked(self.jti))
+
+    @override_settings(AUTH_TOKEN_BLACKLIST_USE_CACHE=False)
+    def test_without_a_shared_cache_the_table_decides(self):
+        self.token.blacklist()
+        self.assertTrue(token_blacklist.is_revoked(self.jti))
+        self.assertIsNone(cache.get(self.key))
+
+    def test_prune_keeps_unexpired_revocations(self):
+        self.revoke()
+        self.assertEqual(token_blacklist.prune_expired(), 0)
+        self.assertTrue(RevokedToken.objects.filter(jti=self.jti).exists())
@@ -0,0 +1,55 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from users import cache as user_cache
+from users.models import User
+
+
+class UserCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        user_cache._local.clear()
+        self.user = User.objects.create_user(email='jane@example.com', password='s3cret-pass!')
+        user_cache.invalidate(self.user.pk)
+
+    def test_loaded_user_behaves_like_a_row(self):
+        user = user_cache.get_user(self.user.pk)
+        self.assertEqual((user.pk, user.email, user.is_active), (self.user.pk, 'jane@example.com', True))
+        self.assertFalse(user._state.adding)
+        self.assertTrue(user.check_password('s3cret-pass!'))
+        with self.assertRaises(User.DoesNotExist):
+            user_cache.get_user(0)
+
+    def test_is_active_flip_applies_on_the_next_lookup(self):
+        user_cache.get_user(self.user.pk)
+        with self.assertNumQueries(0):
+            self.assertTrue(user_cache.get_user(self.user.pk).is_active)
+
+        self.user.is_active = False
+        self.user.save(update_fields=['is_active'])
+        self.assertFalse(user_cache.get_user(self.user.pk).is_active)
+
+    @override_settings(AUTH_USER_CACHE_USE_SHARED=True, AUTH_USER_CACHE_LOCAL_TTL=0)
+    def test_shared_level_is_invalidated_for_every_process(self):
+        user_cache.get_user(self.user.pk)
+        self.assertIsNotNone(cache.get(user_cache._key(self.user.pk)))
+        with self.assertNumQueries(0):
+            user_cache.get_user(self.user.pk)
+
+        User.objects.filter(pk=self.user.pk).update(is_active=False)
+        user_cache.invalidate(self.user.pk)
+        self.assertIsNone(cache.get(user_cache._key(self.user.pk)))
+        self.assertFalse(user_cache.get_user(self.user.pk).is_active)
+
+    @override_settings(AUTH_USER_CACHE_USE_SHARED=False)
+    def test_without_a_shared_cache_other_processes_only_keep_the_local_copy(self):
+        user_cache.get_user(self.user.pk)
+        self.assertIsNone(cache.get(user_cache._key(self.user.pk)))
+
+        # Another worker deactivates the user: this process's signal never runs.
+        User.objects.filter(pk=self.user.pk).update(is_active=False)
+        self.assertTrue(user_cache.get_user(self.user.pk).is_active)
+        with mock.patch('users.cache.time.monotonic', return_value=user_cache.time.monotonic() + 1):
+            self.assertFalse(user_cache.get_user(self.user.pk).is_active)
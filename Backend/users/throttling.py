@@ -0,0 +1,181 @@
+"""
+Sliding-window throttles for the login, registration and password reset
+endpoints.
+
+Each throttle keeps the timestamps of recent attempts per key (client IP,
+submitted email, or both) and admits a request only while fewer than ``limit`` fall
+inside the last ``period`` seconds, so there is no burst allowance at window
+boundaries as with fixed windows. Rates come from ``AUTH_THROTTLE_RATES``.
+
+Windows live in Redis (a sorted set per key, updated atomically in a Lua
+script) when ``AUTH_THROTTLE_REDIS_URL`` is set, so every worker shares the
+same count, and in process memory otherwise.
+"""
+import threading
+import time
+import uuid
+from collections import deque
+
+from django.conf import settings
+from rest_framework.throttling import BaseThrottle
+
+_LUA_HIT = """
+local now = tonumber(ARGV[1])
+local period = tonumber(ARGV[2])
+local limit = tonumber(ARGV[3])
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', now - period)
+local count = redis.call('ZCARD', KEYS[1])
+if count >= limit then
+    local oldest = redis.call('ZRANGE', KEYS[1], 0, 0, 'WITHSCORES')
+    return tostring(tonumber(oldest[2]) + period - now)
+end
+redis.call('ZADD', KEYS[1], now, ARGV[4])
+redis.call('EXPIRE', KEYS[1], math.ceil(period))
+return '0'
+"""
+
+_DURATIONS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+
+def parse_rate(rate):
+    """``'5/min'`` → ``(5, 60)``; ``None`` disables the throttle."""
+    if not rate:
+        return None, None
+    limit, period = rate.split('/')
+    return int(limit), _DURATIONS[period[0]]
+
+
+# ─── Backends ────────────────────────────────────────────────────────────────
+
+class LocalBackend:
+    """Per-process windows; only coordinates the threads of one worker."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._windows = {}
+        self._max_period = 0
+
+    def hit(self, key, limit, period):
+        now = time.time()
+        with self._lock:
+            window = self._windows.setdefault(key, deque())
+            while window and window[0] <= now - period:
+                window.popleft()
+            if len(window) >= limit:
+                return window[0] + period - now
+            window.append(now)
+            self._max_period = max(self._max_period, period)
+            if len(self._windows) > 100000:
+                self._prune(now)
+            return 0.0
+
+    def _prune(self, now):
+        cutoff = now - self._max_period
+        for key in [key for key, window in self._windows.items() if not window or window[-1] <= cutoff]:
+            del self._windows[key]
+
+
+class RedisBackend:
+    """Windows shared by every worker; one atomic Lua call per request."""
+
+    def __init__(self, url):
+        import redis
+
+        self._redis = redis.Redis.from_url(url)
+        self._hit = self._redis.register_script(_LUA_HIT)
+
+    def hit(self, key, limit, period):
+        return float(self._hit(keys=[key], args=[time.time(), period, limit, uuid.uuid4().hex]))
+
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def get_backend():
+    global _backend
+    with _backend_lock:
+        if _backend is None:
+            url = getattr(settings, 'AUTH_THROTTLE_REDIS_URL', None)
+            _backend = RedisBackend(url) if url else LocalBackend()
+    return _backend
+
+
+# ─── Throttles ───────────────────────────────────────────────────────────────
+
+class SlidingWindowThrottle(BaseThrottle):
+    """Base class; subclasses set ``scope`` and implement ``get_ident_key``."""
+
+    scope = None
+
+    def __init__(self):
+        rates = getattr(settings, 'AUTH_THROTTLE_RATES', {})
+        self.limit, self.period = parse_rate(rates.get(self.scope))
+        self.delay = 0.0
+
+    def get_ident_key(self, request, view):
+        raise NotImplementedError
+
+    def allow_request(self, request, view):
+        if self.limit is None:
+            return True
+        ident = self.get_ident_key(request, view)
+        if ident is None:
+            return True
+        self.delay = get_backend().hit(f'throttle:{self.scope}:{ident}', self.limit, self.period)
+        return self.delay <= 0
+
+    def wait(self):
+        return self.delay
+
+
+class IPThrottle(SlidingWindowThrottle):
+    def get_ident_key(self, request, view):
+        return self.get_ident(request)
+
+
+class EmailThrottle(SlidingWindowThrottle):
+    def get_ident_key(self, request, view):
+        email = request.data.get('email') if hasattr(request.data, 'get') else None
+        return email.strip().lower() if isinstance(email, str) and email.strip() else None
+
+
+class LoginIPThrottle(IPThrottle):
+    scope = 'login_ip'
+
+
+class LoginEmailThrottle(EmailThrottle):
+    """
+    Attempts per account from one client. Keyed on the email alone, anyone
+    could lock the owner out of their account by spending its budget.
+    """
+    scope = 'login_email'
+
+    def get_ident_key(self, request, view):
+        email = super().get_ident_key(request, view)
+        return f'{email}:{self.get_ident(request)}' if email is not None else None
+
+
+class LoginAccountThrottle(EmailThrottle):
+    """
+    Attempts per account from all clients together, so guessing spread over
+    many addresses is still bounded. Its rate sits well above
+    ``login_email`` so one client cannot exhaust it on its own.
+    """
+    scope = 'login_account'
+
+
+class RegisterIPThrottle(IPThrottle):
+    scope = 'register_ip'
+
+
+class RegisterEmailThrottle(EmailThrottle):
+    scope = 'register_email'
+
+
+class PasswordResetIPThrottle(IPThrottle):
+    scope = 'password_reset_ip'
+
+
+class PasswordResetEmailThrottle(EmailThrottle):
+    scope = 'password_reset_email'
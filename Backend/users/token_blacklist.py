@@ -0,0 +1,159 @@
+"""
+Revoked refresh tokens, checked in O(1) without growing tables.
+
+simplejwt's ``token_blacklist`` app records every issued refresh token and
+checks each refresh against a join that only ever grows. Here only revoked
+tokens are recorded (on logout and on rotation when
+``BLACKLIST_AFTER_ROTATION`` is set), under their JTI:
+
+* in the cache, as ``users:revoked:<jti>`` with a timeout equal to the
+  token's remaining lifetime, so entries vanish exactly when the token would
+  be rejected as expired anyway, and
+* in ``RevokedToken``, the source of truth; ``prune_expired`` (hourly on
+  beat) deletes rows past ``expires_at``.
+
+With a shared cache (``AUTH_TOKEN_BLACKLIST_USE_CACHE``, on when Redis is
+configured) a refresh usually costs one cache GET. A key missing from the
+cache (evicted, flushed, never checked) is answered from the table and the
+answer cached, a negative one for ``AUTH_TOKEN_BLACKLIST_NEGATIVE_TTL``
+seconds, so eviction can never let a revoked token through. A per-process
+cache cannot see revocations made by other workers, so without a shared one
+the check is always a primary-key lookup on the pruned table.
+"""
+import logging
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.utils import datetime_from_epoch
+
+from .models import RevokedToken
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = 'users:revoked:'
+# Cached answers: revoked, or known not to be (the negative entry).
+REVOKED, NOT_REVOKED = 1, 0
+
+
+def _use_cache():
+    return getattr(settings, 'AUTH_TOKEN_BLACKLIST_USE_CACHE', False)
+
+
+def _ttl(exp):
+    return int(exp - time.time()) + 1
+
+
+def revoke(token):
+    """Revoke ``token`` (a refresh token) until it expires. Idempotent."""
+    jti = token.payload[api_settings.JTI_CLAIM]
+    exp = token.payload['exp']
+    if _ttl(exp) <= 0:
+        return
+    RevokedToken.objects.bulk_create(
+        [RevokedToken(jti=jti, expires_at=datetime_from_epoch(exp))],
+        ignore_conflicts=True,
+    )
+    if _use_cache():
+        # After commit, so a rolled-back logout leaves no cache-only revocation.
+        # set(), not add(): it must replace a negative entry.
+        transaction.on_commit(lambda: cache.set(KEY_PREFIX + jti, REVOKED, _ttl(exp)))
+
+
+def is_revoked(jti):
+    revocations = RevokedToken.objects.filter(jti=jti, expires_at__gt=timezone.now())
+    if not _use_cache():
+        return revocations.exists()
+    key = KEY_PREFIX + jti
+    cached = cache.get(key)
+    if cached is not None:
+        return cached == REVOKED
+    expires_at = revocations.values_list('expires_at', flat=True).first()
+    if expires_at is not None:
+        cache.set(key, REVOKED, _ttl(expires_at.timestamp()))
+        return True
+    # add(), not set(): a revocation cached since the query above must win.
+    cache.add(key, NOT_REVOKED, getattr(settings, 'AUTH_TOKEN_BLACKLIST_NEGATIVE_TTL', 300))
+    return False
+
+
+def warm(batch_size=1000):
+    """
+    Load every unexpired revocation from the table into the cache, e.g. after
+    a flush, so refreshes do not all fall through to the table at once.
+    """
+    loaded = 0
+    rows = (
+        RevokedToken.objects.filter(expires_at__gt=timezone.now())
+        .values_list('jti', 'expires_at')
+        .iterator(chunk_size=batch_size)
+    )
+    for jti, expires_at in rows:
+        ttl = _ttl(expires_at.timestamp())
+        if ttl > 0:
+            cache.set(KEY_PREFIX + jti, REVOKED, ttl)
+            loaded += 1
+    logger.info('Loaded %s revoked tokens into the cache', loaded)
+    return loaded
+
+
+def prune_expired(batch_size=None):
+    """Delete revocations past their expiry in primary-key chunks; returns the count."""
+    batch_size = batch_size or getattr(settings, 'AUTH_TOKEN_BLACKLIST_PRUNE_BATCH_SIZE', 1000)
+    now = timezone.now()
+    pruned = 0
+    while True:
+        jtis = list(
+            RevokedToken.objects.filter(expires_at__lte=now)
+            .order_by('pk')
+            .values_list('pk', flat=True)[:batch_size]
+        )
+        if not jtis:
+            break
+        pruned += RevokedToken.objects.filter(pk__in=jtis).delete()[0]
+    pruned += _prune_simplejwt_tables(now, batch_size)
+    if pruned:
+        logger.info('Pruned %s expired token records', pruned)
+    return pruned
+
+
+def _prune_simplejwt_tables(now, batch_size):
+    # Tables left by simplejwt's own blacklist app, if it is (or was) installed;
+    # blacklisted rows cascade with their outstanding token.
+    if 'rest_framework_simplejwt.token_blacklist' not in settings.INSTALLED_APPS:
+        return 0
+    from rest_framework_simplejwt.token_blacklist.models import OutstandingToken
+
+    pruned = 0
+    while True:
+        ids = list(
+            OutstandingToken.objects.filter(expires_at__lte=now)
+            .order_by('pk')
+            .values_list('pk', flat=True)[:batch_size]
+        )
+        if not ids:
+            break
+        OutstandingToken.objects.filter(pk__in=ids).delete()
+        pruned += len(ids)
+    return pruned
+
+
+class BlacklistRefreshToken(RefreshToken):
+    """``RefreshToken`` checked against, and revoked into, this store."""
+
+    def verify(self, *args, **kwargs):
+        super().verify(*args, **kwargs)
+        self.check_blacklist()
+
+    def check_blacklist(self):
+        if is_revoked(self.payload[api_settings.JTI_CLAIM]):
+            raise TokenError(_('Token is blacklisted'))
+
+    def blacklist(self):
+        revoke(self)
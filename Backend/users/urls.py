@@ -13,6 +13,7 @@ from .views import (
     AppleOAuthView,
     ProfileViewSet,
     PasswordResetView,
+    UserProvisioningView,
 )
 
 router = DefaultRouter()
@@ -27,6 +28,7 @@ urlpatterns = [
     path('auth/me/', CurrentUserView.as_view(), name='current_user'),
     path('auth/password-reset/', PasswordResetView.as_view(), name='password_reset'),
     path('auth/health/', health_check, name='auth_health'),  # liveness probe
+    path('provision/', UserProvisioningView.as_view(), name='provision_users'),
     
     # Social authentication endpoints
     path('auth/google/', GoogleOAuthView.as_view(), name='google_oauth'),
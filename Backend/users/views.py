@@ -2,15 +2,29 @@ from rest_framework import status, viewsets, mixins, permissions
 from rest_framework.decorators import api_view, permission_classes, action
 from rest_framework.response import Response
 from rest_framework.views import APIView
-from rest_framework.permissions import AllowAny, IsAuthenticated
+from rest_framework.parsers import MultiPartParser
+from rest_framework.permissions import AllowAny, IsAdminUser, IsAuthenticated
 from rest_framework_simplejwt.tokens import RefreshToken
-from django.contrib.auth import authenticate, get_user_model
+from django.conf import settings
+from django.contrib.auth import get_user_model
 from social_django.utils import psa
-import requests
+from adrf.views import APIView as AsyncAPIView
+from asgiref.sync import sync_to_async
 
 from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
 
+from . import emails, hashing, oauth, provisioning
+from .token_blacklist import BlacklistRefreshToken
+from .throttling import (
+    LoginAccountThrottle,
+    LoginEmailThrottle,
+    LoginIPThrottle,
+    PasswordResetEmailThrottle,
+    PasswordResetIPThrottle,
+    RegisterEmailThrottle,
+    RegisterIPThrottle,
+)
 from .models import Profile
 from .serializers import (
     UserSerializer,
@@ -59,6 +73,22 @@ _error_response = openapi.Schema(
     example={'error': 'Invalid credentials'},
 )
 
+_throttled_response = openapi.Response(
+    'Too many attempts from this IP or for this email; see `Retry-After`',
+    examples={'application/json': {'detail': 'Request was throttled. Expected available in 42 seconds.'}},
+)
+
+_busy_response = openapi.Response(
+    'Password hashing capacity exhausted; retry after `Retry-After` seconds',
+    schema=_error_response,
+)
+
+
+def _hashing_busy(exc):
+    response = Response({'error': str(exc)}, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+    response['Retry-After'] = str(exc.retry_after)
+    return response
+
 _access_token_body = openapi.Schema(
     type=openapi.TYPE_OBJECT,
     required=['access_token'],
@@ -77,12 +107,14 @@ _access_token_body = openapi.Schema(
 class RegisterView(APIView):
     """User registration endpoint."""
     permission_classes = [AllowAny]
+    throttle_classes = [RegisterIPThrottle, RegisterEmailThrottle]
 
     @swagger_auto_schema(
         operation_summary='Register a new user',
         operation_description=(
             'Create a new account with email and password. '
-            'Returns the created user object and a JWT token pair.'
+            'Returns the created user object and a JWT token pair; a confirmation '
+            'email is queued for the address.'
         ),
         tags=['Auth'],
         request_body=openapi.Schema(
@@ -98,12 +130,18 @@ class RegisterView(APIView):
         responses={
             201: openapi.Response('User created successfully', schema=_token_response),
             400: openapi.Response('Validation error', schema=_error_response),
+            429: _throttled_response,
+            503: _busy_response,
         },
     )
     def post(self, request):
         serializer = UserRegistrationSerializer(data=request.data)
         if serializer.is_valid():
-            user = serializer.save()
+            try:
+                user = hashing.run(serializer.save)
+            except hashing.HashingBusy as e:
+                return _hashing_busy(e)
+            emails.enqueue(emails.EMAIL_VERIFICATION, user.email)
             refresh = RefreshToken.for_user(user)
             return Response({
                 'user': UserSerializer(user).data,
@@ -118,12 +156,16 @@ class RegisterView(APIView):
 class LoginView(APIView):
     """User login endpoint."""
     permission_classes = [AllowAny]
+    throttle_classes = [LoginIPThrottle, LoginEmailThrottle, LoginAccountThrottle]
 
     @swagger_auto_schema(
         operation_summary='Log in with email and password',
         operation_description=(
             'Authenticate with email and password. '
-            'Returns a JWT access token and refresh token.'
+            'Returns a JWT access token and refresh token.\n\n'
+            'Attempts are limited per client IP, per email from that IP and, at a higher '
+            'rate, per email across all clients (sliding window); excess attempts get 429 '
+            'with `Retry-After`.'
         ),
         tags=['Auth'],
         request_body=openapi.Schema(
@@ -138,6 +180,8 @@ class LoginView(APIView):
             200: openapi.Response('Login successful', schema=_token_response),
             400: openapi.Response('Validation error'),
             401: openapi.Response('Invalid credentials', schema=_error_response),
+            429: _throttled_response,
+            503: _busy_response,
         },
     )
     def post(self, request):
@@ -145,7 +189,10 @@ class LoginView(APIView):
         if serializer.is_valid():
             email = serializer.validated_data['email']
             password = serializer.validated_data['password']
-            user = authenticate(request, username=email, password=password)
+            try:
+                user = hashing.authenticate(request._request, email, password)
+            except hashing.HashingBusy as e:
+                return _hashing_busy(e)
             if user is not None:
                 refresh = RefreshToken.for_user(user)
                 return Response({
@@ -195,8 +242,7 @@ class LogoutView(APIView):
         try:
             refresh_token = request.data.get('refresh_token')
             if refresh_token:
-                token = RefreshToken(refresh_token)
-                token.blacklist()
+                BlacklistRefreshToken(refresh_token).blacklist()
             return Response({'message': 'Successfully logged out'}, status=status.HTTP_200_OK)
         except Exception as e:
             return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
@@ -230,8 +276,31 @@ class CurrentUserView(APIView):
         return Response(serializer.data)
 
 
-class GoogleOAuthView(APIView):
-    """Google OAuth authentication endpoint."""
+def _social_login(email, defaults, updates):
+    """Get or create the user for a verified social identity and issue JWTs."""
+    # get_or_create wraps the INSERT (and the profile the signal adds) in one transaction.
+    user, created = User.objects.get_or_create(email=email, defaults=defaults)
+    if not created:
+        changed = [
+            name for name, value in updates.items()
+            if value and getattr(user, name) != value
+        ]
+        if changed:
+            for name in changed:
+                setattr(user, name, updates[name])
+            user.save(update_fields=changed + ['updated_at'])
+    refresh = RefreshToken.for_user(user)
+    return {
+        'user': UserSerializer(user).data,
+        'tokens': {
+            'refresh': str(refresh),
+            'access': str(refresh.access_token),
+        }
+    }
+
+
+class GoogleOAuthView(AsyncAPIView):
+    """Google OAuth authentication endpoint (async: the Google call never blocks a worker)."""
     permission_classes = [AllowAny]
 
     @swagger_auto_schema(
@@ -247,9 +316,11 @@ class GoogleOAuthView(APIView):
             200: openapi.Response('Authentication successful', schema=_token_response),
             400: openapi.Response('Invalid or missing token', schema=_error_response),
             500: openapi.Response('Server error', schema=_error_response),
+            502: openapi.Response('Google unreachable', schema=_error_response),
+            504: openapi.Response('Google did not respond in time', schema=_error_response),
         },
     )
-    def post(self, request):
+    async def post(self, request):
         access_token = request.data.get('access_token')
         if not access_token:
             return Response(
@@ -257,44 +328,31 @@ class GoogleOAuthView(APIView):
                 status=status.HTTP_400_BAD_REQUEST
             )
         try:
-            google_response = requests.get(
-                'https://www.googleapis.com/oauth2/v3/userinfo',
-                headers={'Authorization': f'Bearer {access_token}'}
+            user_info = await oauth.google_user_info(access_token)
+        except oauth.OAuthError as e:
+            return Response({'error': str(e)}, status=e.status_code)
+        email = user_info.get('email')
+        if not email:
+            return Response(
+                {'error': 'Email not provided by Google'},
+                status=status.HTTP_400_BAD_REQUEST
             )
-            if google_response.status_code != 200:
-                return Response(
-                    {'error': 'Invalid Google token'},
-                    status=status.HTTP_400_BAD_REQUEST
-                )
-            user_info = google_response.json()
-            email = user_info.get('email')
-            if not email:
-                return Response(
-                    {'error': 'Email not provided by Google'},
-                    status=status.HTTP_400_BAD_REQUEST
-                )
-            user, created = User.objects.get_or_create(
-                email=email,
+        try:
+            data = await sync_to_async(_social_login)(
+                email,
                 defaults={
                     'full_name': user_info.get('name', ''),
                     'avatar_url': user_info.get('picture', ''),
                     'provider': 'google',
                     'provider_id': user_info.get('sub'),
                     'email_confirmed': True,
-                }
+                },
+                updates={
+                    'full_name': user_info.get('name'),
+                    'avatar_url': user_info.get('picture'),
+                },
             )
-            if not created:
-                user.full_name = user_info.get('name', user.full_name)
-                user.avatar_url = user_info.get('picture', user.avatar_url)
-                user.save()
-            refresh = RefreshToken.for_user(user)
-            return Response({
-                'user': UserSerializer(user).data,
-                'tokens': {
-                    'refresh': str(refresh),
-                    'access': str(refresh.access_token),
-                }
-            }, status=status.HTTP_200_OK)
+            return Response(data, status=status.HTTP_200_OK)
         except Exception as e:
             return Response(
                 {'error': str(e)},
@@ -302,8 +360,8 @@ class GoogleOAuthView(APIView):
             )
 
 
-class FacebookOAuthView(APIView):
-    """Facebook OAuth authentication endpoint."""
+class FacebookOAuthView(AsyncAPIView):
+    """Facebook OAuth authentication endpoint (async: the Graph API call never blocks a worker)."""
     permission_classes = [AllowAny]
 
     @swagger_auto_schema(
@@ -319,9 +377,11 @@ class FacebookOAuthView(APIView):
             200: openapi.Response('Authentication successful', schema=_token_response),
             400: openapi.Response('Invalid or missing token', schema=_error_response),
             500: openapi.Response('Server error', schema=_error_response),
+            502: openapi.Response('Facebook unreachable', schema=_error_response),
+            504: openapi.Response('Facebook did not respond in time', schema=_error_response),
         },
     )
-    def post(self, request):
+    async def post(self, request):
         access_token = request.data.get('access_token')
         if not access_token:
             return Response(
@@ -329,43 +389,32 @@ class FacebookOAuthView(APIView):
                 status=status.HTTP_400_BAD_REQUEST
             )
         try:
-            fb_response = requests.get(
-                f'https://graph.facebook.com/me?fields=id,name,email,picture&access_token={access_token}'
+            user_info = await oauth.facebook_user_info(access_token)
+        except oauth.OAuthError as e:
+            return Response({'error': str(e)}, status=e.status_code)
+        email = user_info.get('email')
+        if not email:
+            return Response(
+                {'error': 'Email not provided by Facebook'},
+                status=status.HTTP_400_BAD_REQUEST
             )
-            if fb_response.status_code != 200:
-                return Response(
-                    {'error': 'Invalid Facebook token'},
-                    status=status.HTTP_400_BAD_REQUEST
-                )
-            user_info = fb_response.json()
-            email = user_info.get('email')
-            if not email:
-                return Response(
-                    {'error': 'Email not provided by Facebook'},
-                    status=status.HTTP_400_BAD_REQUEST
-                )
-            user, created = User.objects.get_or_create(
-                email=email,
+        picture = user_info.get('picture', {}).get('data', {}).get('url')
+        try:
+            data = await sync_to_async(_social_login)(
+                email,
                 defaults={
                     'full_name': user_info.get('name', ''),
-                    'avatar_url': user_info.get('picture', {}).get('data', {}).get('url', ''),
+                    'avatar_url': picture or '',
                     'provider': 'facebook',
                     'provider_id': user_info.get('id'),
                     'email_confirmed': True,
-                }
+                },
+                updates={
+                    'full_name': user_info.get('name'),
+                    'avatar_url': picture,
+                },
             )
-            if not created:
-                user.full_name = user_info.get('name', user.full_name)
-                user.avatar_url = user_info.get('picture', {}).get('data', {}).get('url', user.avatar_url)
-                user.save()
-            refresh = RefreshToken.for_user(user)
-            return Response({
-                'user': UserSerializer(user).data,
-                'tokens': {
-                    'refresh': str(refresh),
-                    'access': str(refresh.access_token),
-                }
-            }, status=status.HTTP_200_OK)
+            return Response(data, status=status.HTTP_200_OK)
         except Exception as e:
             return Response(
                 {'error': str(e)},
@@ -451,11 +500,14 @@ class ProfileViewSet(viewsets.GenericViewSet, mixins.RetrieveModelMixin, mixins.
             serializer.is_valid(raise_exception=True)
             serializer.save()
             user = request.user
-            if 'full_name' in request.data:
-                user.full_name = request.data['full_name']
-            if 'avatar_url' in request.data:
-                user.avatar_url = request.data['avatar_url']
-            user.save()
+            validated = serializer.validated_data
+            changed = [name for name in User.PROFILE_FIELDS if name in validated]
+            for name in changed:
+                setattr(user, name, validated[name])
+            if changed:
+                # The profile row already holds these values; don't mirror them back.
+                user._loaded_profile_values = user.profile_values()
+                user.save(update_fields=changed + ['updated_at'])
             return Response(serializer.data)
         serializer = self.get_serializer(profile)
         return Response(serializer.data)
@@ -464,12 +516,14 @@ class ProfileViewSet(viewsets.GenericViewSet, mixins.RetrieveModelMixin, mixins.
 class PasswordResetView(APIView):
     """Password reset request endpoint."""
     permission_classes = [AllowAny]
+    throttle_classes = [PasswordResetIPThrottle, PasswordResetEmailThrottle]
 
     @swagger_auto_schema(
         operation_summary='Request a password reset email',
         operation_description=(
             'Sends a password reset email to the specified address **if an account exists**. '
-            'For security, the response is identical whether or not the email is registered.'
+            'For security, the response is identical (content and timing) whether or not '
+            'the email is registered; the email is sent in the background.'
         ),
         tags=['Auth'],
         request_body=openapi.Schema(
@@ -485,32 +539,73 @@ class PasswordResetView(APIView):
                 examples={'application/json': {'message': 'Password reset email sent'}},
             ),
             400: openapi.Response('Validation error'),
+            429: _throttled_response,
         },
     )
     def post(self, request):
-        from django.core.mail import send_mail
-        from django.conf import settings as django_settings
-
         serializer = PasswordResetSerializer(data=request.data)
         if serializer.is_valid():
-            email = serializer.validated_data['email']
-            try:
-                user = User.objects.get(email=email)
-                send_mail(
-                    'Password Reset Request',
-                    f'Hello {user.full_name or user.email},\n\n'
-                    'We received a request to reset your password. '
-                    'Please use the link below to reset your password:\n\n'
-                    '[Password reset link would go here]\n\n'
-                    'If you did not request this, please ignore this email.',
-                    django_settings.DEFAULT_FROM_EMAIL,
-                    [email],
-                    fail_silently=False,
-                )
-            except User.DoesNotExist:
-                pass  # Do not reveal user existence
+            # Only queued here: the account lookup and SMTP happen in a worker,
+            # so timing does not reveal whether the email is registered.
+            emails.enqueue(emails.PASSWORD_RESET, serializer.validated_data['email'])
             return Response(
                 {'message': 'Password reset email sent'},
                 status=status.HTTP_200_OK
             )
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+
+class UserProvisioningView(APIView):
+    """Bulk user provisioning endpoint (staff only)."""
+    permission_classes = [IsAdminUser]
+    parser_classes = [MultiPartParser]
+
+    @swagger_auto_schema(
+        operation_summary='Provision users in bulk',
+        operation_description=(
+            'Upload a CSV (header must include `email`) or JSONL file to create many users '
+            'and their profiles at once. Recognised columns: `email`, `full_name`, '
+            '`avatar_url`, `password` (omit it to create users without a usable password).\n\n'
+            'Rows are validated individually; failures are reported with their line number '
+            'and do not stop the import. At most `USERS_PROVISION_MAX_ROWS` rows per request; '
+            'use `manage.py provision_users` for larger files. Staff only.'
+        ),
+        tags=['Auth'],
+        manual_parameters=[
+            openapi.Parameter(
+                'file', openapi.IN_FORM, type=openapi.TYPE_FILE, required=True,
+                description='`.csv` or `.jsonl` file',
+            ),
+            openapi.Parameter(
+                'format', openapi.IN_FORM, type=openapi.TYPE_STRING, enum=list(provisioning.FORMATS),
+                required=False, description='Overrides detection from the file extension',
+            ),
+        ],
+        responses={
+            200: openapi.Response(
+                'Import finished',
+                examples={'application/json': {
+                    'created': 998,
+                    'failed': 2,
+                    'errors': [
+                        {'line': 14, 'email': 'jane@', 'error': 'Enter a valid email address.'},
+                        {'line': 73, 'email': 'sam@example.com', 'error': 'A user with this email already exists'},
+                    ],
+                }},
+            ),
+            400: openapi.Response('Missing file or unreadable input', schema=_error_response),
+        },
+    )
+    def post(self, request):
+        upload = request.FILES.get('file')
+        if upload is None:
+            return Response({'error': 'A file is required'}, status=status.HTTP_400_BAD_REQUEST)
+        fmt = request.data.get('format') or provisioning.detect_format(upload.name)
+        try:
+            result = provisioning.provision_users(
+                provisioning.iter_rows(upload, fmt),
+                max_rows=getattr(settings, 'USERS_PROVISION_MAX_ROWS', 5000),
+            )
+        except provisioning.ProvisioningError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(result, status=status.HTTP_200_OK)